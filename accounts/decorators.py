@@ -2,6 +2,8 @@ from django.core.exceptions import PermissionDenied
 from django.http import JsonResponse
 from functools import wraps
 
+from .permissions import permissions_for
+
 def role_required(allowed_roles=[]):
     """
     Decorator for views that checks whether a user has a particular role.
@@ -11,7 +13,7 @@ def role_required(allowed_roles=[]):
         @wraps(view_func)
         def _wrapped_view(request, *args, **kwargs):
             # 1. Check if user is logged in and has the required role
-            if request.user.is_authenticated and request.user.profile.role in allowed_roles:
+            if request.user.is_authenticated and permissions_for(request).has_role(*allowed_roles):
                 return view_func(request, *args, **kwargs)
             
             # 2. If it's an AJAX request, return JSON instead of a redirect/403 page
@@ -45,4 +45,11 @@ def handle_user_profile(sender, instance, created, **kwargs):
     # else:
     #     # Use hasattr to prevent crashes if a profile was never created
     #     if hasattr(instance, 'profile'):
-    #         instance.profile.save()
\ No newline at end of file
+    #         instance.profile.save()
+
+@receiver(post_save, sender=UserProfile)
+def forget_cached_permissions(sender, instance, **kwargs):
+    """A role change takes effect on the next request, not when the permissions cache expires."""
+    from .permissions import forget  # Local import: accounts.permissions imports projects.models
+
+    forget([instance.user_id])
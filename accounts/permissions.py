@@ -0,0 +1,225 @@
+"""
+The requester's permissions, evaluated in memory.
+
+Views used to re-read request.user.profile.role and compare task.project.team_lead
+with the user in their own is_authorized blocks, each comparison a possible lazy
+query. A Permissions object loads the role and the led and member project ids at
+most once (the profile and one ProjectMembership query) and answers every check
+from those:
+
+    perms = permissions_for(request)      # memoized on the request
+    if not perms.can_change_status(task):
+        ...
+
+With PERMISSIONS_CACHE_SECONDS > 0 the loaded values are also kept in the cache for
+that long. Membership rebuilds (projects/membership.py) and profile saves drop the
+affected users' entries through forget().
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import cached_property
+
+from projects.models import Project, ProjectMembership
+
+PRIVILEGED_ROLES = ('admin', 'manager')
+
+CACHE_KEY = 'permissions:{}'
+
+
+class Permissions:
+    """
+    Checks for one user. The role and the project ids are each loaded on first use
+    and then kept, so a check that needs neither (can_comment) costs nothing.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @classmethod
+    async def aload(cls, user):
+        """Everything loaded up front on the async ORM; the user's profile must already be loaded."""
+        perms = cls(user)
+        if user.is_authenticated:
+            if settings.PERMISSIONS_CACHE_SECONDS:
+                perms.__dict__['_cached'] = await cache.aget(CACHE_KEY.format(user.pk))
+            if not perms._cached:
+                rows = [row async for row in _membership_rows(user)]
+                perms.__dict__['_projects'] = _split(rows)
+                if settings.PERMISSIONS_CACHE_SECONDS:
+                    await cache.aset(CACHE_KEY.format(user.pk), perms._cache_value(), settings.PERMISSIONS_CACHE_SECONDS)
+        return perms
+
+    @cached_property
+    def _cached(self):
+        if not settings.PERMISSIONS_CACHE_SECONDS or not self.user.is_authenticated:
+            return None
+        return cache.get(CACHE_KEY.format(self.user.pk))
+
+    @cached_property
+    def role(self):
+        if not self.user.is_authenticated:
+            return None
+        if self._cached:
+            return self._cached[0]
+        return self.user.profile.role
+
+    @cached_property
+    def _projects(self):
+        """(led project ids, member project ids)"""
+        if not self.user.is_authenticated:
+            return frozenset(), frozenset()
+        if self._cached:
+            return frozenset(self._cached[1]), frozenset(self._cached[2])
+        projects = _split(_membership_rows(self.user))
+        self.__dict__['_projects'] = projects
+        if settings.PERMISSIONS_CACHE_SECONDS:
+            cache.set(CACHE_KEY.format(self.user.pk), self._cache_value(), settings.PERMISSIONS_CACHE_SECONDS)
+        return projects
+
+    def _cache_value(self):
+        return self.role, sorted(self.led_project_ids), sorted(self.member_project_ids)
+
+    @property
+    def led_project_ids(self):
+        return self._projects[0]
+
+    @property
+    def member_project_ids(self):
+        return self._projects[1]
+
+    # --- Roles and relations ---
+
+    @property
+    def is_privileged(self):
+        return self.role in PRIVILEGED_ROLES
+
+    @property
+    def is_observer(self):
+        return self.role == 'observer'
+
+    def has_role(self, *roles):
+        return self.role in roles
+
+    def leads(self, project):
+        """`project` is a Project or an id; a loaded project answers without the membership query."""
+        if isinstance(project, Project):
+            return project.team_lead_id == self.user.pk
+        return project in self.led_project_ids
+
+    @property
+    def leads_any_project(self):
+        return bool(self.led_project_ids)
+
+    def is_member(self, project_id):
+        return project_id in self.member_project_ids
+
+    def _is_assignee(self, task):
+        return task.assigned_to_id == self.user.pk
+
+    # --- Tasks ---
+
+    def can_create_task(self, project=None):
+        """TaskCreateView: admins/managers anywhere; a lead in their own unlocked project."""
+        if self.is_privileged:
+            return True
+        return project is not None and project.status != 'inactive' and self.leads(project)
+
+    def can_import_tasks(self):
+        """The import page; every row is still checked with can_create_task."""
+        return self.is_privileged or self.leads_any_project
+
+    def can_change_status(self, task):
+        """Status and progress: admin/manager, the project's lead or the assignee; never in locked projects."""
+        if task.project.status == 'inactive':
+            return False
+        return self.is_privileged or self.leads(task.project) or self._is_assignee(task)
+
+    def can_edit_task(self, task):
+        """TaskUpdateView: as can_change_status, but never for observers."""
+        return not self.is_observer and self.can_change_status(task)
+
+    def can_edit_fields(self, task):
+        """Priority, assignee and the other planning fields: admins, managers and the project's lead."""
+        if task.project.status == 'inactive' or self.is_observer:
+            return False
+        return self.is_privileged or self.leads(task.project)
+
+    def can_delete(self, task):
+        """TaskDeleteView: admins and managers."""
+        return self.is_privileged
+
+    def can_clear_history(self, task):
+        return self.is_privileged
+
+    # --- Comments and attachments ---
+
+    def can_comment(self, task):
+        """Comments and uploads are open to everyone who sees the task until the project is locked."""
+        return task.project.status != 'inactive'
+
+    def can_attach(self, task):
+        return self.can_comment(task)
+
+    def can_edit_comment(self, comment):
+        return comment.commented_by_id == self.user.pk or self.is_privileged
+
+    def can_delete_comment(self, comment):
+        return self.can_edit_comment(comment)
+
+    def can_delete_attachment(self, attachment):
+        return attachment.uploaded_by_id == self.user.pk or self.is_privileged
+
+    # --- Projects ---
+
+    def can_create_project(self):
+        return self.is_privileged
+
+    def can_edit_project(self, project):
+        """ProjectUpdateView: admins, managers and the project's lead; never observers."""
+        if self.is_observer:
+            return False
+        return self.is_privileged or self.leads(project)
+
+    def can_delete_project(self, project=None):
+        return self.is_privileged
+
+
+def _membership_rows(user):
+    rows = ProjectMembership.objects.filter(user=user).exclude(is_lead=False, is_member=False)
+    return rows.values_list('project_id', 'is_lead', 'is_member')
+
+
+def _split(rows):
+    """(led, member) project id sets from (project_id, is_lead, is_member) rows."""
+    led, member = set(), set()
+    for project_id, is_lead, is_member in rows:
+        if is_lead:
+            led.add(project_id)
+        if is_member:
+            member.add(project_id)
+    return frozenset(led), frozenset(member)
+
+
+def permissions_for(request):
+    """The requester's Permissions, loaded on first use and kept for the rest of the request."""
+    if getattr(request, '_permissions', None) is None:
+        request._permissions = Permissions(request.user)
+    return request._permissions
+
+
+async def apermissions_for(request, user):
+    """permissions_for() for async views, given the already loaded requester."""
+    if getattr(request, '_permissions', None) is None:
+        request._permissions = await Permissions.aload(user)
+    return request._permissions
+
+
+def forget(user_ids):
+    """Drops cached permissions now and again after commit (a request may re-cache in between)."""
+    if not settings.PERMISSIONS_CACHE_SECONDS:
+        return
+    keys = [CACHE_KEY.format(user_id) for user_id in set(user_ids) if user_id]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,67 @@
+"""
+Resource allocation report (accounts:resource_dashboard).
+
+The per-user task counts come from one GROUP BY (assigned_to, status) pivoted in
+Python, and the project pills from one prefetch, so the page costs the same few
+queries whatever the headcount. With RESOURCE_REPORT_SNAPSHOT_SECONDS set, the
+built report is cached and accounts.tasks.refresh_resource_report keeps it warm.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count, Prefetch
+from django.utils import timezone
+
+from projects.models import Project
+from tasks.models import Task
+
+RESOURCE_REPORT_KEY = 'resource-report'
+
+# Counter attributes set on each user: attribute -> task statuses it sums
+REPORT_COUNTS = {
+    'todo_count': ('todo',),
+    'in_progress_count': ('in_progress',),
+    'completed_count': ('completed',),
+    'blocked_count': ('blocked',),
+    'total_active': ('in_progress', 'in_review'),
+}
+
+
+def build_resource_report():
+    """Users (with profile and projects_assigned prefetched) carrying the REPORT_COUNTS attributes."""
+    users = list(
+        User.objects.select_related('profile')
+        .prefetch_related(Prefetch('projects_assigned', queryset=Project.objects.only('id', 'title')))
+        .order_by('profile__role', 'username')
+    )
+
+    by_status = defaultdict(dict)
+    grouped = (
+        Task.objects.filter(assigned_to__isnull=False).order_by()
+        .values_list('assigned_to_id', 'status').annotate(n=Count('id'))
+    )
+    for user_id, status, count in grouped:
+        by_status[user_id][status] = count
+
+    for user in users:
+        counts = by_status.get(user.pk, {})
+        for attr, statuses in REPORT_COUNTS.items():
+            setattr(user, attr, sum(counts.get(status, 0) for status in statuses))
+    return users
+
+
+def refresh_resource_snapshot():
+    snapshot = {'users': build_resource_report(), 'generated_at': timezone.now()}
+    # Outlives two refresh intervals so a late beat doesn't empty the page
+    cache.set(RESOURCE_REPORT_KEY, snapshot, settings.RESOURCE_REPORT_SNAPSHOT_SECONDS * 2)
+    return snapshot
+
+
+def get_resource_report():
+    """(users, generated_at); generated_at is None when the report was built live."""
+    if not settings.RESOURCE_REPORT_SNAPSHOT_SECONDS:
+        return build_resource_report(), None
+    snapshot = cache.get(RESOURCE_REPORT_KEY) or refresh_resource_snapshot()
+    return snapshot['users'], snapshot['generated_at']
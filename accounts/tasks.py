@@ -5,6 +5,8 @@ from django.utils.html import strip_tags
 from django.contrib.auth.models import User # Import User model
 import os
 
+from .reports import refresh_resource_snapshot
+
 @shared_task
 def send_password_reset_email(subject, email_template_name, context, to_email):
     # sourcery skip: use-named-expression
@@ -36,6 +38,13 @@ def send_password_reset_email(subject, email_template_name, context, to_email):
     )
 
 
+@shared_task
+def refresh_resource_report():
+    """Rebuilds the cached resource dashboard snapshot (scheduled by beat when enabled)."""
+    snapshot = refresh_resource_snapshot()
+    return len(snapshot['users'])
+
+
 # @shared_task
 # def send_password_reset_email(subject, email_template_name, context, to_email):
 #     user_id = context.get('user')
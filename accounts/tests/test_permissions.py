@@ -0,0 +1,98 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.permissions import Permissions, permissions_for
+from projects.models import Project
+from tasks.models import Task
+
+
+class PermissionsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.users = {}
+        for role in ('admin', 'manager', 'developer', 'observer'):
+            user = User.objects.create_user(username=role, password='pass')
+            user.profile.role = role
+            user.profile.save()
+            self.users[role] = user
+        self.lead = User.objects.create_user(username='lead', password='pass')
+        self.lead.profile.role = 'developer'
+        self.lead.profile.save()
+        self.project = Project.objects.create(
+            title="Permissions", status='active', team_lead=self.lead, created_by=self.users['admin']
+        )
+        self.project.team_members.add(self.users['developer'])
+        self.task = Task.objects.create(
+            title="Task", project=self.project, assigned_to=self.users['developer'], assigned_by=self.lead
+        )
+
+    def perms(self, user):
+        return Permissions(User.objects.get(pk=user.pk))
+
+    def test_task_rules(self):
+        expected = {
+            # role: (can_change_status, can_edit_fields, can_delete)
+            'admin': (True, True, True),
+            'manager': (True, True, True),
+            'developer': (True, False, False),   # the assignee
+            'observer': (False, False, False),
+        }
+        for role, rules in expected.items():
+            perms = self.perms(self.users[role])
+            with self.subTest(role=role):
+                self.assertEqual(
+                    (perms.can_change_status(self.task), perms.can_edit_fields(self.task), perms.can_delete(self.task)),
+                    rules,
+                )
+        lead = self.perms(self.lead)
+        self.assertTrue(lead.can_edit_fields(self.task))
+        self.assertTrue(lead.can_import_tasks())
+        self.assertFalse(self.perms(self.users['developer']).can_import_tasks())
+
+        self.project.status = 'inactive'
+        self.project.save()
+        task = Task.objects.select_related('project').get(pk=self.task.pk)
+        self.assertFalse(self.perms(self.users['admin']).can_change_status(task))
+        self.assertFalse(self.perms(self.lead).can_comment(task))
+
+    def test_loaded_once_per_request(self):
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(pk=self.lead.pk)
+        perms = permissions_for(request)
+        with self.assertNumQueries(2):
+            self.assertEqual(perms.role, 'developer')
+            self.assertTrue(perms.leads(self.project.pk))
+        with self.assertNumQueries(0):
+            self.assertIs(permissions_for(request), perms)
+            self.assertTrue(perms.leads(self.project.pk))
+            self.assertFalse(perms.is_privileged)
+
+    @override_settings(PERMISSIONS_CACHE_SECONDS=60)
+    def test_cache_is_invalidated_by_membership_and_role_changes(self):
+        developer = self.users['developer']
+        self.assertEqual(self.perms(developer).member_project_ids, {self.project.pk})
+        with self.assertNumQueries(1):
+            # The user lookup; role and projects come from the cache
+            perms = self.perms(developer)
+            self.assertEqual((perms.role, perms.member_project_ids), ('developer', {self.project.pk}))
+
+        self.project.team_members.remove(developer)
+        self.assertEqual(self.perms(developer).member_project_ids, set())
+
+        self.project.team_lead = developer
+        self.project.save()
+        self.assertTrue(self.perms(developer).leads(self.project.pk))
+        self.assertFalse(self.perms(self.lead).leads(self.project.pk))
+
+        developer.profile.role = 'manager'
+        developer.profile.save()
+        self.assertTrue(self.perms(developer).is_privileged)
+
+    def test_only_admins_and_managers_can_delete_tasks(self):
+        self.client.login(username='developer', password='pass')
+        response = self.client.post(reverse('tasks:task_delete', args=[self.task.pk]))
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Task.objects.filter(pk=self.task.pk).exists())
@@ -0,0 +1,58 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.tasks import refresh_resource_report
+from projects.models import Project
+from tasks.models import Task
+
+
+class ResourceReportTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin', password='pass')
+        self.admin.profile.role = 'admin'
+        self.admin.profile.save()
+        self.devs = [User.objects.create_user(username=f'dev{i}', password='pass') for i in range(3)]
+        self.project = Project.objects.create(title="Report", created_by=self.admin)
+        self.project.team_members.add(*self.devs)
+        for status in ('todo', 'todo', 'in_progress', 'in_review', 'completed', 'blocked'):
+            Task.objects.create(title=status, status=status, project=self.project,
+                                assigned_to=self.devs[0], assigned_by=self.admin)
+        self.client.login(username='admin', password='pass')
+        self.url = reverse('accounts:resource_dashboard')
+
+    def report_row(self, response, user):
+        return next(u for u in response.context['users_report'] if u.pk == user.pk)
+
+    def test_counts_are_pivoted_per_user(self):
+        row = self.report_row(self.client.get(self.url), self.devs[0])
+        self.assertEqual(
+            (row.todo_count, row.in_progress_count, row.completed_count, row.blocked_count, row.total_active),
+            (2, 1, 1, 1, 2),
+        )
+        self.assertEqual(self.report_row(self.client.get(self.url), self.devs[1]).total_active, 0)
+
+    def test_query_count_is_flat_in_headcount(self):
+        self.client.get(self.url)  # warm session/auth caches
+        with self.assertNumQueries(6) as ctx:
+            self.client.get(self.url)
+        for i in range(3, 10):
+            user = User.objects.create_user(username=f'dev{i}', password='pass')
+            self.project.team_members.add(user)
+        with self.assertNumQueries(len(ctx.captured_queries)):
+            self.client.get(self.url)
+
+    @override_settings(RESOURCE_REPORT_SNAPSHOT_SECONDS=60)
+    def test_snapshot_is_served_from_cache_and_refreshed_by_task(self):
+        self.client.get(self.url)
+        Task.objects.create(title="New", status='todo', project=self.project,
+                            assigned_to=self.devs[1], assigned_by=self.admin)
+        response = self.client.get(self.url)
+        self.assertIsNotNone(response.context['generated_at'])
+        self.assertEqual(self.report_row(response, self.devs[1]).todo_count, 0)
+
+        refresh_resource_report()
+        self.assertEqual(self.report_row(self.client.get(self.url), self.devs[1]).todo_count, 1)
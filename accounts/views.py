@@ -13,9 +13,11 @@ from django.contrib.auth.views import PasswordChangeView
 from django.contrib.messages.views import SuccessMessageMixin
 from django.db.models.functions import Coalesce
 from tasks.models import Task
+from projects.membership import member_project_ids
 from django.http import JsonResponse
 from django.contrib.auth.views import PasswordResetView
 from .tasks import send_password_reset_email
+from .reports import get_resource_report
 from django.contrib.auth.forms import PasswordResetForm
 from .decorators import role_required
 from accounts.forms import CeleryPasswordResetForm
@@ -137,8 +139,8 @@ def profile_view(request):
             base_qs = Task.objects.all() # Global View
         else:
             base_qs = Task.objects.filter(
-                Q(assigned_to=user) | Q(assigned_by=user) | Q(project__team_members=user)
-            ).distinct()
+                Q(assigned_to=user) | Q(assigned_by=user) | Q(project_id__in=member_project_ids(user))
+            )
     else:
         base_qs = Task.objects.filter(assigned_to=user)
     
@@ -259,18 +261,19 @@ def admin_resource_dashboard(request):
     #     total_active=Count('assigned_tasks', filter=Q(assigned_tasks__status__in=['todo', 'in_progress']), distinct=True)
     # ).order_by('profile__role', 'username')
 
-    users_report = User.objects.select_related('profile').annotate(
-        todo_count=get_task_count_subquery('todo'),
-        in_progress_count=get_task_count_subquery('in_progress'),
-        completed_count=get_task_count_subquery('completed'),
-        blocked_count=get_task_count_subquery('blocked'),
-        # Custom logic for total active (In Progress + In Review)
-        # Note: You can add these two subqueries together!
-        total_active=(
-            get_task_count_subquery('in_progress') + 
-            get_task_count_subquery('in_review')
-        )
-    ).order_by('profile__role', 'username')
+    # users_report = User.objects.select_related('profile').annotate(
+    #     todo_count=get_task_count_subquery('todo'),
+    #     in_progress_count=get_task_count_subquery('in_progress'),
+    #     completed_count=get_task_count_subquery('completed'),
+    #     blocked_count=get_task_count_subquery('blocked'),
+    #     total_active=(
+    #         get_task_count_subquery('in_progress') + 
+    #         get_task_count_subquery('in_review')
+    #     )
+    # ).order_by('profile__role', 'username')
+
+    # One GROUP BY (assigned_to, status) + one projects prefetch (see accounts/reports.py)
+    users_report, generated_at = get_resource_report()
 
 
 
@@ -285,7 +288,8 @@ def admin_resource_dashboard(request):
     # ).order_by('profile__role', 'username')
 
     return render(request, 'accounts/resource_dashboard.html', {
-        'users_report': users_report
+        'users_report': users_report,
+        'generated_at': generated_at,
     })
 
 
@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+Live updates (tasks:event_stream) are long-lived async responses and need this
+entry point, e.g. ``gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker``.
+Under config.wsgi the stream answers 204 and the pages keep their AJAX refresh.
 """
 
 import os
@@ -12,4 +12,9 @@ app.conf.broker_url = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django apps.
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
+
+# Runtime of every task in the /metrics/ histograms
+from .metrics import instrument_celery  # noqa: E402
+
+instrument_celery()
\ No newline at end of file
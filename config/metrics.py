@@ -0,0 +1,322 @@
+"""
+Prometheus metrics, without the prometheus_client dependency.
+
+A small in-process registry of counters and histograms, exposed in the Prometheus
+text format at /metrics/:
+
+    taskflow_http_requests_total{view="tasks:update_progress",method="POST",status="200"} 42
+    taskflow_http_request_duration_seconds_bucket{view="tasks:dashboard",le="0.1"} 17
+    taskflow_celery_task_duration_seconds_sum{task="accounts.tasks.send_password_reset_email",state="SUCCESS"} 3.2
+    taskflow_signal_handler_duration_seconds_count{handler="projects.signals.enforce_core_membership"} 96
+
+Views are measured by MetricsMiddleware (labelled with the URL name), every Celery task by
+the task_prerun/task_postrun signals (connected in config/celery.py) and chosen signal
+receivers by the @timed_receiver decorator.
+
+Under gunicorn each worker process has its own registry. With METRICS_DIR set, every
+process (web and Celery workers on the host) writes its values to METRICS_DIR/<pid>.json,
+at most every METRICS_FLUSH_SECONDS and at exit, and the endpoint sums all the files. Empty
+the directory when deploying, as prometheus_client's multiprocess mode asks; a restarted
+worker reusing a pid starts that file over, which Prometheus reads as a counter reset.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {labels}")
+        return tuple(str(label) for label in labels)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self.registry.lock:
+            values = self.registry.values[self.name]
+            values[key] = values.get(key, 0) + amount
+        self.registry.maybe_flush()
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames, buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, seconds, *labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            values = self.registry.values[self.name]
+            # Per-bucket (not cumulative) counts, then +Inf, then the sum
+            value = values.get(key)
+            if value is None:
+                value = values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    value[i] += 1
+                    break
+            else:
+                value[len(self.buckets)] += 1
+            value[-1] += seconds
+        self.registry.maybe_flush()
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+
+class _Timer:
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+def _add(total, value):
+    if isinstance(total, list):
+        return [a + b for a, b in zip(total, value)]
+    return total + value
+
+
+class Registry:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.values = {}
+        self._flushed_at = time.monotonic()
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        self.values[metric.name] = {}
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    # --- Multi-process ---
+
+    def _directory(self):
+        directory = getattr(settings, 'METRICS_DIR', None) if settings.configured else None
+        return Path(directory) if directory else None
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: [[list(key), value if isinstance(value, (int, float)) else list(value)]
+                       for key, value in values.items()]
+                for name, values in self.values.items()
+            }
+
+    def maybe_flush(self):
+        if self._directory() is None:
+            return
+        now = time.monotonic()
+        if now - self._flushed_at >= settings.METRICS_FLUSH_SECONDS:
+            self._flushed_at = now
+            self.flush()
+
+    def flush(self):
+        """Writes this process's values to METRICS_DIR/<pid>.json (atomically)."""
+        directory = self._directory()
+        if directory is None:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}.json'
+        temp = path.with_name(f'{path.name}.{threading.get_ident()}.tmp')
+        temp.write_text(json.dumps(self.snapshot()))
+        os.replace(temp, path)
+
+    def collect(self):
+        """{name: {labels: value}} summed over every process's file, or this process alone."""
+        directory = self._directory()
+        if directory is None:
+            snapshots = [self.snapshot()]
+        else:
+            self.flush()
+            snapshots = []
+            for path in directory.glob('*.json'):
+                try:
+                    snapshots.append(json.loads(path.read_text()))
+                except (OSError, ValueError):
+                    # Removed or being replaced while we read
+                    continue
+        totals = {name: {} for name in self.metrics}
+        for snapshot in snapshots:
+            for name, samples in snapshot.items():
+                if name not in totals:
+                    continue
+                values = totals[name]
+                for labels, value in samples:
+                    key = tuple(labels)
+                    values[key] = _add(values[key], value) if key in values else value
+        return totals
+
+    # --- Exposition ---
+
+    def render(self):
+        lines = []
+        for name, values in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for key, value in sorted(values.items()):
+                labels = list(zip(metric.labelnames, key))
+                if metric.kind == 'counter':
+                    lines.append(f'{name}{_labels(labels)} {_number(value)}')
+                    continue
+                cumulative = 0
+                bounds = [_number(bound) for bound in metric.buckets] + ['+Inf']
+                for bound, count in zip(bounds, value):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_labels(labels + [("le", bound)])} {cumulative}')
+                lines.append(f'{name}_sum{_labels(labels)} {_number(value[-1])}')
+                lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+REQUESTS = registry.counter(
+    'taskflow_http_requests_total', "Requests by URL name, method and status.", ('view', 'method', 'status')
+)
+REQUEST_SECONDS = registry.histogram(
+    'taskflow_http_request_duration_seconds', "Request latency by URL name.", ('view',)
+)
+TASK_SECONDS = registry.histogram(
+    'taskflow_celery_task_duration_seconds', "Celery task runtime by task and final state.", ('task', 'state')
+)
+SIGNAL_SECONDS = registry.histogram(
+    'taskflow_signal_handler_duration_seconds', "Time spent in instrumented signal receivers.", ('handler',)
+)
+
+
+def timed_receiver(func):
+    """Records each call of a signal receiver in SIGNAL_SECONDS; put it under @receiver."""
+    handler = f'{func.__module__}.{func.__name__}'
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with SIGNAL_SECONDS.time(handler):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+# --- Celery ---
+
+_task_started = {}
+
+
+def _task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_SECONDS.observe(time.perf_counter() - started, task.name, state or 'UNKNOWN')
+
+
+def instrument_celery():
+    from celery.signals import task_postrun, task_prerun  # Local import: only needed with Celery
+
+    task_prerun.connect(_task_prerun, weak=False, dispatch_uid='metrics-task-prerun')
+    task_postrun.connect(_task_postrun, weak=False, dispatch_uid='metrics-task-postrun')
+
+
+# --- Views ---
+
+class MetricsMiddleware:
+    """Counts and times every request under its URL name ('unmatched' for unrouted paths)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self._record(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._record(request, response, started)
+        return response
+
+    def _record(self, request, response, started):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - started, view)
+        REQUESTS.inc(view, request.method, response.status_code)
+
+
+def metrics_view(request):
+    """The text exposition; needs `Authorization: Bearer $METRICS_TOKEN`, or a staff login without a token."""
+    if settings.METRICS_TOKEN:
+        authorized = request.headers.get('Authorization') == f'Bearer {settings.METRICS_TOKEN}'
+    else:
+        authorized = request.user.is_staff
+    if not authorized:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
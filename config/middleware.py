@@ -0,0 +1,186 @@
+"""
+Per-request SQL instrumentation.
+
+QueryInstrumentationMiddleware records, for a sampled share of requests
+(SQL_INSTRUMENTATION_SAMPLE_RATE), every query the request runs: count, total
+database time, repeated statements and the slowest ones. Each sampled response
+gets a header like
+
+    Server-Timing: db;dur=12.4;desc="9 queries"
+
+so the browser's network panel shows database time per request. When a request
+crosses one of the SQL_LOG_* thresholds, one JSON line is logged on
+`config.middleware` at WARNING:
+
+    {"view": "tasks:task_detail", "method": "GET", "path": "/task/12/", "status": 200,
+     "queries": 83, "db_ms": 412.7, "duplicates": [{"sql": ..., "count": 40}, ...],
+     "slowest": [{"sql": ..., "ms": 120.3}, ...], "exceeded": ["queries", "duplicates"]}
+
+The execute wrapper sits on every connection (added as each one opens). It reads
+the request's collector from a context variable, which asgiref carries into the
+ORM threads that async views use. A request that isn't sampled pays for one
+context variable lookup per query.
+"""
+import heapq
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Statements kept for the log line: the slowest and the most repeated
+TOP_STATEMENTS = 3
+# Logged SQL is cut to this many characters
+SQL_LOG_LENGTH = 500
+
+# "IN (%s, %s, %s)" with any number of placeholders is one statement
+_IN_LIST_RE = re.compile(r"\(\s*%s(?:\s*,\s*%s)+\s*\)")
+
+_collector = ContextVar('sql_instrumentation_collector', default=None)
+
+
+def fingerprint(sql):
+    return _IN_LIST_RE.sub("(%s, ...)", sql)
+
+
+class QueryStats:
+    """What one request ran; filled from any thread the request's queries run on."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+        self._slowest = []  # min-heap of (seconds, sql)
+
+    def record(self, sql, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[sql] += 1
+        if len(self._slowest) < TOP_STATEMENTS:
+            heapq.heappush(self._slowest, (seconds, sql))
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (seconds, sql))
+
+    @property
+    def db_ms(self):
+        return self.seconds * 1000
+
+    def slowest(self):
+        return [{'sql': sql[:SQL_LOG_LENGTH], 'ms': round(seconds * 1000, 2)}
+                for seconds, sql in sorted(self._slowest, reverse=True)]
+
+    def duplicates(self):
+        """Statements (by fingerprint) run more than once, most repeated first."""
+        counts = Counter()
+        for sql, count in self.statements.items():
+            counts[fingerprint(sql)] += count
+        return [{'sql': sql[:SQL_LOG_LENGTH], 'count': count}
+                for sql, count in counts.most_common(TOP_STATEMENTS) if count > 1]
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _collector.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record(sql, time.perf_counter() - started)
+
+
+def _install(connection):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    _install(connection)
+
+
+def _install_open_connections():
+    """Connections this thread opened before the middleware was loaded."""
+    for connection in connections.all(initialized_only=True):
+        _install(connection)
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        connection_created.connect(_on_connection_created, dispatch_uid='sql-instrumentation')
+
+    def _sampled(self):
+        rate = settings.SQL_INSTRUMENTATION_SAMPLE_RATE
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+        _install_open_connections()
+        stats = QueryStats()
+        token = _collector.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _collector.reset(token)
+        return self._report(request, response, stats)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+        # On the thread the async ORM runs its queries on
+        await sync_to_async(_install_open_connections)()
+        stats = QueryStats()
+        token = _collector.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _collector.reset(token)
+        return self._report(request, response, stats)
+
+    def _report(self, request, response, stats):
+        if settings.SQL_SERVER_TIMING:
+            response['Server-Timing'] = f'db;dur={stats.db_ms:.1f};desc="{stats.count} queries"'
+
+        exceeded = []
+        if stats.count > settings.SQL_LOG_QUERY_COUNT:
+            exceeded.append('queries')
+        if stats.db_ms > settings.SQL_LOG_DB_MS:
+            exceeded.append('db_ms')
+        duplicates = stats.duplicates()
+        if duplicates and duplicates[0]['count'] >= settings.SQL_LOG_DUPLICATES:
+            exceeded.append('duplicates')
+        slowest = stats.slowest()
+        if slowest and slowest[0]['ms'] > settings.SQL_LOG_SLOW_QUERY_MS:
+            exceeded.append('slow_query')
+        if exceeded:
+            match = getattr(request, 'resolver_match', None)
+            logger.warning("sql %s", json.dumps({
+                'view': match.view_name if match else None,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': stats.count,
+                'db_ms': round(stats.db_ms, 2),
+                'duplicates': duplicates,
+                'slowest': slowest,
+                'exceeded': exceeded,
+            }))
+        return response
@@ -89,8 +89,10 @@ CELERY_REDIS_BACKEND_USE_SSL = {
 }
 
 MIDDLEWARE = [
+    'config.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'config.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -303,5 +305,98 @@ else:
 # settings.py
 PASSWORD_RESET_TIMEOUT = 3600  # Time in seconds (3600s = 1 hour)
 
+# Project rollup on task writes: 'sync' applies O(1) deltas inside the request,
+# 'deferred' only flags the project in Redis and a Celery task recomputes it
+# at most once per debounce window (bulk edits, imports, slider drags).
+PROJECT_ROLLUP_MODE = os.getenv('PROJECT_ROLLUP_MODE', 'sync')
+PROJECT_ROLLUP_DEBOUNCE_SECONDS = int(os.getenv('PROJECT_ROLLUP_DEBOUNCE_SECONDS', '2'))
+
+# Resource dashboard: 0 builds the report live on every hit; N > 0 serves a cached
+# snapshot that Celery beat rebuilds every N seconds.
+RESOURCE_REPORT_SNAPSHOT_SECONDS = int(os.getenv('RESOURCE_REPORT_SNAPSHOT_SECONDS', '0'))
+CELERY_BEAT_SCHEDULE = {}
+if RESOURCE_REPORT_SNAPSHOT_SECONDS:
+    CELERY_BEAT_SCHEDULE['refresh-resource-report'] = {
+        'task': 'accounts.tasks.refresh_resource_report',
+        'schedule': RESOURCE_REPORT_SNAPSHOT_SECONDS,
+    }
+
 CELERY_WORKER_MAX_TASKS_PER_CHILD = 10
-CELERY_WORKER_MAX_MEMORY_PER_CHILD = 100000
\ No newline at end of file
+CELERY_WORKER_MAX_MEMORY_PER_CHILD = 100000
+# Live updates (tasks:event_stream, served under ASGI only): 'memory' fans task events
+# out inside one process (a single ASGI worker); 'redis' publishes them on a channel
+# every worker subscribes to.
+TASK_EVENTS_BACKEND = os.getenv('TASK_EVENTS_BACKEND', 'memory')
+TASK_EVENTS_REDIS_URL = os.getenv('TASK_EVENTS_REDIS_URL', REDIS_URL)
+TASK_EVENTS_CHANNEL = 'taskflow:task-events'
+TASK_EVENTS_KEEPALIVE_SECONDS = 15
+TASK_EVENTS_RETRY_MS = 5000
+
+# 'async' routes the dashboard refresh, status, progress and comment endpoints to
+# tasks/async_views.py (async ORM; serve with config.asgi). 'sync' keeps the WSGI views.
+AJAX_VIEWS_MODE = os.getenv('AJAX_VIEWS_MODE', 'sync')
+
+# Attachment links: signed Cloudinary URLs are cached (tasks/attachment_urls.py) for a bit
+# less than ATTACHMENT_URL_LIFETIME seconds. With CLOUDINARY_AUTH_TOKEN_KEY set, URLs also
+# carry a token that expires after that lifetime.
+ATTACHMENT_URL_LIFETIME = int(os.getenv('ATTACHMENT_URL_LIFETIME', '3600'))
+CLOUDINARY_AUTH_TOKEN_KEY = os.getenv('CLOUDINARY_AUTH_TOKEN_KEY')
+ATTACHMENT_URL_SIGNER = 'tasks.attachment_urls.cloudinary_signer'
+
+# Attachment storage (tasks/storage.py): 'cloudinary' uploads new files to Cloudinary;
+# 'filesystem' keeps them in a Django storage and serves them through
+# tasks:download_attachment (tests, air-gapped installs). That storage is a directory
+# under ATTACHMENT_ROOT, or the STORAGES alias named by ATTACHMENT_STORAGE_ALIAS
+# (e.g. an S3-compatible bucket via django-storages).
+ATTACHMENT_STORAGE = os.getenv('ATTACHMENT_STORAGE', 'cloudinary')
+ATTACHMENT_ROOT = os.getenv('ATTACHMENT_ROOT', str(BASE_DIR / 'media' / 'attachments'))
+ATTACHMENT_STORAGE_ALIAS = os.getenv('ATTACHMENT_STORAGE_ALIAS')
+
+# Chunked uploads (tasks/uploads.py) keep their parts in the storage above, where the
+# Celery worker that assembles them can read them, until a task stores the whole file.
+ATTACHMENT_CHUNK_SIZE = int(os.getenv('ATTACHMENT_CHUNK_SIZE', str(5 * 1024 * 1024)))
+ATTACHMENT_MAX_UPLOAD_SIZE = int(os.getenv('ATTACHMENT_MAX_UPLOAD_SIZE', str(500 * 1024 * 1024)))
+# Unfinished uploads older than this are deleted by tasks.tasks.expire_attachment_uploads
+ATTACHMENT_UPLOAD_EXPIRY_HOURS = 24
+CELERY_BEAT_SCHEDULE['expire-attachment-uploads'] = {
+    'task': 'tasks.tasks.expire_attachment_uploads',
+    'schedule': 60 * 60,
+}
+
+# Attachment processing (tasks/processing.py): after upload a Celery task records size,
+# MIME type and PDF page count, and renders image thumbnails of up to
+# ATTACHMENT_THUMBNAIL_SIZE px next to the original (tasks/storage.py). ATTACHMENT_SCANNER is an
+# optional dotted path to a callable(file) -> bool (True = clean) run first; files it
+# rejects, and while it is set files not scanned yet (pending or failed), can't be downloaded.
+ATTACHMENT_THUMBNAIL_SIZE = 320
+ATTACHMENT_SCANNER = os.getenv('ATTACHMENT_SCANNER')
+# Originals larger than this get metadata only (no thumbnail, no page count)
+ATTACHMENT_PROCESSING_MAX_SIZE = int(os.getenv('ATTACHMENT_PROCESSING_MAX_SIZE', str(50 * 1024 * 1024)))
+
+# Permission checks (accounts/permissions.py) load the requester's role and led/member
+# project ids once per request. N > 0 also caches them for N seconds; membership changes
+# and profile saves invalidate the affected users.
+PERMISSIONS_CACHE_SECONDS = int(os.getenv('PERMISSIONS_CACHE_SECONDS', '0'))
+
+# SQL instrumentation (config/middleware.py): a sampled share of requests gets a
+# Server-Timing db header, and a JSON log line on `config.middleware` when one of the
+# SQL_LOG_* thresholds is exceeded. 0 turns it off, 1 instruments every request.
+SQL_INSTRUMENTATION_SAMPLE_RATE = float(os.getenv('SQL_INSTRUMENTATION_SAMPLE_RATE', '1' if DEBUG else '0.05'))
+SQL_SERVER_TIMING = os.getenv('SQL_SERVER_TIMING', 'True') == 'True'
+SQL_LOG_QUERY_COUNT = int(os.getenv('SQL_LOG_QUERY_COUNT', '50'))
+SQL_LOG_DB_MS = float(os.getenv('SQL_LOG_DB_MS', '500'))
+SQL_LOG_SLOW_QUERY_MS = float(os.getenv('SQL_LOG_SLOW_QUERY_MS', '100'))
+# The same statement (IN lists collapsed) run this many times in one request
+SQL_LOG_DUPLICATES = int(os.getenv('SQL_LOG_DUPLICATES', '10'))
+
+# Prometheus metrics (config/metrics.py) at /metrics/. Scrapers send
+# `Authorization: Bearer $METRICS_TOKEN`; without a token only staff users can read it.
+# Under gunicorn set METRICS_DIR to a directory shared by the workers on the host (and
+# emptied on deploy) so the endpoint sums every process, not just the one that answers.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_SECONDS = int(os.getenv('METRICS_FLUSH_SECONDS', '10'))
+
+# Project / assignee option lists of the task filter bar and TaskForm (tasks/choices.py).
+# Project and team changes expire them; this bounds anything else (e.g. a renamed user).
+CHOICES_CACHE_SECONDS = int(os.getenv('CHOICES_CACHE_SECONDS', '3600'))
@@ -19,6 +19,7 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from accounts import views as account_views
+from config.metrics import metrics_view
 
 
 urlpatterns = [
@@ -28,6 +29,7 @@ urlpatterns = [
     path('', include('tasks.urls')),
     path('projects/', include('projects.urls')),
     path('accounts/', include('accounts.urls')),
+    path('metrics/', metrics_view, name='metrics'),
 
 
 ]
@@ -1,3 +1,13 @@
+"""
+Demo / benchmark data.
+
+    python create_demo_data.py                      # the small hand-written demo set
+    python create_demo_data.py --synthetic          # 50 projects, 500 users, 200k tasks
+    python create_demo_data.py --synthetic --projects 5 --users 40 --tasks 2000
+
+The synthetic set is what tasks/tests/test_benchmark.py seeds (at a smaller size).
+"""
+import argparse
 import os
 import django
 from datetime import datetime, timedelta
@@ -6,283 +16,439 @@ import random
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
 from accounts.models import UserProfile
 from projects.models import Project
-from tasks.models import Task
-
-print("=" * 60)
-print("TaskManager - Demo Data Setup")
-print("=" * 60)
-
-# Clear existing test data (optional - comment out if you want to keep)
-# User.objects.filter(username__startswith='test_').delete()
-
-# ============ Create Users ============
-print("\n📝 Creating test users...")
-
-users_data = [
-    {'username': 'john_dev', 'email': 'john@company.com', 'first_name': 'John', 'last_name': 'Developer', 'role': 'developer'},
-    {'username': 'sarah_dev', 'email': 'sarah@company.com', 'first_name': 'Sarah', 'last_name': 'Developer', 'role': 'developer'},
-    {'username': 'mike_manager', 'email': 'mike@company.com', 'first_name': 'Mike', 'last_name': 'Manager', 'role': 'manager'},
-    {'username': 'lisa_manager', 'email': 'lisa@company.com', 'first_name': 'Lisa', 'last_name': 'Manager', 'role': 'manager'},
-]
-
-created_users = {}
-admin_user = User.objects.get(username='admin')
-
-for user_data in users_data:
-    username = user_data['username']
-    if not User.objects.filter(username=username).exists():
-        user = User.objects.create_user(
-            username=username,
-            email=user_data['email'],
-            password='test@123',
-            first_name=user_data['first_name'],
-            last_name=user_data['last_name']
+from tasks.models import Task, TaskComment, TaskHistory
+
+SYNTHETIC_PREFIX = 'bench'
+
+# Share of synthetic users per role (the rest are developers)
+SYNTHETIC_ROLES = (('admin', 0.02), ('manager', 0.08), ('observer', 0.05))
+
+SYNTHETIC_WORDS = (
+    'api', 'backend', 'frontend', 'billing', 'login', 'report', 'export', 'cache', 'search', 'mobile',
+    'invoice', 'dashboard', 'migration', 'payment', 'email', 'schema', 'deploy', 'docs', 'audit', 'queue',
+)
+
+
+def _rebuild_derived_data(stdout):
+    """bulk_create skips the signals; rebuild everything they maintain."""
+    from projects import membership
+    from tasks import counters, search, tags
+
+    stdout("  ... membership index")
+    membership.rebuild_all()
+    stdout("  ... dashboard counters")
+    counters.rebuild_all()
+    stdout("  ... project rollups")
+    for project in Project.objects.all().iterator():
+        project.recompute_rollup()
+    stdout("  ... tags")
+    task_ids = list(Task.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(task_ids), 5000):
+        tags.sync_task_tags(Task.objects.filter(pk__in=task_ids[start:start + 5000]).only('pk', 'tags'))
+    stdout("  ... search index")
+    search.rebuild_index()
+
+
+def seed_synthetic(projects=50, users=500, tasks=200_000, comments_per_task=1, history_per_task=2,
+                   seed=0, batch_size=5000, stdout=print):
+    """
+    Bulk-seeds a synthetic dataset (users with profiles, projects with teams, tasks
+    with history and comments) and rebuilds the derived tables. Deterministic for
+    a given `seed`. Returns the created admin / manager / developer / observer users.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = make_password('test@123')
+
+    with transaction.atomic():
+        stdout(f"Seeding {users} users...")
+        roles = []
+        for role, share in SYNTHETIC_ROLES:
+            roles += [role] * max(1, int(users * share))
+        roles += ['developer'] * max(1, users - len(roles))
+        User.objects.bulk_create([
+            User(username=f'{SYNTHETIC_PREFIX}_{role}_{i}', email=f'{SYNTHETIC_PREFIX}{i}@example.com',
+                 password=password, first_name=role.title(), last_name=str(i))
+            for i, role in enumerate(roles)
+        ], batch_size=batch_size)
+        people = {role: [] for role in set(roles)}
+        for user in User.objects.filter(username__startswith=f'{SYNTHETIC_PREFIX}_').order_by('pk'):
+            people[user.username.split('_')[1]].append(user)
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, role=role, department='Engineering')
+            for role, members in people.items() for user in members
+        ], batch_size=batch_size)
+        User.objects.filter(pk__in=[u.pk for u in people['admin']]).update(is_staff=True, is_superuser=True)
+
+        stdout(f"Seeding {projects} projects...")
+        admin = people['admin'][0]
+        statuses = ['active'] * 7 + ['on_hold', 'inactive', 'completed']
+        Project.objects.bulk_create([
+            Project(title=f'{SYNTHETIC_PREFIX.title()} Project {i:04d}', description=f'Synthetic project {i}',
+                    status=rng.choice(statuses), created_by=admin, team_lead=rng.choice(people['manager']))
+            for i in range(projects)
+        ], batch_size=batch_size)
+        project_list = list(Project.objects.filter(title__startswith=f'{SYNTHETIC_PREFIX.title()} Project '))
+
+        team_size = max(2, min(len(people['developer']), users // max(projects, 1) * 3))
+        Membership = Project.team_members.through
+        teams = {}
+        rows = []
+        for project in project_list:
+            team = rng.sample(people['developer'], team_size) + [project.team_lead, admin]
+            teams[project.pk] = team
+            rows += [Membership(project_id=project.pk, user_id=user.pk) for user in {u.pk: u for u in team}.values()]
+        Membership.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+
+        stdout(f"Seeding {tasks} tasks...")
+        task_statuses = [code for code, _ in Task.STATUS_CHOICES]
+        priorities = [code for code, _ in Task.PRIORITY_CHOICES]
+        for start in range(0, tasks, batch_size):
+            batch = []
+            for i in range(start, min(start + batch_size, tasks)):
+                project = project_list[i % len(project_list)]
+                status = rng.choice(task_statuses)
+                words = rng.sample(SYNTHETIC_WORDS, 3)
+                batch.append(Task(
+                    title=f'{words[0].title()} {words[1]} task {i}',
+                    description=f'Synthetic task touching {" ".join(words)}.',
+                    project=project,
+                    assigned_to=rng.choice(teams[project.pk]),
+                    assigned_by=project.team_lead,
+                    status=status,
+                    priority=rng.choice(priorities),
+                    progress={'todo': 0, 'completed': 100, 'in_review': 90}.get(status, rng.randrange(10, 90, 5)),
+                    due_date=now + timedelta(days=rng.randint(-30, 60)),
+                    estimated_hours=rng.randint(1, 40),
+                    tags=','.join(rng.sample(SYNTHETIC_WORDS, 2)),
+                ))
+            Task.objects.bulk_create(batch)
+
+        stdout("Seeding history and comments...")
+        labels = dict(Task.STATUS_CHOICES)
+        task_rows = Task.objects.filter(project__in=project_list).values_list('pk', 'project_id', 'status')
+        history, comments = [], []
+        for task_id, project_id, status in task_rows.iterator(chunk_size=batch_size):
+            team = teams[project_id]
+            for _ in range(history_per_task):
+                history.append(TaskHistory(task_id=task_id, old_status=labels['todo'], new_status=labels[status],
+                                           changed_by=rng.choice(team)))
+            for n in range(comments_per_task):
+                comments.append(TaskComment(task_id=task_id, commented_by=rng.choice(team),
+                                            comment=f'Synthetic comment {n} on {rng.choice(SYNTHETIC_WORDS)}'))
+            if len(history) + len(comments) >= batch_size:
+                TaskHistory.objects.bulk_create(history)
+                TaskComment.objects.bulk_create(comments)
+                history, comments = [], []
+        TaskHistory.objects.bulk_create(history)
+        TaskComment.objects.bulk_create(comments)
+
+        stdout("Rebuilding derived data...")
+        _rebuild_derived_data(stdout)
+
+    return {role: members[0] for role, members in people.items()}
+
+
+def create_demo_data():
+    print("=" * 60)
+    print("TaskManager - Demo Data Setup")
+    print("=" * 60)
+
+    # Clear existing test data (optional - comment out if you want to keep)
+    # User.objects.filter(username__startswith='test_').delete()
+
+    # ============ Create Users ============
+    print("\n📝 Creating test users...")
+
+    users_data = [
+        {'username': 'john_dev', 'email': 'john@company.com', 'first_name': 'John', 'last_name': 'Developer', 'role': 'developer'},
+        {'username': 'sarah_dev', 'email': 'sarah@company.com', 'first_name': 'Sarah', 'last_name': 'Developer', 'role': 'developer'},
+        {'username': 'mike_manager', 'email': 'mike@company.com', 'first_name': 'Mike', 'last_name': 'Manager', 'role': 'manager'},
+        {'username': 'lisa_manager', 'email': 'lisa@company.com', 'first_name': 'Lisa', 'last_name': 'Manager', 'role': 'manager'},
+    ]
+
+    created_users = {}
+    admin_user = User.objects.get(username='admin')
+
+    for user_data in users_data:
+        username = user_data['username']
+        if not User.objects.filter(username=username).exists():
+            user = User.objects.create_user(
+                username=username,
+                email=user_data['email'],
+                password='test@123',
+                first_name=user_data['first_name'],
+                last_name=user_data['last_name']
+            )
+            UserProfile.objects.create(user=user, role=user_data['role'], department='Engineering')
+            created_users[username] = user
+            print(f"  ✅ Created user: {username} ({user_data['role']})")
+        else:
+            created_users[username] = User.objects.get(username=username)
+            print(f"  ℹ️  User already exists: {username}")
+
+    # ============ Create Projects ============
+    print("\n📁 Creating projects...")
+
+    projects_data = [
+        {
+            'title': 'Website Redesign',
+            'description': 'Complete redesign of the company website with modern UI/UX',
+            'status': 'active',
+            'team_lead': 'mike_manager',
+            'team_members': ['john_dev', 'sarah_dev'],
+        },
+        {
+            'title': 'Mobile App Development',
+            'description': 'Build a cross-platform mobile application',
+            'status': 'active',
+            'team_lead': 'lisa_manager',
+            'team_members': ['john_dev', 'sarah_dev'],
+        },
+        {
+            'title': 'Database Migration',
+            'description': 'Migrate from legacy database to modern cloud infrastructure',
+            'status': 'in_progress',
+            'team_lead': 'mike_manager',
+            'team_members': ['sarah_dev'],
+        },
+    ]
+
+    created_projects = {}
+    today = datetime.now().date()
+
+    for project_data in projects_data:
+        try:
+            project = Project.objects.create(
+                title=project_data['title'],
+                description=project_data['description'],
+                status=project_data['status'],
+                created_by=admin_user,
+                team_lead=created_users.get(project_data['team_lead']),
+                start_date=today,
+                end_date=today + timedelta(days=60)
+            )
+
+            # Add team members
+            for member_username in project_data['team_members']:
+                project.team_members.add(created_users[member_username])
+
+            created_projects[project_data['title']] = project
+            print(f"  ✅ Created project: {project_data['title']}")
+        except Exception as e:
+            print(f"  ❌ Error creating project {project_data['title']}: {e}")
+
+    # ============ Create Tasks ============
+    print("\n✅ Creating tasks...")
+
+    tasks_data = [
+        # Website Redesign tasks
+        {
+            'title': 'Design Homepage Layout',
+            'description': 'Create wireframes and design mockups for the homepage',
+            'project': 'Website Redesign',
+            'assigned_to': 'john_dev',
+            'status': 'in_progress',
+            'priority': 'high',
+            'progress': 65,
+            'due_days': 7,
+        },
+        {
+            'title': 'Implement Homepage HTML/CSS',
+            'description': 'Convert design mockups to responsive HTML/CSS',
+            'project': 'Website Redesign',
+            'assigned_to': 'sarah_dev',
+            'status': 'todo',
+            'priority': 'high',
+            'progress': 0,
+            'due_days': 14,
+        },
+        {
+            'title': 'Create About Us Page',
+            'description': 'Design and implement the About Us page',
+            'project': 'Website Redesign',
+            'assigned_to': 'john_dev',
+            'status': 'todo',
+            'priority': 'medium',
+            'progress': 0,
+            'due_days': 21,
+        },
+        {
+            'title': 'Setup Contact Form',
+            'description': 'Design and implement contact form with validation',
+            'project': 'Website Redesign',
+            'assigned_to': 'sarah_dev',
+            'status': 'blocked',
+            'priority': 'medium',
+            'progress': 30,
+            'due_days': 10,
+        },
+
+        # Mobile App tasks
+        {
+            'title': 'Design App UI/UX',
+            'description': 'Create comprehensive UI/UX design for mobile app',
+            'project': 'Mobile App Development',
+            'assigned_to': 'sarah_dev',
+            'status': 'in_review',
+            'priority': 'urgent',
+            'progress': 85,
+            'due_days': 3,
+        },
+        {
+            'title': 'Setup Development Environment',
+            'description': 'Setup React Native dev environment and project structure',
+            'project': 'Mobile App Development',
+            'assigned_to': 'john_dev',
+            'status': 'completed',
+            'priority': 'high',
+            'progress': 100,
+            'due_days': 2,
+        },
+        {
+            'title': 'Implement Authentication',
+            'description': 'Implement user authentication and security',
+            'project': 'Mobile App Development',
+            'assigned_to': 'john_dev',
+            'status': 'todo',
+            'priority': 'high',
+            'progress': 0,
+            'due_days': 21,
+        },
+        {
+            'title': 'Create User Dashboard',
+            'description': 'Build main dashboard screen with user data',
+            'project': 'Mobile App Development',
+            'assigned_to': 'sarah_dev',
+            'status': 'todo',
+            'priority': 'medium',
+            'progress': 0,
+            'due_days': 28,
+        },
+
+        # Database Migration tasks
+        {
+            'title': 'Analyze Current Database',
+            'description': 'Document current schema and data structure',
+            'project': 'Database Migration',
+            'assigned_to': 'sarah_dev',
+            'status': 'completed',
+            'priority': 'high',
+            'progress': 100,
+            'due_days': 1,
+        },
+        {
+            'title': 'Design New Database Schema',
+            'description': 'Design optimized schema for cloud infrastructure',
+            'project': 'Database Migration',
+            'assigned_to': 'sarah_dev',
+            'status': 'in_progress',
+            'priority': 'urgent',
+            'progress': 50,
+            'due_days': 5,
+        },
+        {
+            'title': 'Create Migration Scripts',
+            'description': 'Write automated migration scripts',
+            'project': 'Database Migration',
+            'assigned_to': 'john_dev',
+            'status': 'todo',
+            'priority': 'high',
+            'progress': 0,
+            'due_days': 14,
+        },
+        {
+            'title': 'Test Data Integrity',
+            'description': 'Verify data integrity after migration',
+            'project': 'Database Migration',
+            'assigned_to': 'sarah_dev',
+            'status': 'todo',
+            'priority': 'high',
+            'progress': 0,
+            'due_days': 21,
+        },
+    ]
+
+    task_count = 0
+    for task_data in tasks_data:
+        try:
+            project = created_projects.get(task_data['project'])
+            assigned_user = created_users.get(task_data['assigned_to'])
+
+            if project and assigned_user:
+                Task.objects.create(
+                    title=task_data['title'],
+                    description=task_data['description'],
+                    project=project,
+                    assigned_to=assigned_user,
+                    assigned_by=admin_user,
+                    status=task_data['status'],
+                    priority=task_data['priority'],
+                    progress=task_data['progress'],
+                    due_date=datetime.now() + timedelta(days=task_data['due_days']),
+                    estimated_hours=random.randint(4, 40),
+                    tags='development,testing,urgent' if task_data['priority'] in ['urgent', 'high'] else 'development'
+                )
+                task_count += 1
+                print(f"  ✅ Created task: {task_data['title']} → {assigned_user.first_name}")
+        except Exception as e:
+            print(f"  ❌ Error creating task: {e}")
+
+    # ============ Summary ============
+    print("\n" + "=" * 60)
+    print("📊 DEMO DATA SETUP COMPLETE!")
+    print("=" * 60)
+    print(f"\n✅ Users created: {len(created_users)}")
+    print(f"✅ Projects created: {len(created_projects)}")
+    print(f"✅ Tasks created: {task_count}")
+    print("\n" + "=" * 60)
+    print("🔑 TEST CREDENTIALS:")
+    print("=" * 60)
+    print("\nAdmin Account (Full Access):")
+    print("  Username: admin")
+    print("  Password: admin@123")
+
+    print("\nDeveloper Accounts (Can view/update assigned tasks):")
+    for username in ['john_dev', 'sarah_dev']:
+        print(f"  Username: {username}")
+
+    print("\nManager Accounts (Can create projects & assign tasks):")
+    for username in ['mike_manager', 'lisa_manager']:
+        print(f"  Username: {username}")
+
+    print("\n🔗 Access the application:")
+    print("  Dashboard: http://localhost:8000")
+    print("  Tasks: http://localhost:8000/tasks/")
+    print("  Projects: http://localhost:8000/projects/")
+    print("  Admin: http://localhost:8000/admin/")
+
+    print("\n" + "=" * 60)
+    print("Password for all test accounts: test@123")
+    print("=" * 60 + "\n")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Create demo or synthetic benchmark data.")
+    parser.add_argument('--synthetic', action='store_true', help="Bulk-seed the synthetic benchmark dataset.")
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--tasks', type=int, default=200_000)
+    parser.add_argument('--comments-per-task', type=int, default=1)
+    parser.add_argument('--history-per-task', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        seed_synthetic(
+            projects=args.projects, users=args.users, tasks=args.tasks,
+            comments_per_task=args.comments_per_task, history_per_task=args.history_per_task, seed=args.seed,
         )
-        UserProfile.objects.create(user=user, role=user_data['role'], department='Engineering')
-        created_users[username] = user
-        print(f"  ✅ Created user: {username} ({user_data['role']})")
+        print(f"Synthetic data ready. Password for all {SYNTHETIC_PREFIX}_* accounts: test@123")
     else:
-        created_users[username] = User.objects.get(username=username)
-        print(f"  ℹ️  User already exists: {username}")
-
-# ============ Create Projects ============
-print("\n📁 Creating projects...")
-
-projects_data = [
-    {
-        'title': 'Website Redesign',
-        'description': 'Complete redesign of the company website with modern UI/UX',
-        'status': 'active',
-        'team_lead': 'mike_manager',
-        'team_members': ['john_dev', 'sarah_dev'],
-    },
-    {
-        'title': 'Mobile App Development',
-        'description': 'Build a cross-platform mobile application',
-        'status': 'active',
-        'team_lead': 'lisa_manager',
-        'team_members': ['john_dev', 'sarah_dev'],
-    },
-    {
-        'title': 'Database Migration',
-        'description': 'Migrate from legacy database to modern cloud infrastructure',
-        'status': 'in_progress',
-        'team_lead': 'mike_manager',
-        'team_members': ['sarah_dev'],
-    },
-]
-
-created_projects = {}
-today = datetime.now().date()
-
-for project_data in projects_data:
-    try:
-        project = Project.objects.create(
-            title=project_data['title'],
-            description=project_data['description'],
-            status=project_data['status'],
-            created_by=admin_user,
-            team_lead=created_users.get(project_data['team_lead']),
-            start_date=today,
-            end_date=today + timedelta(days=60)
-        )
-        
-        # Add team members
-        for member_username in project_data['team_members']:
-            project.team_members.add(created_users[member_username])
-        
-        created_projects[project_data['title']] = project
-        print(f"  ✅ Created project: {project_data['title']}")
-    except Exception as e:
-        print(f"  ❌ Error creating project {project_data['title']}: {e}")
-
-# ============ Create Tasks ============
-print("\n✅ Creating tasks...")
-
-tasks_data = [
-    # Website Redesign tasks
-    {
-        'title': 'Design Homepage Layout',
-        'description': 'Create wireframes and design mockups for the homepage',
-        'project': 'Website Redesign',
-        'assigned_to': 'john_dev',
-        'status': 'in_progress',
-        'priority': 'high',
-        'progress': 65,
-        'due_days': 7,
-    },
-    {
-        'title': 'Implement Homepage HTML/CSS',
-        'description': 'Convert design mockups to responsive HTML/CSS',
-        'project': 'Website Redesign',
-        'assigned_to': 'sarah_dev',
-        'status': 'todo',
-        'priority': 'high',
-        'progress': 0,
-        'due_days': 14,
-    },
-    {
-        'title': 'Create About Us Page',
-        'description': 'Design and implement the About Us page',
-        'project': 'Website Redesign',
-        'assigned_to': 'john_dev',
-        'status': 'todo',
-        'priority': 'medium',
-        'progress': 0,
-        'due_days': 21,
-    },
-    {
-        'title': 'Setup Contact Form',
-        'description': 'Design and implement contact form with validation',
-        'project': 'Website Redesign',
-        'assigned_to': 'sarah_dev',
-        'status': 'blocked',
-        'priority': 'medium',
-        'progress': 30,
-        'due_days': 10,
-    },
-    
-    # Mobile App tasks
-    {
-        'title': 'Design App UI/UX',
-        'description': 'Create comprehensive UI/UX design for mobile app',
-        'project': 'Mobile App Development',
-        'assigned_to': 'sarah_dev',
-        'status': 'in_review',
-        'priority': 'urgent',
-        'progress': 85,
-        'due_days': 3,
-    },
-    {
-        'title': 'Setup Development Environment',
-        'description': 'Setup React Native dev environment and project structure',
-        'project': 'Mobile App Development',
-        'assigned_to': 'john_dev',
-        'status': 'completed',
-        'priority': 'high',
-        'progress': 100,
-        'due_days': 2,
-    },
-    {
-        'title': 'Implement Authentication',
-        'description': 'Implement user authentication and security',
-        'project': 'Mobile App Development',
-        'assigned_to': 'john_dev',
-        'status': 'todo',
-        'priority': 'high',
-        'progress': 0,
-        'due_days': 21,
-    },
-    {
-        'title': 'Create User Dashboard',
-        'description': 'Build main dashboard screen with user data',
-        'project': 'Mobile App Development',
-        'assigned_to': 'sarah_dev',
-        'status': 'todo',
-        'priority': 'medium',
-        'progress': 0,
-        'due_days': 28,
-    },
-    
-    # Database Migration tasks
-    {
-        'title': 'Analyze Current Database',
-        'description': 'Document current schema and data structure',
-        'project': 'Database Migration',
-        'assigned_to': 'sarah_dev',
-        'status': 'completed',
-        'priority': 'high',
-        'progress': 100,
-        'due_days': 1,
-    },
-    {
-        'title': 'Design New Database Schema',
-        'description': 'Design optimized schema for cloud infrastructure',
-        'project': 'Database Migration',
-        'assigned_to': 'sarah_dev',
-        'status': 'in_progress',
-        'priority': 'urgent',
-        'progress': 50,
-        'due_days': 5,
-    },
-    {
-        'title': 'Create Migration Scripts',
-        'description': 'Write automated migration scripts',
-        'project': 'Database Migration',
-        'assigned_to': 'john_dev',
-        'status': 'todo',
-        'priority': 'high',
-        'progress': 0,
-        'due_days': 14,
-    },
-    {
-        'title': 'Test Data Integrity',
-        'description': 'Verify data integrity after migration',
-        'project': 'Database Migration',
-        'assigned_to': 'sarah_dev',
-        'status': 'todo',
-        'priority': 'high',
-        'progress': 0,
-        'due_days': 21,
-    },
-]
-
-task_count = 0
-for task_data in tasks_data:
-    try:
-        project = created_projects.get(task_data['project'])
-        assigned_user = created_users.get(task_data['assigned_to'])
-        
-        if project and assigned_user:
-            task = Task.objects.create(
-                title=task_data['title'],
-                description=task_data['description'],
-                project=project,
-                assigned_to=assigned_user,
-                assigned_by=admin_user,
-                status=task_data['status'],
-                priority=task_data['priority'],
-                progress=task_data['progress'],
-                due_date=datetime.now() + timedelta(days=task_data['due_days']),
-                estimated_hours=random.randint(4, 40),
-                tags='development,testing,urgent' if task_data['priority'] in ['urgent', 'high'] else 'development'
-            )
-            task_count += 1
-            print(f"  ✅ Created task: {task_data['title']} → {assigned_user.first_name}")
-    except Exception as e:
-        print(f"  ❌ Error creating task: {e}")
-
-# ============ Summary ============
-print("\n" + "=" * 60)
-print("📊 DEMO DATA SETUP COMPLETE!")
-print("=" * 60)
-print(f"\n✅ Users created: {len(created_users)}")
-print(f"✅ Projects created: {len(created_projects)}")
-print(f"✅ Tasks created: {task_count}")
-print("\n" + "=" * 60)
-print("🔑 TEST CREDENTIALS:")
-print("=" * 60)
-print("\nAdmin Account (Full Access):")
-print("  Username: admin")
-print("  Password: admin@123")
-
-print("\nDeveloper Accounts (Can view/update assigned tasks):")
-for username in ['john_dev', 'sarah_dev']:
-    print(f"  Username: {username}")
-
-print("\nManager Accounts (Can create projects & assign tasks):")
-for username in ['mike_manager', 'lisa_manager']:
-    print(f"  Username: {username}")
-
-print("\n🔗 Access the application:")
-print("  Dashboard: http://localhost:8000")
-print("  Tasks: http://localhost:8000/tasks/")
-print("  Projects: http://localhost:8000/projects/")
-print("  Admin: http://localhost:8000/admin/")
-
-print("\n" + "=" * 60)
-print("Password for all test accounts: test@123")
-print("=" * 60 + "\n")
+        create_demo_data()
@@ -0,0 +1,14 @@
+"""
+Gunicorn settings, read from the working directory by every `gunicorn config.wsgi`
+start command (Procfile, render.yaml, compose.yaml, run.sh); command-line flags win.
+
+Threaded workers: a sync worker sends no heartbeat while it streams a response, so a
+long task export (tasks/export.py) would be killed at `timeout`. With gthread the
+worker's main loop keeps notifying the arbiter while a thread streams.
+"""
+import os
+
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from projects import membership
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the materialized project membership / visibility rows (repairs drift)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, action='append', dest='projects',
+                            help="Only rebuild this project id (repeatable).")
+
+    def handle(self, *args, **options):
+        if options['projects']:
+            rows = sum(membership.rebuild_project(pk) for pk in options['projects'])
+        else:
+            rows = membership.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} project membership rows."))
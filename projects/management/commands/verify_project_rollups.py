@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = "Compares each project's stored rollup columns against a full aggregate of its tasks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Rewrite the columns of mismatched projects.")
+
+    def handle(self, *args, **options):
+        mismatched = 0
+        for project in Project.objects.all().iterator():
+            expected = project.aggregate_rollup()
+            stored = {field: getattr(project, field) for field in expected}
+            if stored == expected:
+                continue
+
+            mismatched += 1
+            self.stdout.write(self.style.WARNING(f"[{project.pk}] {project.title}: stored {stored}, actual {expected}"))
+            if options['fix']:
+                project.recompute_rollup()
+
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS("All project rollups match."))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {mismatched} project(s)."))
+        else:
+            self.stdout.write(self.style.ERROR(f"{mismatched} project(s) out of sync; rerun with --fix."))
@@ -0,0 +1,171 @@
+"""
+Maintained project membership / visibility index.
+
+ProjectMembership holds one row per (user, project) the user can see: they lead it,
+are on its team, or have tasks assigned in it. Views scope with
+
+    Task.objects.filter(project_id__in=member_project_ids(user))
+    Project.objects.filter(pk__in=visible_project_ids(user))
+
+which are single indexed semi-joins, so no DISTINCT is needed. Lead and team
+changes rebuild the rows of that one project (and drop the affected users' cached
+permissions); task assignments move a counter.
+`manage.py rebuild_project_memberships` repairs drift.
+
+The team always keeps its core members: the lead, the creator and every superuser
+(projects.signals.enforce_core_membership). The superuser ids are cached until a
+superuser is added, demoted or deleted.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from .models import Project, ProjectMembership
+
+
+# --- Queries ---
+
+def visible_project_ids(user):
+    """Projects the user leads, is a member of, or has tasks assigned in."""
+    return ProjectMembership.objects.filter(user=user).values('project_id')
+
+
+def member_project_ids(user, include_led=False):
+    """Projects on whose team the user is (optionally also the ones they lead)."""
+    rows = ProjectMembership.objects.filter(user=user)
+    flags = Q(is_member=True) | Q(is_lead=True) if include_led else Q(is_member=True)
+    return rows.filter(flags).values('project_id')
+
+
+# --- Core members ---
+
+SUPERUSERS_CACHE_KEY = 'projects:superuser_ids'
+
+
+def superuser_ids():
+    ids = cache.get(SUPERUSERS_CACHE_KEY)
+    if ids is None:
+        ids = frozenset(User.objects.filter(is_superuser=True).values_list('pk', flat=True))
+        cache.set(SUPERUSERS_CACHE_KEY, ids, None)
+    return ids
+
+
+def cached_superuser_ids():
+    """The cached set, or None when nothing is cached (so there's nothing to invalidate)."""
+    return cache.get(SUPERUSERS_CACHE_KEY)
+
+
+def forget_superusers():
+    """Drops the cached ids now and after commit (a concurrent request may re-cache in between)."""
+    cache.delete(SUPERUSERS_CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(SUPERUSERS_CACHE_KEY))
+
+
+def core_member_ids(project):
+    return superuser_ids() | {pk for pk in (project.team_lead_id, project.created_by_id) if pk}
+
+
+# --- Maintenance ---
+
+def forget_permissions(user_ids):
+    """Lead / team changes invalidate the users' cached permission sets (accounts/permissions.py)."""
+    from accounts.permissions import forget  # Local import: accounts.permissions imports projects.models
+
+    forget(user_ids)
+
+
+@transaction.atomic
+def rebuild_project(project_id):
+    """Recomputes every membership row of one project."""
+    from tasks.models import Task  # Local import to avoid circularity
+
+    old_rows = ProjectMembership.objects.filter(project_id=project_id)
+    user_ids = set()
+    if settings.PERMISSIONS_CACHE_SECONDS:
+        # A replaced lead or removed member loses access: their cached sets go too
+        user_ids = set(old_rows.filter(Q(is_lead=True) | Q(is_member=True)).values_list('user_id', flat=True))
+    old_rows.delete()
+    lead_id = Project.objects.filter(pk=project_id).values_list('team_lead_id', flat=True).first()
+    rows = {}
+
+    def row(user_id):
+        if user_id not in rows:
+            rows[user_id] = ProjectMembership(user_id=user_id, project_id=project_id)
+        return rows[user_id]
+
+    if lead_id:
+        row(lead_id).is_lead = True
+    for user_id in Project.team_members.through.objects.filter(project_id=project_id).values_list('user_id', flat=True):
+        row(user_id).is_member = True
+    assigned = (
+        Task.objects.filter(project_id=project_id, assigned_to__isnull=False)
+        .order_by().values_list('assigned_to_id').annotate(n=Count('id'))
+    )
+    for user_id, count in assigned:
+        row(user_id).assigned_task_count = count
+
+    ProjectMembership.objects.bulk_create(rows.values())
+    forget_permissions(user_ids | {user_id for user_id, row in rows.items() if row.is_lead or row.is_member})
+    return len(rows)
+
+
+def rebuild_all():
+    return sum(rebuild_project(pk) for pk in Project.objects.values_list('pk', flat=True))
+
+
+def set_members(pairs, is_member):
+    """Flags (user_id, project_id) pairs as on / off the team after a team_members change."""
+    pairs = set(pairs)
+    if not pairs:
+        return
+    forget_permissions(user_id for user_id, _ in pairs)
+    match = Q()
+    for user_id, project_id in pairs:
+        match |= Q(user_id=user_id, project_id=project_id)
+    rows = ProjectMembership.objects.filter(match)
+    rows.update(is_member=is_member)
+    if not is_member:
+        rows.filter(is_lead=False, assigned_task_count__lte=0).delete()
+        return
+    missing = pairs - set(rows.values_list('user_id', 'project_id'))
+    if missing:
+        # ignore_conflicts + re-flag: a concurrent assignment may have created the row meanwhile
+        ProjectMembership.objects.bulk_create(
+            [ProjectMembership(user_id=user_id, project_id=project_id, is_member=True) for user_id, project_id in missing],
+            ignore_conflicts=True,
+        )
+        ProjectMembership.objects.filter(match, is_member=False).update(is_member=True)
+
+
+def _bump_assignment(user_id, project_id, delta):
+    rows = ProjectMembership.objects.filter(user_id=user_id, project_id=project_id)
+    if rows.update(assigned_task_count=F('assigned_task_count') + delta):
+        if delta < 0:
+            # Last assigned task gone and no team role left: the project drops out of view
+            rows.filter(is_lead=False, is_member=False, assigned_task_count__lte=0).delete()
+        return
+    if delta <= 0 or not Project.objects.filter(pk=project_id).exists():
+        return
+    try:
+        with transaction.atomic():
+            ProjectMembership.objects.create(user_id=user_id, project_id=project_id, assigned_task_count=delta)
+    except IntegrityError:
+        # A concurrent writer created it first
+        rows.update(assigned_task_count=F('assigned_task_count') + delta)
+
+
+def apply_assignment_change(old, new):
+    """
+    Moves one task's assignment from its `old` tracked values to its `new` ones.
+    Either side may be None (create / delete). Edits that keep the assignee cost nothing.
+    """
+    old_key = (old['assigned_to_id'], old['project_id']) if old else None
+    new_key = (new['assigned_to_id'], new['project_id']) if new else None
+    if old_key == new_key:
+        return
+    if old_key and old_key[0]:
+        _bump_assignment(*old_key, -1)
+    if new_key and new_key[0]:
+        _bump_assignment(*new_key, 1)
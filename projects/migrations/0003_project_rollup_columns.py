@@ -0,0 +1,50 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:28
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def populate_rollups(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('tasks', 'Task')
+
+    grouped = (
+        Task.objects.order_by().values('project_id').annotate(
+            n=Count('id'),
+            progress=Sum('progress'),
+            open_n=Count('id', filter=~Q(status='completed')),
+        )
+    )
+    for row in grouped:
+        Project.objects.filter(pk=row['project_id']).update(
+            task_count=row['n'],
+            progress_sum=row['progress'] or 0,
+            open_task_count=row['open_n'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_overall_progress'),
+        ('tasks', '0007_dashboardcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='open_task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='progress_sum',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_memberships(apps, schema_editor):
+    """Initial fill; mirrors projects.membership.rebuild_project on the historical models."""
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('tasks', 'Task')
+    ProjectMembership = apps.get_model('projects', 'ProjectMembership')
+
+    rows = {}
+
+    def row(user_id, project_id):
+        key = (user_id, project_id)
+        if key not in rows:
+            rows[key] = ProjectMembership(user_id=user_id, project_id=project_id)
+        return rows[key]
+
+    for project_id, lead_id in Project.objects.filter(team_lead__isnull=False).values_list('pk', 'team_lead_id'):
+        row(lead_id, project_id).is_lead = True
+    for project_id, user_id in Project.team_members.through.objects.values_list('project_id', 'user_id'):
+        row(user_id, project_id).is_member = True
+    assigned = (
+        Task.objects.filter(assigned_to__isnull=False).order_by()
+        .values_list('assigned_to_id', 'project_id').annotate(n=Count('id'))
+    )
+    for user_id, project_id, count in assigned:
+        row(user_id, project_id).assigned_task_count = count
+
+    ProjectMembership.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_rollup_columns'),
+        ('tasks', '0009_searchterm'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_lead', models.BooleanField(default=False)),
+                ('is_member', models.BooleanField(default=False)),
+                ('assigned_task_count', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='projects.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'project'), name='unique_project_membership')],
+            },
+        ),
+        migrations.RunPython(populate_memberships, migrations.RunPython.noop),
+    ]
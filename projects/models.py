@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save, m2m_changed
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from django.db.models import Avg
+from django.db.models import Count, F, Q, Sum
+
+from config.metrics import timed_receiver
 
 class Project(models.Model):
     """Project model for organizing tasks"""
@@ -24,6 +27,13 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     overall_progress = models.IntegerField(default=0)
+    # Running rollup of the project's tasks, maintained by sync_project_status
+    task_count = models.IntegerField(default=0)
+    progress_sum = models.BigIntegerField(default=0)
+    open_task_count = models.IntegerField(default=0)
+
+    # Fields the post_save receivers diff against (status moves, lead changes, search index)
+    TRACKED_FIELDS = ('status', 'team_lead_id', 'title', 'description')
 
     class Meta:
         ordering = ['-created_at']
@@ -32,9 +42,79 @@ class Project(models.Model):
             models.Index(fields=['-created_at']),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance.tracked_values()
+        return instance
+
+    def tracked_values(self):
+        """Current values of TRACKED_FIELDS (deferred fields are left out)."""
+        return {f: self.__dict__[f] for f in self.TRACKED_FIELDS if f in self.__dict__}
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and len(getattr(self, '_loaded_values', {})) < len(self.TRACKED_FIELDS):
+            self._loaded_values = Project.objects.filter(pk=self.pk).values(*self.TRACKED_FIELDS).first() or {}
+        super().save(*args, **kwargs)
+        self._loaded_values = self.tracked_values()
+
     def __str__(self):
         return self.title
 
+    def aggregate_rollup(self):
+        """The rollup columns as a full scan of the project's tasks computes them."""
+        stats = self.tasks.aggregate(
+            task_count=Count('id'),
+            progress_sum=Sum('progress'),
+            open_task_count=Count('id', filter=~Q(status='completed')),
+        )
+        stats['progress_sum'] = stats['progress_sum'] or 0
+        return stats
+
+    def recompute_rollup(self):
+        """Rebuilds the rollup columns from a full aggregate (imports, bulk edits, repairs)."""
+        for field, value in self.aggregate_rollup().items():
+            setattr(self, field, value)
+        self.save(update_fields=['task_count', 'progress_sum', 'open_task_count'])
+        self.sync_rollup_status()
+
+    def sync_rollup_status(self):
+        """Derives overall_progress and the auto-complete status from the rollup columns."""
+        new_progress = round(self.progress_sum / self.task_count) if self.task_count else 0
+
+        # Rule B: Don't wake up 'on_hold' or 'inactive' projects
+        new_status = self.status
+        if self.status not in ['on_hold', 'inactive']:
+            new_status = 'completed' if not self.open_task_count else 'active'
+
+        # Dirty check: title-only task edits never reach here, and unchanged values don't save.
+        if self.overall_progress != new_progress or self.status != new_status:
+            self.overall_progress = new_progress
+            self.status = new_status
+            self.save(update_fields=['status', 'overall_progress'])
+
+
+class ProjectMembership(models.Model):
+    """
+    Materialized "who can see this project" index, maintained by projects/signals.py.
+    A row exists while the user leads the project, is on its team or has tasks
+    assigned in it, so access checks are one indexed semi-join instead of an
+    OR over the team_members join plus DISTINCT.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_memberships')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='memberships')
+    is_lead = models.BooleanField(default=False)
+    is_member = models.BooleanField(default=False)
+    assigned_task_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'project'], name='unique_project_membership'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.project_id}"
+
 # --- Signals ---
 
 @receiver(post_save, sender=User)
@@ -92,26 +172,87 @@ def handle_user_profile(sender, instance, created, **kwargs):
 #     #     project.save(update_fields=['status'])
 
 
+ROLLUP_FIELDS = ('project_id', 'status', 'progress')
+
+
+def _rollup_state(values):
+    """The part of a task's tracked values the rollup depends on."""
+    return {f: values[f] for f in ROLLUP_FIELDS} if values else None
+
+
+def _rollup_contribution(state):
+    """(task_count, progress_sum, open_task_count) one task adds to its project."""
+    return 1, state['progress'] or 0, int(state['status'] != 'completed')
+
+
+def apply_rollup_change(old, new, project=None):
+    """
+    Moves one task's contribution from its old tracked values to its new ones with
+    F() updates, so a write costs O(1) regardless of project size.
+    `project` is the in-memory instance to refresh (views read its status afterwards).
+    """
+    deltas = {}
+    for state, sign in ((old, -1), (new, 1)):
+        if not state:
+            continue
+        delta = deltas.setdefault(state['project_id'], [0, 0, 0])
+        for i, value in enumerate(_rollup_contribution(state)):
+            delta[i] += sign * value
+
+    for project_id, (count, progress, open_count) in deltas.items():
+        if not (count or progress or open_count):
+            continue
+        updated = Project.objects.filter(pk=project_id).update(
+            task_count=F('task_count') + count,
+            progress_sum=F('progress_sum') + progress,
+            open_task_count=F('open_task_count') + open_count,
+        )
+        if not updated:
+            continue
+        if project is not None and project.pk == project_id:
+            project.refresh_from_db(fields=['status', 'overall_progress', 'task_count', 'progress_sum', 'open_task_count'])
+            project.sync_rollup_status()
+        else:
+            Project.objects.get(pk=project_id).sync_rollup_status()
+
+
+def defer_rollup_change(old, new):
+    """Deferred mode: only flag the touched projects; projects.tasks recomputes them later."""
+    from .tasks import mark_project_dirty  # Local import to avoid circularity
+
+    for project_id in {state['project_id'] for state in (old, new) if state}:
+        mark_project_dirty(project_id)
+
+
 @receiver(post_save, sender='tasks.Task')
-def sync_project_status(sender, instance, **kwargs):
-    project = instance.project
-    if not project:
+@timed_receiver
+def sync_project_status(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = None if created else _rollup_state(getattr(instance, '_loaded_values', None))
+    new = _rollup_state(instance.tracked_values())
+    if old == new:
+        # e.g. a title edit: the rollup can't have changed
         return
+    if settings.PROJECT_ROLLUP_MODE == 'deferred':
+        defer_rollup_change(old, new)
+        return
+    project = instance.project if sender.project.is_cached(instance) else None
+    apply_rollup_change(old, new, project)
 
-    # 1. ALWAYS calculate the latest progress values
-    stats = project.tasks.aggregate(avg=Avg('progress'))
-    new_progress = stats['avg'] or 0
 
-    # 2. Status Logic (Rule B: Don't wake up 'on_hold' or 'inactive' projects)
-    new_status = project.status  # Start with the current status
-    if project.status not in ['on_hold', 'inactive']:
-        has_uncompleted_tasks = project.tasks.exclude(status='completed').exists()
-        new_status = 'completed' if not has_uncompleted_tasks else 'active'
-    
-    # 3. THE DIRTY CHECK (The Performance Hero)
-    # We only call .save() if the status OR the progress has actually changed.
-    # If someone just changed a task name, this 'if' will be False, and we save a DB hit.
-    if project.overall_progress != new_progress or project.status != new_status:
-        project.overall_progress = new_progress
-        project.status = new_status
-        project.save(update_fields=['status', 'overall_progress'])
\ No newline at end of file
+@receiver(post_delete, sender='tasks.Task')
+def remove_from_project_rollup(sender, instance, origin=None, **kwargs):
+    from tasks.bulk import from_bulk_delete  # Local import to avoid circularity
+
+    if isinstance(origin, Project):
+        # The whole project is going away with its tasks
+        return
+    if from_bulk_delete(origin):
+        # tasks.bulk recomputes each touched project once afterwards
+        return
+    old = _rollup_state(getattr(instance, '_loaded_values', None) or instance.tracked_values())
+    if settings.PROJECT_ROLLUP_MODE == 'deferred':
+        defer_rollup_change(old, None)
+        return
+    apply_rollup_change(old, None)
@@ -1,19 +1,22 @@
-from django.db.models.signals import m2m_changed, post_save
+from contextvars import ContextVar
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
+from config.metrics import timed_receiver
 from .models import Project
+from . import membership
 from django.contrib.auth.models import User
+from django.db.models import Q
+from tasks.bulk import from_bulk_delete
+from tasks.models import Task
 
 @receiver(post_save, sender=Project)
 def add_core_members_on_create(sender, instance, created, **kwargs):
-    """Initial add when the project is first created."""
+    """Initial add when the project is first created: lead, creator and superusers, in one insert."""
     if created:
-        # 1. Add the Team Lead (Manager)
-        if instance.team_lead:
-            instance.team_members.add(instance.team_lead)
-
-        # 2. Add the Creator (Admin) - Moved outside the team_lead block
-        if hasattr(instance, 'created_by') and instance.created_by:
-            instance.team_members.add(instance.created_by)
+        core = membership.core_member_ids(instance)
+        if core:
+            instance.team_members.add(*core)
 
 # @receiver(m2m_changed, sender=Project.team_members.through)
 # def enforce_core_membership(sender, instance, action, **kwargs):
@@ -46,31 +49,99 @@ def add_core_members_on_create(sender, instance, created, **kwargs):
 #             instance.team_members.add(*to_add)
 
 
+# --- Membership / visibility index (see projects/membership.py) ---
+
+@receiver(post_save, sender=Project)
+def sync_membership_lead(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = {} if created else getattr(instance, '_loaded_values', {})
+    if old.get('team_lead_id') != instance.team_lead_id:
+        membership.rebuild_project(instance.pk)
+
+
+@receiver(m2m_changed, sender=Project.team_members.through)
+def sync_membership_team(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_clear':
+        if reverse:
+            # user.projects_assigned.clear(): drop the member flag everywhere
+            project_ids = instance.project_memberships.filter(is_member=True).values_list('project_id', flat=True)
+            membership.set_members([(instance.pk, pk) for pk in project_ids], False)
+        else:
+            membership.rebuild_project(instance.pk)
+    elif action in ('post_add', 'post_remove'):
+        if reverse:
+            pairs = [(instance.pk, project_id) for project_id in pk_set]
+        else:
+            pairs = [(user_id, instance.pk) for user_id in pk_set]
+        membership.set_members(pairs, action == 'post_add')
+
+
+@receiver(post_save, sender=Task)
+def sync_membership_assignment(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = None if created else getattr(instance, '_loaded_values', None)
+    membership.apply_assignment_change(old, instance.tracked_values())
+
+
+@receiver(post_delete, sender=Task)
+def remove_membership_assignment(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Project) or from_bulk_delete(origin):
+        # The project's membership rows cascade away with it (or tasks.bulk rebuilds them)
+        return
+    membership.apply_assignment_change(getattr(instance, '_loaded_values', None) or instance.tracked_values(), None)
+
+
+# --- Core members (lead, creator, superusers) stay on the team ---
+
+# Set while enforce_core_membership re-adds members, so its own post_add is skipped
+_enforcing = ContextVar('enforcing_core_membership', default=False)
+
+
+# Connected after sync_membership_team: the re-add's post_add then updates the membership
+# index after the removal that triggered it, not before.
 @receiver(m2m_changed, sender=Project.team_members.through)
-def enforce_core_membership(sender, instance, action, pk_set, **kwargs):
-    # Only run on actions that could potentially leave the list without core members
-    if action in ["post_add", "post_remove", "post_clear"]:
-        
-        # 1. Identify Protected Pks
-        protected_pks = set()
-        if instance.team_lead:
-            protected_pks.add(instance.team_lead.pk)
-        if instance.created_by:
-            protected_pks.add(instance.created_by.pk)
-        
-        superusers = User.objects.filter(is_superuser=True).values_list('pk', flat=True)
-        protected_pks.update(superusers)
-
-        # 2. Check current state
-        current_members = set(instance.team_members.values_list('pk', flat=True))
-        missing_pks = protected_pks - current_members
-
-        # 3. THE FIX: Only call .add() if there's actually something missing
-        if missing_pks:
-            # Disconnect to prevent the post_add loop
-            m2m_changed.disconnect(enforce_core_membership, sender=Project.team_members.through)
-            
-            instance.team_members.add(*missing_pks)
-            
-            # Reconnect
-            m2m_changed.connect(enforce_core_membership, sender=Project.team_members.through)
\ No newline at end of file
+@timed_receiver
+def enforce_core_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Re-adds core members removed from a team. Only the removed pks are checked against
+    the protected set, which comes from the project's own fields and the cached
+    superuser ids; adding members can't take a core member away, so post_add is free.
+    """
+    if action not in ('post_remove', 'post_clear') or _enforcing.get():
+        return
+    if reverse:
+        # user.projects_assigned.remove(...) / .clear(): instance is the User
+        projects = Project.objects.all() if action == 'post_clear' else Project.objects.filter(pk__in=pk_set)
+        if instance.pk not in membership.superuser_ids():
+            projects = projects.filter(Q(team_lead=instance) | Q(created_by=instance))
+        restore = list(projects.values_list('pk', flat=True))
+        manager = instance.projects_assigned
+    else:
+        protected = membership.core_member_ids(instance)
+        restore = list(protected if action == 'post_clear' else protected & pk_set)
+        manager = instance.team_members
+    if restore:
+        token = _enforcing.set(True)
+        try:
+            manager.add(*restore)
+        finally:
+            _enforcing.reset(token)
+
+
+@receiver(post_save, sender=User)
+def forget_superusers_on_save(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and 'is_superuser' not in update_fields):
+        # e.g. the last_login update on every login
+        return
+    cached = membership.cached_superuser_ids()
+    if cached is not None and instance.is_superuser != (instance.pk in cached):
+        membership.forget_superusers()
+
+
+@receiver(post_delete, sender=User)
+def forget_superusers_on_delete(sender, instance, **kwargs):
+    cached = membership.cached_superuser_ids()
+    if cached is not None and instance.pk in cached:
+        membership.forget_superusers()
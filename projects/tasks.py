@@ -0,0 +1,45 @@
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_DIRTY_KEY = 'project-rollup-dirty:{}'
+
+
+def mark_project_dirty(project_id):
+    """
+    Deferred rollup mode: after commit, flags the project in the cache (Redis) and
+    schedules one recompute per debounce window. Every further mark inside the window
+    is a no-op, so a burst of task saves costs a single aggregate.
+    """
+    window = settings.PROJECT_ROLLUP_DEBOUNCE_SECONDS
+
+    def schedule():
+        # Flagged only once the write commits, so a rolled-back save can't hold back the next
+        # one's recompute. The flag outlives the window a little so a slow worker doesn't
+        # cause a second schedule.
+        if not cache.add(ROLLUP_DIRTY_KEY.format(project_id), 1, timeout=window + 60):
+            return
+        try:
+            recompute_project_rollup.apply_async(args=[project_id], countdown=window)
+        except Exception:
+            # Broker down: don't lose the update, pay for it inline instead.
+            logger.exception("Could not schedule rollup for project %s; recomputing inline", project_id)
+            recompute_project_rollup(project_id)
+
+    transaction.on_commit(schedule)
+
+
+@shared_task
+def recompute_project_rollup(project_id):
+    """Recomputes a dirty project's rollup columns and status from one full aggregate."""
+    from .models import Project  # Local import: projects.models imports this module lazily
+
+    # Clear the flag first so saves landing during the aggregate schedule a follow-up.
+    cache.delete(ROLLUP_DIRTY_KEY.format(project_id))
+    project = Project.objects.filter(pk=project_id).first()
+    if project:
+        project.recompute_rollup()
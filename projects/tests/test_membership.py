@@ -0,0 +1,146 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from projects import membership
+from projects.models import Project, ProjectMembership
+from tasks.models import Task
+
+
+class ProjectMembershipTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pass')
+        self.lead = User.objects.create_user(username='lead', password='pass')
+        self.member = User.objects.create_user(username='member', password='pass')
+        self.outsider = User.objects.create_user(username='outsider', password='pass')
+        for user, role in ((self.admin, 'admin'), (self.lead, 'manager'),
+                           (self.member, 'developer'), (self.outsider, 'developer')):
+            user.profile.role = role
+            user.profile.save()
+        self.project = Project.objects.create(title="ACL", team_lead=self.lead, created_by=self.admin)
+        self.project.team_members.add(self.member)
+
+    def rows(self):
+        return {
+            (row.user.username, row.is_lead, row.is_member, row.assigned_task_count)
+            for row in ProjectMembership.objects.filter(project=self.project).select_related('user')
+        }
+
+    def assertMatchesRebuild(self):
+        maintained = self.rows()
+        membership.rebuild_project(self.project.pk)
+        self.assertEqual(maintained, self.rows())
+
+    def test_create_and_team_changes(self):
+        self.assertEqual(self.rows(), {
+            ('lead', True, True, 0), ('admin', False, True, 0), ('member', False, True, 0),
+        })
+        self.project.team_members.remove(self.member)
+        self.assertNotIn('member', {row[0] for row in self.rows()})
+        self.project.team_members.add(self.outsider)
+        self.assertIn(('outsider', False, True, 0), self.rows())
+        self.assertMatchesRebuild()
+
+    def test_lead_change(self):
+        self.project.team_lead = self.outsider
+        self.project.save()
+        self.assertIn(('outsider', True, False, 0), self.rows())
+        self.assertIn(('lead', False, True, 0), self.rows())
+        self.assertMatchesRebuild()
+
+    def test_assignment_grants_and_revokes_visibility(self):
+        task = Task.objects.create(title="T", project=self.project, assigned_to=self.outsider, assigned_by=self.lead)
+        self.assertIn(('outsider', False, False, 1), self.rows())
+        task.assigned_to = self.member
+        task.save()
+        self.assertNotIn('outsider', {row[0] for row in self.rows()})
+        self.assertIn(('member', False, True, 1), self.rows())
+        task.delete()
+        self.assertIn(('member', False, True, 0), self.rows())
+        self.assertMatchesRebuild()
+
+    def test_clear(self):
+        self.project.team_members.clear()
+        self.assertMatchesRebuild()
+
+    def test_project_list_has_no_distinct(self):
+        Task.objects.create(title="T", project=self.project, assigned_to=self.outsider, assigned_by=self.lead)
+        other = Project.objects.create(title="Hidden", created_by=self.admin)
+        self.client.login(username='outsider', password='pass')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('projects:project_list'))
+        self.assertEqual([p.title for p in response.context['projects']], ["ACL"])
+        self.assertFalse([q for q in ctx.captured_queries if 'DISTINCT' in q['sql']])
+        self.assertEqual(self.client.get(reverse('projects:project_detail', args=[other.pk])).status_code, 404)
+
+    def test_task_list_scope(self):
+        Task.objects.create(title="Team task", project=self.project, assigned_by=self.lead)
+        self.client.login(username='member', password='pass')
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertEqual([t.title for t in response.context['tasks']], ["Team task"])
+        self.client.login(username='outsider', password='pass')
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertEqual(list(response.context['tasks']), [])
+
+    def test_rebuild_command(self):
+        ProjectMembership.objects.all().delete()
+        call_command('rebuild_project_memberships', stdout=StringIO())
+        self.assertEqual(len(self.rows()), 3)
+
+
+class CoreMembershipTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.root = User.objects.create_superuser(username='root', password='pass')
+        self.creator = User.objects.create_user(username='creator', password='pass')
+        self.lead = User.objects.create_user(username='lead', password='pass')
+        self.member = User.objects.create_user(username='member', password='pass')
+        self.project = Project.objects.create(title="Core", team_lead=self.lead, created_by=self.creator)
+        self.project.team_members.add(self.member)
+        self.core = {self.root.pk, self.creator.pk, self.lead.pk}
+
+    def team(self):
+        return set(self.project.team_members.values_list('pk', flat=True))
+
+    def test_core_members_are_restored(self):
+        self.assertEqual(self.team(), self.core | {self.member.pk})
+        self.project.team_members.remove(self.lead, self.member)
+        self.assertEqual(self.team(), self.core)
+        self.project.team_members.clear()
+        self.assertEqual(self.team(), self.core)
+        # The index sees the re-add after the removal
+        self.assertTrue(ProjectMembership.objects.get(project=self.project, user=self.lead).is_member)
+
+    def test_reverse_changes(self):
+        self.lead.projects_assigned.remove(self.project)
+        self.member.projects_assigned.clear()
+        self.root.projects_assigned.clear()
+        self.assertEqual(self.team(), self.core)
+
+    def test_only_the_removed_pks_are_checked(self):
+        new = User.objects.create_user(username='new', password='pass')
+        with CaptureQueriesContext(connection) as ctx:
+            self.project.team_members.add(new)
+            self.project.team_members.remove(new)
+        # Only the m2m write and the membership index; no superuser or full team reads
+        self.assertFalse([q for q in ctx.captured_queries if '"auth_user"' in q['sql']])
+        with self.assertNumQueries(0):
+            self.assertEqual(membership.core_member_ids(self.project), self.core)
+
+    def test_superuser_cache_follows_changes(self):
+        self.member.is_superuser = True
+        self.member.save()
+        self.assertEqual(membership.superuser_ids(), {self.root.pk, self.member.pk})
+        self.root.delete()
+        self.assertEqual(membership.superuser_ids(), {self.member.pk})
+        with self.assertNumQueries(2):  # the user and its profile
+            self.member.save(update_fields=['last_login'])
+            self.assertEqual(membership.superuser_ids(), {self.member.pk})
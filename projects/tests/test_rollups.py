@@ -0,0 +1,126 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from projects.models import Project
+from projects.tasks import ROLLUP_DIRTY_KEY, recompute_project_rollup
+from tasks.models import Task
+
+
+class ProjectRollupTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pass')
+        self.project = Project.objects.create(title="Rollup", status='active', created_by=self.admin)
+        self.first = Task.objects.create(title="A", project=self.project, assigned_by=self.admin, progress=0)
+        self.second = Task.objects.create(title="B", project=self.project, assigned_by=self.admin, progress=50,
+                                          status='in_progress')
+
+    def assertRollupMatchesAggregate(self):
+        self.project.refresh_from_db()
+        stored = {field: getattr(self.project, field) for field in ('task_count', 'progress_sum', 'open_task_count')}
+        self.assertEqual(stored, self.project.aggregate_rollup())
+
+    def test_progress_change_updates_overall_progress(self):
+        self.first.progress = 30
+        self.first.save()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.overall_progress, 40)
+        self.assertRollupMatchesAggregate()
+
+    def test_completing_every_task_completes_project(self):
+        for task in (self.first, self.second):
+            task.status, task.progress = 'completed', 100
+            task.save()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.status, 'completed')
+        self.assertEqual(self.project.overall_progress, 100)
+
+    def test_on_hold_project_is_not_woken_up(self):
+        self.project.status = 'on_hold'
+        self.project.save()
+        self.first.progress = 100
+        self.first.save()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.status, 'on_hold')
+        self.assertRollupMatchesAggregate()
+
+    def test_title_only_save_does_not_touch_project(self):
+        self.first.title = "Renamed"
+        with CaptureQueriesContext(connection) as ctx:
+            self.first.save()
+        self.assertFalse([q for q in ctx.captured_queries if 'projects_project' in q['sql']])
+
+    def test_delete_and_move_between_projects(self):
+        other = Project.objects.create(title="Other", status='active', created_by=self.admin)
+        self.second.project = other
+        self.second.save()
+        self.first.delete()
+        self.assertRollupMatchesAggregate()
+        other.refresh_from_db()
+        self.assertEqual((other.task_count, other.progress_sum, other.overall_progress), (1, 50, 50))
+
+    def test_verify_command_reports_and_fixes_drift(self):
+        Project.objects.filter(pk=self.project.pk).update(task_count=7)
+        out = StringIO()
+        call_command('verify_project_rollups', stdout=out)
+        self.assertIn('out of sync', out.getvalue())
+
+        call_command('verify_project_rollups', '--fix', stdout=StringIO())
+        self.assertRollupMatchesAggregate()
+
+
+@override_settings(PROJECT_ROLLUP_MODE='deferred', PROJECT_ROLLUP_DEBOUNCE_SECONDS=5)
+class DeferredRollupTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin', password='pass')
+        self.project = Project.objects.create(title="Deferred", status='active', created_by=self.admin)
+
+    def test_burst_of_saves_schedules_one_recompute(self):
+        with patch('projects.tasks.recompute_project_rollup.apply_async') as schedule, \
+                self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(title="A", project=self.project, assigned_by=self.admin)
+            for progress in range(5, 55):
+                task.progress = progress
+                task.save()
+
+        schedule.assert_called_once_with(args=[self.project.pk], countdown=5)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.task_count, 0)  # nothing applied inside the request
+
+        recompute_project_rollup(self.project.pk)
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.task_count, self.project.progress_sum), (1, 54))
+
+    def test_recompute_clears_flag_so_next_write_reschedules(self):
+        with patch('projects.tasks.recompute_project_rollup.apply_async') as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                task = Task.objects.create(title="A", project=self.project, assigned_by=self.admin)
+            recompute_project_rollup(self.project.pk)
+            with self.captureOnCommitCallbacks(execute=True):
+                task.progress = 20
+                task.save()
+        self.assertEqual(schedule.call_count, 2)
+
+    def test_rolled_back_write_does_not_flag_the_project(self):
+        with patch('projects.tasks.recompute_project_rollup.apply_async') as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        Task.objects.create(title="Lost", project=self.project, assigned_by=self.admin)
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+            self.assertFalse(cache.get(ROLLUP_DIRTY_KEY.format(self.project.pk)))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Task.objects.create(title="Kept", project=self.project, assigned_by=self.admin)
+        schedule.assert_called_once_with(args=[self.project.pk], countdown=5)
@@ -6,7 +6,11 @@ from django.urls import reverse_lazy
 from django.db import transaction
 from django.db.models import Q, Avg, Count, Case, When, IntegerField
 from django.contrib.auth.models import User 
+from accounts.permissions import permissions_for
 from .models import Project
+from .membership import visible_project_ids
+from tasks.mixins import RequestCachedObjectMixin
+from tasks.search import project_search_filter
 from .forms import ProjectForm
 from django.http import JsonResponse
 from django.template.loader import render_to_string
@@ -67,20 +71,20 @@ class ProjectListView(LoginRequiredMixin, ListView):
         # UPDATED: Allow both 'admin' and 'observer' to see all projects
         if user.profile.role not in ['admin','observer']:
             # queryset = queryset.filter(Q(team_members=user) | Q(tasks__assigned_to=user))
-            queryset = queryset.filter(Q(team_lead=user) | Q(team_members=user) | Q(tasks__assigned_to=user))
+            queryset = queryset.filter(pk__in=visible_project_ids(user))
 
         # 3. Handle Search and Filtering
         query = self.request.GET.get('q', '').strip()
         status_val = self.request.GET.get('status', '').strip().lower()
 
         if query:
-            queryset = queryset.filter(Q(title__icontains=query) | Q(description__icontains=query))
+            queryset = queryset.filter(project_search_filter(query))
         
         if status_val:
             queryset = queryset.filter(status=status_val)
 
-        # 4. Optimization: Prefetch and distinct are vital for ManyToMany filtering
-        return queryset.prefetch_related('team_members').distinct().order_by('-created_at')
+        # 4. Optimization: the membership semi-join can't duplicate rows, so no DISTINCT
+        return queryset.prefetch_related('team_members').order_by('-created_at')
 
     def render_to_response(self, context, **response_kwargs):
         if self.request.headers.get('x-requested-with') == 'XMLHttpRequest':
@@ -90,7 +94,7 @@ class ProjectListView(LoginRequiredMixin, ListView):
         return super().render_to_response(context, **response_kwargs)
 
 
-class ProjectDetailView(LoginRequiredMixin, DetailView):
+class ProjectDetailView(LoginRequiredMixin, RequestCachedObjectMixin, DetailView):
     model = Project
     template_name = 'projects/project_detail.html'
     context_object_name = 'project'
@@ -106,9 +110,7 @@ class ProjectDetailView(LoginRequiredMixin, DetailView):
         # return Project.objects.filter(
         #     Q(team_members=user) | Q(team_lead=user)
         # ).distinct()
-        return Project.objects.filter(
-            Q(team_members=user) | Q(team_lead=user) |Q(tasks__assigned_to=user)
-        ).distinct()
+        return Project.objects.filter(pk__in=visible_project_ids(user))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -137,7 +139,7 @@ class ProjectCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     template_name = 'projects/project_form.html'
 
     def test_func(self):
-        return self.request.user.profile.role in ['admin', 'manager']
+        return permissions_for(self.request).can_create_project()
 
     def form_valid(self, form):
         form.instance.created_by = self.request.user
@@ -161,18 +163,16 @@ class ProjectCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         kwargs['user'] = self.request.user # Pass the logged-in user to the form
         return kwargs
 
-class ProjectUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class ProjectUpdateView(LoginRequiredMixin, UserPassesTestMixin, RequestCachedObjectMixin, UpdateView):
     model = Project
+    object_select_related = ('team_lead',)
     form_class = ProjectForm
     template_name = 'projects/project_form.html'
 
     def test_func(self):
-        # Rights: Only Leads/Managers/Admins
-        if self.request.user.profile.role == 'observer':
-            return False
-
-        project = self.get_object()
-        return self.request.user.profile.role in ['admin', 'manager'] or project.team_lead == self.request.user
+        # Rights: Only Leads/Managers/Admins, never observers (refused before the project is loaded)
+        perms = permissions_for(self.request)
+        return not perms.is_observer and perms.can_edit_project(self.get_object())
 
     def get_success_url(self):
         return reverse_lazy('projects:project_detail', kwargs={'pk': self.object.pk})
@@ -182,12 +182,12 @@ class ProjectUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         kwargs['user'] = self.request.user # Pass the logged-in user to the form
         return kwargs
 
-class ProjectDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class ProjectDeleteView(LoginRequiredMixin, UserPassesTestMixin, RequestCachedObjectMixin, DeleteView):
     model = Project
     success_url = reverse_lazy('projects:project_list')
 
     def test_func(self):
-        return self.request.user.profile.role in ['admin', 'manager']
+        return permissions_for(self.request).can_delete_project()
 
     def post(self, request, *args, **kwargs):
         self.object = self.get_object()
@@ -0,0 +1,177 @@
+"""
+ASGI-native variants of the hot AJAX endpoints (settings.AJAX_VIEWS_MODE = 'async').
+
+Same URLs, permissions and JSON as their tasks.views counterparts, written against
+the async ORM, so a slow database round trip suspends the request instead of
+holding a worker thread. Serve them under config.asgi; under WSGI every request
+would pay for an event loop hop instead. Signal receivers (counters, rollups,
+search, live events) still run inside asave(), on the request's ORM thread.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+from django.shortcuts import aget_object_or_404, redirect
+from django.template.loader import render_to_string
+
+from accounts.models import UserProfile
+from accounts.permissions import Permissions, apermissions_for
+from . import views
+from .bulk import apply_progress, apply_status
+from .counters import aread_dashboard_stats
+from .forms import TaskCommentForm
+from .mixins import TASK_RELATED
+from .models import Task, TaskComment, TaskHistory
+
+
+def _is_ajax(request):
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest'
+
+
+async def _requester(request):
+    """request.auser() with its profile loaded, so role checks don't query lazily."""
+    user = await request.auser()
+    user.profile = await UserProfile.objects.aget(user_id=user.pk)
+    # Templates rendered for this request read request.user.profile too
+    request.user = user
+    return user
+
+
+async def _get_task(pk):
+    try:
+        return await Task.objects.select_related(*TASK_RELATED).aget(pk=pk)
+    except Task.DoesNotExist:
+        raise Http404("No Task matches the given query.")
+
+
+@login_required
+async def dashboard(request):
+    """The dashboard's AJAX refresh; the full page still renders through views.dashboard."""
+    if not _is_ajax(request):
+        return await sync_to_async(views.dashboard)(request)
+
+    user = await _requester(request)
+    view_mode = request.GET.get('view', 'personal')
+    search_query = request.GET.get('q', '').strip()
+
+    is_privileged, project_pool, tasks_qs, my_blocked_tasks = views.dashboard_pools(user, view_mode, search_query)
+    proj_stats = await project_pool.aaggregate(**views.PROJECT_POOL_STATS)
+    if search_query:
+        stats = await tasks_qs.aaggregate(**views.SEARCH_POOL_STATS)
+        stats['blocked_tasks_count'] = await my_blocked_tasks.acount()
+        stats['projects_with_blocked_tasks'] = await my_blocked_tasks.values('project').distinct().acount()
+    else:
+        stats = await aread_dashboard_stats(user, is_privileged, view_mode)
+
+    recent_tasks = [task async for task in views.recent_dashboard_tasks(tasks_qs, search_query)]
+    # The rows template follows relations lazily; render it where the ORM may block
+    html = await sync_to_async(render_to_string)('tasks/includes/dashboard_table_rows.html', {
+        'recent_tasks': recent_tasks,
+        'view_mode': view_mode,
+    }, request=request)
+    return views.dashboard_json(html, stats, proj_stats)
+
+
+@login_required
+async def update_task_status(request, pk):
+    task = await _get_task(pk)
+    user = await _requester(request)
+    if not (await apermissions_for(request, user)).can_change_status(task):
+        return JsonResponse({'status': 'error', 'message': 'Not authorized.'}, status=403)
+
+    if request.method == 'POST':
+        new_status = request.POST.get('status')
+        if new_status in dict(Task.STATUS_CHOICES) and new_status != task.status:
+            old_label = task.get_status_display()
+            apply_status(task, new_status)
+            await task.asave()
+            await TaskHistory.objects.acreate(
+                task=task, old_status=old_label, new_status=task.get_status_display(), changed_by=user
+            )
+
+            if _is_ajax(request):
+                return JsonResponse({
+                    'status': 'success',
+                    'new_status': task.get_status_display(),
+                    'progress': task.progress,
+                    'log_user': user.username,
+                    'log_old': old_label,
+                    'log_new': task.get_status_display(),
+                    'project_status': task.project.status,
+                    'log_time': "just now"
+                })
+            messages.success(request, f'Status updated to {task.get_status_display()}.')
+    return redirect('tasks:task_detail', pk=pk)
+
+
+@login_required
+async def update_progress(request, pk):
+    task = await _get_task(pk)
+    user = await _requester(request)
+    if not (await apermissions_for(request, user)).can_change_status(task):
+        return JsonResponse({'status': 'error', 'message': 'Permission denied'}, status=403)
+
+    if request.method == 'POST':
+        old_status_label = task.get_status_display()
+        old_status = task.status
+        val = int(request.POST.get('progress', 0))
+        apply_progress(task, val)
+        await task.asave()
+
+        log_data = {}
+        if task.status != old_status:
+            await TaskHistory.objects.acreate(
+                task=task, old_status=old_status_label, new_status=task.get_status_display(), changed_by=user
+            )
+            log_data = {
+                'log_user': user.username,
+                'log_old': old_status_label,
+                'log_new': task.get_status_display(),
+                'log_time': "just now"
+            }
+
+        if _is_ajax(request):
+            return JsonResponse({
+                'status': 'success',
+                'progress': val,
+                'new_status': task.get_status_display(),
+                # Maintained by the project rollup on save
+                'overall_completion': task.project.overall_progress,
+                **log_data,
+            })
+        messages.success(request, f'Progress updated to {val}%.')
+    return redirect('tasks:task_detail', pk=pk)
+
+
+@login_required
+async def add_comment(request, pk):
+    task = await _get_task(pk)
+    # Needs neither the role nor the memberships, so nothing to load first
+    if not Permissions(request.user).can_comment(task):
+        if _is_ajax(request):
+            return JsonResponse({'status': 'error', 'message': 'Project is locked.'}, status=403)
+        messages.error(request, "Comments are disabled for locked projects.")
+        return redirect('tasks:task_detail', pk=pk)
+
+    if request.method == 'POST':
+        form = TaskCommentForm(request.POST)
+        if form.is_valid():
+            user = await request.auser()
+            comment = form.save(commit=False)
+            comment.task = task
+            comment.commented_by = user
+            parent_id = request.POST.get('parent_id')
+            if parent_id:
+                comment.parent = await aget_object_or_404(TaskComment, id=parent_id)
+            await comment.asave()
+
+            if _is_ajax(request):
+                return JsonResponse({
+                    'status': 'success',
+                    'id': comment.pk,
+                    'user': user.username,
+                    'comment': comment.comment,
+                    'is_reply': bool(comment.parent),
+                    'parent_id': parent_id
+                })
+    return redirect('tasks:task_detail', pk=pk)
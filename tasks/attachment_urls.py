@@ -0,0 +1,102 @@
+"""
+Signed Cloudinary URLs for attachments, cached.
+
+download_attachment, add_attachment and every render of the detail page's file
+list used to sign the same URLs again. URLs are cached per attachment, kind and
+Cloudinary version (a replaced file gets a new version, so a new key) for a bit
+less than ATTACHMENT_URL_LIFETIME, and a page resolves its whole file list with
+one get_many / set_many.
+
+    view     -> inline delivery URL (previews, the eye button)
+    download -> fl_attachment URL that saves under the original file name
+
+The signer is settings.ATTACHMENT_URL_SIGNER, a callable (attachment, kind) -> url,
+so tests can swap in a stub and run offline.
+"""
+import logging
+
+from cloudinary.utils import cloudinary_url
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+URL_KINDS = ('view', 'download')
+
+# Cached URLs are dropped this long before their signature would expire
+URL_EXPIRY_MARGIN = 60
+
+
+def _token_options():
+    # Token-authenticated delivery: the URL itself expires after the lifetime
+    if settings.CLOUDINARY_AUTH_TOKEN_KEY:
+        return {'auth_token': {'key': settings.CLOUDINARY_AUTH_TOKEN_KEY, 'duration': settings.ATTACHMENT_URL_LIFETIME}}
+    return {}
+
+
+def cloudinary_signer(attachment, kind):
+    """Signs locally with the Cloudinary SDK (no API call)."""
+    resource = attachment.file
+    if kind == 'view':
+        return resource.build_url(secure=True, sign_url=True, **_token_options())
+    url, _ = cloudinary_url(
+        resource.public_id,
+        resource_type=resource.resource_type,
+        flags="attachment",
+        attachment=attachment.file_name,
+        secure=True,
+        sign_url=True,
+        **_token_options(),
+    )
+    return url
+
+
+def cache_key(attachment, kind):
+    version = getattr(attachment.file, 'version', None) or ''
+    return f"attachment-url:{kind}:{attachment.pk}:{version}"
+
+
+def cache_timeout():
+    return max(settings.ATTACHMENT_URL_LIFETIME - URL_EXPIRY_MARGIN, 0)
+
+
+def attachment_urls(attachments, kind='download'):
+    """
+    {attachment pk: url} for many attachments: cached URLs in one read, the rest
+    signed and stored in one write. An attachment the signer fails on gets its
+    plain storage URL, which is not cached. Attachments kept on the filesystem
+    backend (tasks/storage.py) link to tasks:download_attachment instead.
+    """
+    from .storage import get_backend  # Local import: tasks.storage imports this module
+
+    urls = {}
+    keys = {}
+    for attachment in attachments:
+        if attachment.storage == 'cloudinary':
+            keys[cache_key(attachment, kind)] = attachment
+        else:
+            # Served by tasks:download_attachment; nothing to sign
+            urls[attachment.pk] = get_backend(attachment.storage).url(attachment, kind)
+    if not keys:
+        return urls
+    cached = cache.get_many(list(keys))
+    urls.update({keys[key].pk: url for key, url in cached.items()})
+
+    sign = import_string(settings.ATTACHMENT_URL_SIGNER)
+    signed = {}
+    for key, attachment in keys.items():
+        if key in cached:
+            continue
+        try:
+            urls[attachment.pk] = signed[key] = sign(attachment, kind)
+        except Exception:
+            logger.exception("Could not sign the %s URL of attachment %s", kind, attachment.pk)
+            urls[attachment.pk] = attachment.file.url
+    if signed:
+        cache.set_many(signed, cache_timeout())
+    return urls
+
+
+def attachment_url(attachment, kind='download'):
+    return attachment_urls([attachment], kind)[attachment.pk]
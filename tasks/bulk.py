@@ -0,0 +1,222 @@
+"""
+Bulk task actions for the task inventory (tasks:bulk_action).
+
+Applying a status, assignee or priority to hundreds of tasks through the single-task
+views costs a save, a history insert, a counter delta, a membership delta and a
+project rollup per task. Here the rows are written with one bulk_update (plus one
+bulk_create of TaskHistory), and every derived structure is rebuilt once per
+affected project afterwards. The permission rules are the single-task views' rules.
+"""
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.permissions import Permissions
+from projects import membership
+from projects.models import Project
+from . import counters, events, tags
+from .models import Task, TaskHistory
+
+BULK_ACTIONS = ('status', 'assignee', 'priority', 'delete')
+
+# Upper bound of one request; the inventory never selects more than a few pages
+MAX_BULK_TASKS = 1000
+
+# Which derived data each action invalidates
+_REBUILDS = {
+    'status': {'counters', 'rollup'},
+    'assignee': {'counters', 'membership'},
+    'priority': set(),
+    'delete': {'counters', 'membership', 'rollup'},
+}
+
+
+class BulkActionError(ValueError):
+    """The action or its value is invalid for the whole request."""
+
+
+class BulkResult:
+    def __init__(self, action, changed=(), skipped=()):
+        self.action = action
+        self.changed = list(changed)
+        self.skipped = list(skipped)
+
+
+def from_bulk_delete(origin):
+    """post_delete receivers skip per-row work for deletes made by apply_bulk_action."""
+    return getattr(origin, 'bulk_maintained', False)
+
+
+def apply_status(task, new_status):
+    """Sets the status and the progress it forces (same rules as update_task_status)."""
+    if new_status == 'completed':
+        task.progress = 100
+    elif new_status == 'todo':
+        task.progress = 0
+    elif new_status == 'in_review':
+        task.progress = 90
+    elif new_status == 'in_progress' and task.status in ['completed', 'todo']:
+        # "Re-open" logic: jump back to a working state
+        task.progress = 10
+    task.status = new_status
+
+
+def apply_progress(task, progress):
+    """Sets the progress and the status the slider pattern implies (same rules as update_progress)."""
+    new_status = task.status
+    if progress == 100:
+        new_status = 'completed'
+    elif progress == 0:
+        if task.status != 'blocked':  # Blocked can be 0% without being Todo
+            new_status = 'todo'
+    elif progress == 90:
+        new_status = 'in_review'
+    elif task.status in ['todo', 'completed']:
+        # Any other movement (10-85%) forces In Progress if it was Todo/Done
+        new_status = 'in_progress'
+    task.status = new_status
+    task.progress = progress
+
+
+# --- Permissions (the single-task views' checks, accounts/permissions.py) ---
+
+_PERMISSIONS = {
+    'status': Permissions.can_change_status,
+    'assignee': Permissions.can_edit_fields,
+    'priority': Permissions.can_edit_fields,
+    'delete': Permissions.can_delete,
+}
+
+
+def _allowed_assignees(perms, project_ids):
+    """{project_id: user ids} the TaskForm would offer for each project."""
+    rows = Project.team_members.through.objects.filter(project_id__in=project_ids)
+    if not perms.is_privileged:
+        # Non-privileged users can't assign superusers (TaskForm hides them)
+        rows = rows.exclude(user__is_superuser=True)
+    allowed = defaultdict(set)
+    for project_id, user_id in rows.values_list('project_id', 'user_id'):
+        allowed[project_id].add(user_id)
+    return allowed
+
+
+def assignee_options(perms):
+    """
+    Users the toolbar offers as assignees: the teams of the projects whose tasks the
+    user can see (every team for privileged roles), under _allowed_assignees' rules.
+    """
+    rows = Project.team_members.through.objects.all()
+    if not perms.is_privileged:
+        rows = rows.filter(project_id__in=membership.visible_project_ids(perms.user)).exclude(user__is_superuser=True)
+    return User.objects.filter(pk__in=rows.values('user_id')).only('id', 'username').order_by('username')
+
+
+def _clean_value(action, value):
+    if action == 'status':
+        if value not in dict(Task.STATUS_CHOICES):
+            raise BulkActionError(f"Unknown status: {value!r}")
+        return value
+    if action == 'priority':
+        if value not in dict(Task.PRIORITY_CHOICES):
+            raise BulkActionError(f"Unknown priority: {value!r}")
+        return value
+    if action == 'assignee':
+        if value in (None, ''):
+            return None  # Unassign
+        try:
+            return User.objects.only('pk').get(pk=int(value)).pk
+        except (ValueError, User.DoesNotExist):
+            raise BulkActionError(f"Unknown user: {value!r}")
+    return None
+
+
+@transaction.atomic
+def apply_bulk_action(user, task_ids, action, value=None, permissions=None):
+    """
+    Applies `action` to the tasks `user` may change and skips the rest.
+    Returns a BulkResult; raises BulkActionError for an invalid action or value.
+    `permissions` is the request's loaded Permissions, if there is one.
+    """
+    perms = permissions or Permissions(user)
+    if action not in BULK_ACTIONS:
+        raise BulkActionError(f"Unknown action: {action!r}")
+    if len(task_ids) > MAX_BULK_TASKS:
+        raise BulkActionError(f"At most {MAX_BULK_TASKS} tasks per request.")
+    value = _clean_value(action, value)
+
+    tasks = list(
+        Task.objects.select_related('project').filter(pk__in=task_ids).select_for_update(of=('self',))
+    )
+    permitted = _PERMISSIONS[action]
+    selected = [task for task in tasks if permitted(perms, task)]
+    selected_ids = {task.pk for task in selected}
+    skipped = [task.pk for task in tasks if task.pk not in selected_ids]
+
+    if action == 'assignee' and value is not None:
+        allowed = _allowed_assignees(perms, {task.project_id for task in selected})
+        skipped += [task.pk for task in selected if value not in allowed[task.project_id]]
+        selected = [task for task in selected if value in allowed[task.project_id]]
+
+    changed = _apply(user, selected, action, value)
+    _rebuild_derived_data(action, changed)
+    return BulkResult(action, [task.pk for task in changed], skipped)
+
+
+def _apply(user, tasks, action, value):
+    """Writes the change; returns the tasks that actually changed."""
+    if action == 'delete':
+        if tasks:
+            queryset = Task.objects.filter(pk__in=[task.pk for task in tasks])
+            queryset.bulk_maintained = True
+            queryset.delete()
+        return tasks
+
+    field = {'status': 'status', 'assignee': 'assigned_to_id', 'priority': 'priority'}[action]
+    changed = [task for task in tasks if getattr(task, field) != value]
+    if not changed:
+        return changed
+
+    now = timezone.now()
+    history = []
+    before = {task.pk: (task.status, task.progress) for task in changed}
+    for task in changed:
+        task.updated_at = now  # bulk_update skips auto_now
+        if action == 'status':
+            old_label = task.get_status_display()
+            apply_status(task, value)
+            history.append(TaskHistory(
+                task=task, old_status=old_label, new_status=task.get_status_display(), changed_by=user,
+            ))
+        else:
+            setattr(task, field, value)
+
+    fields = ['status', 'progress'] if action == 'status' else [field]
+    Task.objects.bulk_update(changed, fields + ['updated_at'], batch_size=500)
+    TaskHistory.objects.bulk_create(history, batch_size=500)
+    for task in changed:
+        task._loaded_values = task.tracked_values()
+        # bulk_update sends no post_save: publish what publish_task_change would have
+        old_status, old_progress = before[task.pk]
+        if old_status != task.status:
+            events.publish_on_commit(events.task_event('status', task))
+        elif old_progress != task.progress:
+            events.publish_on_commit(events.task_event('progress', task))
+    return changed
+
+
+def _rebuild_derived_data(action, tasks):
+    """Rebuilds counters / memberships / rollups once per project the change touched."""
+    rebuilds = _REBUILDS[action]
+    project_ids = sorted({task.project_id for task in tasks})
+    for project_id in project_ids:
+        if 'counters' in rebuilds:
+            counters.rebuild_project(project_id)
+        if 'membership' in rebuilds:
+            membership.rebuild_project(project_id)
+    if 'rollup' in rebuilds:
+        for project in Project.objects.filter(pk__in=project_ids):
+            project.recompute_rollup()
+    if action == 'delete' and any(task.tags for task in tasks):
+        tags.bump_tag_cloud_version()
@@ -0,0 +1,104 @@
+"""
+Cached option lists for the task filter bar and TaskForm.
+
+TaskFilter used to run two DISTINCT OR-joins (the user's projects, and everyone
+sharing one of them) on every task list request, AJAX keystrokes included, and
+TaskForm re-read the project's team for every form. The lists now come from the cache:
+
+    project_choices(user)     [(pk, title)]: projects the user leads or is on the team of
+    assignee_choices(user)    [(pk, username)]: the teams and leads of those projects
+    team_choices(project_id)  [(pk, username, is_superuser)]: the project's team
+
+The per-user lists are keyed by a version that any project save, delete or team change
+bumps (projects change far less often than the task list is filtered); a project's team
+list is dropped when that project changes. CHOICES_CACHE_SECONDS bounds the rest (a
+renamed user, say). use_choices() renders such a list on a ModelChoiceField; the field's
+queryset is then only read to validate a submitted value.
+"""
+import time
+
+from django import forms
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from projects.membership import member_project_ids
+from projects.models import Project, ProjectMembership
+
+CHOICES_VERSION_KEY = 'task-choices-version'
+TEAM_KEY = 'task-choices:team:{}'
+
+
+def bump_choices_version():
+    # A timestamp rather than incr(), as in tasks/tags.py
+    cache.set(CHOICES_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def forget_choices(project_ids=()):
+    """After a project or team change: now, and again after commit (a request may re-cache in between)."""
+    keys = [TEAM_KEY.format(pk) for pk in project_ids]
+
+    def expire():
+        bump_choices_version()
+        cache.delete_many(keys)
+
+    expire()
+    transaction.on_commit(expire)
+
+
+def _cached(key, build):
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, settings.CHOICES_CACHE_SECONDS)
+    return value
+
+
+def _user_key(kind, user):
+    version = cache.get_or_set(CHOICES_VERSION_KEY, time.time_ns, timeout=None)
+    return f'task-choices:{kind}:{user.pk}:{version}'
+
+
+def user_projects(user):
+    """Projects the user leads or is on the team of."""
+    return Project.objects.filter(pk__in=member_project_ids(user, include_led=True))
+
+
+def user_assignees(user):
+    """The teams and leads of user_projects(user)."""
+    shared = ProjectMembership.objects.filter(
+        Q(is_member=True) | Q(is_lead=True), project_id__in=member_project_ids(user, include_led=True)
+    )
+    return User.objects.filter(pk__in=shared.values('user_id'))
+
+
+def project_choices(user):
+    return _cached(_user_key('projects', user), lambda: list(user_projects(user).values_list('pk', 'title')))
+
+
+def assignee_choices(user):
+    return _cached(_user_key('assignees', user), lambda: list(
+        user_assignees(user).order_by('username').values_list('pk', 'username')
+    ))
+
+
+def team_choices(project_id):
+    return _cached(TEAM_KEY.format(project_id), lambda: list(
+        Project.team_members.through.objects.filter(project_id=project_id)
+        .order_by('user__username')
+        .values_list('user_id', 'user__username', 'user__is_superuser')
+    ))
+
+
+def use_choices(field, queryset, choices):
+    """
+    Points a ModelChoiceField at `queryset`, which is only read to validate a submitted
+    value, and renders the options returned by the `choices` callable ([(pk, label)])
+    instead of iterating the queryset. Nothing is loaded until the field is rendered.
+    """
+    field.queryset = queryset
+    empty = [('', field.empty_label)] if field.empty_label is not None else []
+    # The plain ChoiceField setter: django-filter's field would wrap the list in a ModelChoiceIterator
+    forms.ChoiceField.choices.fset(field, lambda: empty + list(choices()))
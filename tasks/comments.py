@@ -0,0 +1,76 @@
+"""
+Threaded comment loading for the task detail page.
+
+All comments of a task come back in one query (authors joined), and the
+parent/child tree is assembled in memory, so rendering a thread costs the same
+whether it has three replies or three hundred.
+"""
+from .models import TaskComment
+
+
+class CommentNode:
+    """A comment plus its direct replies, oldest first."""
+    __slots__ = ('comment', 'children', 'depth')
+
+    def __init__(self, comment, depth=0):
+        self.comment = comment
+        self.children = []
+        self.depth = depth
+
+    @property
+    def replies(self):
+        """Every reply below this node, depth-first (the template renders one reply level)."""
+        replies = []
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            replies.append(node)
+            stack.extend(reversed(node.children))
+        return replies
+
+
+class CommentTree:
+    """Root nodes of a task's discussion and the total number of comments."""
+
+    def __init__(self, roots, count):
+        self.roots = roots
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.roots)
+
+    def __len__(self):
+        return self.count
+
+
+def build_comment_tree(comments):
+    """CommentTree from already-loaded comments; a reply whose parent is missing becomes a root."""
+    comments = list(comments)
+    nodes = {comment.pk: CommentNode(comment) for comment in comments}
+    roots = []
+    for comment in comments:
+        node = nodes[comment.pk]
+        parent = nodes.get(comment.parent_id)
+        if parent is None:
+            roots.append(node)
+        else:
+            parent.children.append(node)
+
+    # Depths are fixed up afterwards: a parent may sort after its reply on equal timestamps
+    stack = [(root, 0) for root in roots]
+    while stack:
+        node, depth = stack.pop()
+        node.depth = depth
+        stack.extend((child, depth + 1) for child in node.children)
+    return CommentTree(roots, len(comments))
+
+
+def load_comment_tree(task):
+    """The discussion of `task` (a Task or its pk) in one query."""
+    task_id = getattr(task, 'pk', task)
+    comments = (
+        TaskComment.objects.filter(task_id=task_id)
+        .select_related('commented_by')
+        .order_by('created_at', 'pk')
+    )
+    return build_comment_tree(comments)
@@ -0,0 +1,218 @@
+"""
+Maintained dashboard counters.
+
+Every DashboardCounter row holds how many tasks (and their summed progress) one
+audience sees in one project with one task status. The audiences mirror the
+task pools the dashboard used to aggregate on every hit:
+
+    all      -> user=None, every task (admin / manager pool)
+    personal -> tasks assigned to the user
+    team     -> tasks in projects the user leads or is a member of
+    watch    -> tasks assigned to the user or in projects they lead (blocked card)
+
+Task saves/deletes apply +1/-1 deltas, project status moves rewrite the
+denormalized project_status column, and membership/lead changes rebuild the
+rows of that one project. `manage.py rebuild_dashboard_counters` repairs drift.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from projects.models import Project
+from .models import DashboardCounter, Task
+
+# The part of Task.TRACKED_FIELDS the counters depend on
+COUNTER_FIELDS = ('project_id', 'assigned_to_id', 'status', 'progress')
+
+
+def _counter_state(values):
+    return {f: values[f] for f in COUNTER_FIELDS} if values else None
+
+
+def _project_audience(project_id):
+    """Returns (project_status, team_lead_id, team user ids) or None if the project is gone."""
+    row = Project.objects.filter(pk=project_id).values_list('status', 'team_lead_id').first()
+    if row is None:
+        return None
+    status, lead_id = row
+    team = set(
+        Project.team_members.through.objects.filter(project_id=project_id).values_list('user_id', flat=True)
+    )
+    if lead_id:
+        team.add(lead_id)
+    return status, lead_id, team
+
+
+def _audience_keys(assignee_id, lead_id, team_ids):
+    """(user_id, scope) pairs that see a task with this assignee in this project."""
+    keys = [(None, 'all')]
+    if assignee_id:
+        keys.append((assignee_id, 'personal'))
+    keys.extend((user_id, 'team') for user_id in team_ids)
+    keys.extend((user_id, 'watch') for user_id in {assignee_id, lead_id} - {None})
+    return keys
+
+
+def _match(keys):
+    match = Q()
+    for user_id, scope in keys:
+        match |= Q(user_id=user_id, scope=scope)
+    return match
+
+
+def _bump(project_id, project_status, task_status, keys, count, progress):
+    """Adds count/progress to the given rows, creating the ones that don't exist yet."""
+    rows = DashboardCounter.objects.filter(_match(keys), project_id=project_id, task_status=task_status)
+    updated = rows.update(task_count=F('task_count') + count, progress_sum=F('progress_sum') + progress)
+
+    # Removals never create rows: a missing row there means drift (or a cascade
+    # delete of the project), which the rebuild command is for.
+    if updated >= len(keys) or count <= 0:
+        return
+
+    existing = set(rows.values_list('user_id', 'scope'))
+    missing = [key for key in keys if key not in existing]
+    try:
+        with transaction.atomic():
+            DashboardCounter.objects.bulk_create([
+                DashboardCounter(
+                    user_id=user_id, scope=scope, project_id=project_id,
+                    project_status=project_status, task_status=task_status,
+                    task_count=count, progress_sum=progress,
+                )
+                for user_id, scope in missing
+            ])
+    except IntegrityError:
+        # A concurrent writer created them first; add our delta on top.
+        DashboardCounter.objects.filter(_match(missing), project_id=project_id, task_status=task_status).update(
+            task_count=F('task_count') + count, progress_sum=F('progress_sum') + progress
+        )
+
+
+def apply_task_change(old, new):
+    """
+    Moves one task's contribution from its `old` tracked values to its `new` ones.
+    Either side may be None (create / delete). Title-only edits cost nothing.
+    """
+    old, new = _counter_state(old), _counter_state(new)
+    if old == new:
+        return
+
+    audiences = {}
+    deltas = defaultdict(lambda: [0, 0])
+    for state, sign in ((old, -1), (new, 1)):
+        if not state:
+            continue
+        project_id = state['project_id']
+        if project_id not in audiences:
+            audiences[project_id] = _project_audience(project_id)
+        audience = audiences[project_id]
+        if audience is None:
+            continue
+        _, lead_id, team_ids = audience
+        for key in _audience_keys(state['assigned_to_id'], lead_id, team_ids):
+            delta = deltas[(project_id, state['status'], key)]
+            delta[0] += sign
+            delta[1] += sign * (state['progress'] or 0)
+
+    # Group rows sharing the same delta so each (project, status) costs one UPDATE.
+    batches = defaultdict(list)
+    for (project_id, task_status, key), (count, progress) in deltas.items():
+        if count or progress:
+            batches[(project_id, task_status, count, progress)].append(key)
+
+    for (project_id, task_status, count, progress), keys in batches.items():
+        _bump(project_id, audiences[project_id][0], task_status, keys, count, progress)
+
+
+def set_project_status(project_id, status):
+    DashboardCounter.objects.filter(project_id=project_id).update(project_status=status)
+
+
+@transaction.atomic
+def rebuild_project(project_id):
+    """Recomputes every counter row of one project from a single GROUP BY."""
+    DashboardCounter.objects.filter(project_id=project_id).delete()
+    audience = _project_audience(project_id)
+    if audience is None:
+        return 0
+    project_status, lead_id, team_ids = audience
+
+    totals = defaultdict(lambda: [0, 0])
+    grouped = (
+        Task.objects.filter(project_id=project_id)
+        .order_by()
+        .values('assigned_to_id', 'status')
+        .annotate(n=Count('id'), progress=Sum('progress'))
+    )
+    for row in grouped:
+        for key in _audience_keys(row['assigned_to_id'], lead_id, team_ids):
+            total = totals[(row['status'],) + key]
+            total[0] += row['n']
+            total[1] += row['progress'] or 0
+
+    DashboardCounter.objects.bulk_create([
+        DashboardCounter(
+            user_id=user_id, scope=scope, project_id=project_id,
+            project_status=project_status, task_status=task_status,
+            task_count=count, progress_sum=progress,
+        )
+        for (task_status, user_id, scope), (count, progress) in totals.items()
+    ])
+    return len(totals)
+
+
+def rebuild_all():
+    DashboardCounter.objects.exclude(project__in=Project.objects.all()).delete()
+    return sum(rebuild_project(pk) for pk in Project.objects.values_list('pk', flat=True))
+
+
+def _dashboard_stats_query(user, privileged, view_mode):
+    """(counter rows, aggregate kwargs) of the requesting audience."""
+    if privileged:
+        rows = DashboardCounter.objects.filter(user__isnull=True, scope='all')
+        pool = blocked_pool = Q()
+    else:
+        scope = 'team' if view_mode == 'team' else 'personal'
+        rows = DashboardCounter.objects.filter(user=user, scope__in=[scope, 'watch'])
+        pool, blocked_pool = Q(scope=scope), Q(scope='watch')
+
+    return rows, dict(
+        active_tasks=Sum('task_count', filter=pool & Q(project_status='active') & ~Q(task_status='completed')),
+        completed_tasks=Sum('task_count', filter=pool & Q(task_status='completed')),
+        on_hold_tasks=Sum('task_count', filter=pool & Q(project_status='on_hold')),
+        inactive_tasks=Sum('task_count', filter=pool & Q(project_status='inactive')),
+        actionable_pool_count=Sum(
+            'task_count', filter=pool & Q(project_status__in=['active', 'completed']) & ~Q(task_status='blocked')
+        ),
+        task_total=Sum('task_count', filter=pool),
+        progress_total=Sum('progress_sum', filter=pool),
+        blocked_tasks_count=Sum('task_count', filter=blocked_pool & Q(task_status='blocked')),
+        projects_with_blocked_tasks=Count(
+            'project', filter=blocked_pool & Q(task_status='blocked', task_count__gt=0), distinct=True
+        ),
+    )
+
+
+def _finish_dashboard_stats(stats):
+    stats = {key: value or 0 for key, value in stats.items()}
+    task_total = stats.pop('task_total')
+    progress_total = stats.pop('progress_total')
+    stats['overall_progress'] = progress_total / task_total if task_total else None
+    return stats
+
+
+def read_dashboard_stats(user, privileged, view_mode):
+    """
+    Same numbers the dashboard used to aggregate over the task pool, read from the
+    counter rows of the requesting audience in one query.
+    """
+    rows, aggregates = _dashboard_stats_query(user, privileged, view_mode)
+    return _finish_dashboard_stats(rows.aggregate(**aggregates))
+
+
+async def aread_dashboard_stats(user, privileged, view_mode):
+    """read_dashboard_stats for async views."""
+    rows, aggregates = _dashboard_stats_query(user, privileged, view_mode)
+    return _finish_dashboard_stats(await rows.aaggregate(**aggregates))
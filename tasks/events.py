@@ -0,0 +1,196 @@
+"""
+Live task-change events (tasks:event_stream).
+
+Task writes publish small JSON events after their transaction commits:
+
+    status / progress -> {'type', 'task_id', 'project_id', 'assigned_to_id', 'status', 'status_display', 'progress'}
+    comment           -> {..., 'comment_id', 'parent_id', 'user_id', 'user', 'comment'}
+    attachment        -> {..., 'attachment_id', 'file_name', 'user_id', 'user'}
+
+The event stream view subscribes to a broker and forwards them to the browser as
+server-sent events, so the dashboard and task detail pages patch counters and
+rows in place instead of re-running their AJAX refresh.
+
+Brokers (settings.TASK_EVENTS_BACKEND):
+
+    memory -> fans events out inside this process; enough for a single ASGI worker
+    redis  -> PUBLISH on TASK_EVENTS_CHANNEL, so every worker's subscribers see them
+"""
+import asyncio
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ('status', 'progress', 'comment', 'attachment')
+
+# Events a slow browser may fall behind by before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """One subscriber's queue, fed from any thread and read on the subscriber's event loop."""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def put(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put_nowait, event)
+        except RuntimeError:
+            # The subscriber's loop has closed; it unsubscribes on its way out
+            pass
+
+    def _put_nowait(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout):
+        """The next event, or None if none arrives within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        self.broker.unsubscribe(self)
+
+
+class InMemoryBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(event)
+
+    async def subscribe(self):
+        subscription = Subscription(self)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+class RedisSubscription:
+    def __init__(self, client, pubsub):
+        self.client = client
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message['data'])
+
+    async def aclose(self):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+class RedisBroker:
+    def __init__(self, url, channel):
+        import redis
+
+        self.url = url
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, event):
+        self._client.publish(self.channel, json.dumps(event))
+
+    async def subscribe(self):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(self.channel)
+        return RedisSubscription(client, pubsub)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            if settings.TASK_EVENTS_BACKEND == 'redis':
+                _broker = RedisBroker(settings.TASK_EVENTS_REDIS_URL, settings.TASK_EVENTS_CHANNEL)
+            else:
+                _broker = InMemoryBroker()
+        return _broker
+
+
+def publish(event):
+    """Hands `event` to the broker; a broker outage never fails the write that caused it."""
+    try:
+        get_broker().publish(event)
+    except Exception:
+        logger.exception("Could not publish %s event for task %s", event['type'], event['task_id'])
+
+
+def publish_on_commit(event):
+    transaction.on_commit(lambda: publish(event))
+
+
+# --- Event builders ---
+
+def task_event(event_type, task):
+    return {
+        'type': event_type,
+        'task_id': task.pk,
+        'project_id': task.project_id,
+        'assigned_to_id': task.assigned_to_id,
+        'status': task.status,
+        'status_display': task.get_status_display(),
+        'progress': task.progress,
+    }
+
+
+def comment_event(comment):
+    task = comment.task
+    return {
+        'type': 'comment',
+        'task_id': task.pk,
+        'project_id': task.project_id,
+        'assigned_to_id': task.assigned_to_id,
+        'comment_id': comment.pk,
+        'parent_id': comment.parent_id,
+        'user_id': comment.commented_by_id,
+        'user': comment.commented_by.username if comment.commented_by_id else '',
+        'comment': comment.comment,
+    }
+
+
+def attachment_event(attachment):
+    task = attachment.task
+    return {
+        'type': 'attachment',
+        'task_id': task.pk,
+        'project_id': task.project_id,
+        'assigned_to_id': task.assigned_to_id,
+        'attachment_id': attachment.pk,
+        'file_name': attachment.file_name,
+        'user_id': attachment.uploaded_by_id,
+        'user': attachment.uploaded_by.username,
+    }
+
+
+def format_sse(event):
+    """One server-sent event frame; the event type becomes the SSE event name."""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
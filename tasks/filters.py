@@ -1,7 +1,9 @@
 import django_filters
 
 from projects.models import Project
-from .models import Task
+from . import choices
+from .models import Task, TaskTag
+from .tags import parse_tags
 
 class TaskFilter(django_filters.FilterSet):
     title = django_filters.CharFilter(
@@ -52,6 +54,14 @@ class TaskFilter(django_filters.FilterSet):
             'type': 'date'
         })
     )
+    tag = django_filters.CharFilter(
+        method='filter_tag',
+        label='Tag',
+        widget=django_filters.widgets.forms.TextInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Tag (comma for any of several)'
+        })
+    )
     project_status = django_filters.ChoiceFilter(
         field_name='project__status',
         choices=(('active', 'Active Projects'), ('inactive', 'Paused Projects')),
@@ -63,34 +73,25 @@ class TaskFilter(django_filters.FilterSet):
         model = Task
         fields = ['title', 'project', 'status', 'priority', 'assigned_to', 'due_date', 'project_status']
         
+    def filter_tag(self, queryset, name, value):
+        names = parse_tags(value)
+        if not names:
+            return queryset
+        # Semi-join on the TaskTag(tag, task) index; no row fan-out, so no DISTINCT
+        return queryset.filter(pk__in=TaskTag.objects.filter(tag__name__in=names).values('task_id'))
+
     def __init__(self, *args, **kwargs):
 
         user = kwargs.pop('user', None)
 
         super().__init__(*args, **kwargs)
-        from projects.models import Project
-        from django.contrib.auth.models import User
-        from django.db.models import Q
-
-        # self.filters['project'].field.queryset = Project.objects.all()
-        # self.filters['assigned_to'].field.queryset = User.objects.filter(
-        #     profile__role='developer'
-        # ).select_related('profile')
 
         if user:
-            # 1. Filter Projects: Show only projects where user is lead or member
-            self.filters['project'].field.queryset = Project.objects.filter(
-                Q(team_lead=user) | Q(team_members=user)
-            ).distinct()
-
-            # 2. Filter Users: Show only people who share a project with the current user
-            # This prevents seeing every developer in the whole system
-            shared_projects = Project.objects.filter(
-                Q(team_lead=user) | Q(team_members=user)
-            ).distinct()
-
-            # Use the correct related_name identifiers found in your error message
-            self.filters['assigned_to'].field.queryset = User.objects.filter(
-                Q(projects_assigned__in=shared_projects) | 
-                Q(led_projects__in=shared_projects)
-            ).distinct().select_related('profile')
\ No newline at end of file
+            # Projects the user leads or is on, and the people sharing one of them
+            # (tasks/choices.py: cached, so rendering the filter bar costs no query)
+            choices.use_choices(
+                self.filters['project'].field, choices.user_projects(user), lambda: choices.project_choices(user)
+            )
+            choices.use_choices(
+                self.filters['assigned_to'].field, choices.user_assignees(user), lambda: choices.assignee_choices(user)
+            )
@@ -1,7 +1,9 @@
 from django import forms
+from . import choices
 from .models import Task, TaskComment, TaskAttachment
 from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Q
 
 class TaskForm(forms.ModelForm):
     class Meta:
@@ -86,7 +88,10 @@ class TaskForm(forms.ModelForm):
 
         if project_id:
             from projects.models import Project
-            project_obj = Project.objects.filter(pk=project_id).first() if isinstance(project_id, (int, str)) else project_id
+            if instance_project and str(project_id) == str(instance_project.pk):
+                project_obj = instance_project  # Already loaded with the task
+            else:
+                project_obj = Project.objects.filter(pk=project_id).first() if isinstance(project_id, (int, str)) else project_id
 
             if project_obj:
                 # Visually lock the project field
@@ -101,19 +106,27 @@ class TaskForm(forms.ModelForm):
                 # Base queryset: everyone in the project
                 assignee_qs = project_obj.team_members.all().distinct()
 
-                if self.user:
-                    # Rule: If user is NOT a Manager/Admin, hide Superusers from the project list
-                    is_privileged = self.user.profile.role in ['admin', 'manager']
-                    
-                    if not is_privileged:
-                        assignee_qs = assignee_qs.exclude(is_superuser=True)
+                # Rule: If user is NOT a Manager/Admin, hide Superusers from the project list
+                is_privileged = not self.user or self.user.profile.role in ['admin', 'manager']
+                if not is_privileged:
+                    assignee_qs = assignee_qs.exclude(is_superuser=True)
 
                 # Safety Net: If the task is already assigned to an Admin, 
                 # we MUST keep them in the list so the current user doesn't wipe them out.
-                if self.instance.pk and self.instance.assigned_to:
-                    assignee_qs = (assignee_qs | User.objects.filter(pk=self.instance.assigned_to.pk)).distinct()
-
-                self.fields['assigned_to'].queryset = assignee_qs.order_by('username')
+                keep_assignee = self.instance.pk and self.instance.assigned_to_id
+                if keep_assignee:
+                    assignee_qs = User.objects.filter(Q(pk__in=assignee_qs.values('pk')) | Q(pk=self.instance.assigned_to_id))
+
+                def assignee_options():
+                    # The same list from the cached team (tasks/choices.py); only built when rendered
+                    team = choices.team_choices(project_obj.pk)
+                    options = [(pk, name) for pk, name, is_superuser in team if is_privileged or not is_superuser]
+                    if keep_assignee and self.instance.assigned_to_id not in dict(options):
+                        options.append((self.instance.assigned_to_id, self.instance.assigned_to.username))
+                        options.sort(key=lambda option: option[1])
+                    return options
+
+                choices.use_choices(self.fields['assigned_to'], assignee_qs.order_by('username'), assignee_options)
                 self.fields['assigned_to'].help_text = f"Only project members can be assigned. (Admin hidden for non-managers)"
                 
                 # --- END NEW ROLE-BASED FILTERING ---
@@ -270,3 +283,31 @@ class TaskAttachmentForm(forms.ModelForm):
             })
         }
 
+
+
+class TaskImportFileForm(forms.Form):
+    """Upload form of tasks:task_import (rows are validated by tasks.importer)."""
+    file = forms.FileField(widget=forms.FileInput(attrs={
+        'class': 'form-control',
+        'accept': '.csv,.jsonl,.ndjson'
+    }))
+    format = forms.ChoiceField(
+        required=False,
+        choices=[('', 'From file extension'), ('csv', 'CSV'), ('jsonl', 'JSON Lines')],
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        label="Validate only (insert nothing)",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        upload = cleaned_data.get('file')
+        if upload and not cleaned_data.get('format'):
+            from .importer import detect_format
+            cleaned_data['format'] = detect_format(upload.name)
+            if not cleaned_data['format']:
+                self.add_error('format', "Can't tell the format from the file name; pick one.")
+        return cleaned_data
@@ -0,0 +1,17 @@
+"""
+Status timeline paging for the task detail page.
+
+A busy task collects a TaskHistory row on every status change, so the detail
+page renders only the latest HISTORY_PAGE_SIZE entries and the timeline asks
+tasks:task_history for older ones, seeking on TaskHistory(task, changed_at, id).
+"""
+from .models import TaskHistory
+from .pagination import paginate_by_cursor
+
+HISTORY_PAGE_SIZE = 20
+
+
+def history_page(task, after=None, page_size=HISTORY_PAGE_SIZE):
+    """CursorPage of `task`'s history (newest first) older than the `after` cursor."""
+    queryset = TaskHistory.objects.filter(task=task).select_related('changed_by')
+    return paginate_by_cursor(queryset, page_size, after=after, field='changed_at')
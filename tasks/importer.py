@@ -0,0 +1,253 @@
+"""
+Bulk task import (manage.py import_tasks and tasks:task_import).
+
+Rows from a CSV or JSONL file are checked with TaskForm's field rules, and their
+project / assignee are resolved from lookup maps loaded once up front. Valid rows
+are inserted with bulk_create in batches, each with its initial TaskHistory row
+(on MySQL, which doesn't return the new ids, they're read back after each batch).
+The derived data the per-task signals would have maintained is rebuilt once per
+project at the end. The columns are the ones tasks.export writes, so an export
+can be imported again (id, assigned_by and the timestamps are ignored).
+"""
+import csv
+import io
+import json
+import time
+from collections import defaultdict
+
+from django import forms
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+
+from accounts.permissions import Permissions
+from projects import membership
+from projects.models import Project
+from . import counters, search, tags
+from .forms import TaskForm
+from .models import Task, TaskHistory
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+IMPORT_BATCH_SIZE = 500
+
+# Row defaults, as on a blank TaskForm
+ROW_DEFAULTS = {'status': 'todo', 'priority': 'medium', 'progress': 0}
+
+
+class TaskImportForm(TaskForm):
+    """TaskForm's field rules for one row; project and assignee come from the importer's maps."""
+
+    class Meta(TaskForm.Meta):
+        fields = [f for f in TaskForm.Meta.fields if f not in ('project', 'assigned_to')]
+
+    def __init__(self, *args, **kwargs):
+        # Skip TaskForm.__init__: it queries the project and its team for every form
+        forms.ModelForm.__init__(self, *args, **kwargs)
+
+    def clean_progress(self):
+        progress = self.cleaned_data.get('progress')
+        if progress is not None and not 0 <= progress <= 100:
+            raise forms.ValidationError("Progress must be between 0 and 100.")
+        return progress
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.errors = []  # [(line number, message)]
+        self.project_ids = set()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def detect_format(filename):
+    """'csv' / 'jsonl' from the file extension, or None."""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return {'csv': 'csv', 'jsonl': 'jsonl', 'ndjson': 'jsonl'}.get(extension)
+
+
+def read_rows(stream, fmt):
+    """(line number, dict) for every row of a text stream; undecodable JSON lines become errors."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ValueError(f"Invalid JSON: {e.msg}")
+            continue
+        yield line_number, row if isinstance(row, dict) else ValueError("Each line must be a JSON object.")
+
+
+class TaskImporter:
+    """
+    Validates and inserts rows on behalf of `user`, who becomes assigned_by and
+    may only import into projects TaskCreateView would let them create tasks in.
+    """
+
+    def __init__(self, user, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+        self.user = user
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.permissions = Permissions(user)
+        self.privileged = self.permissions.is_privileged
+        self._load_maps()
+
+    def _load_maps(self):
+        self.projects = {}
+        self.projects_by_title = defaultdict(list)
+        for project in Project.objects.only('id', 'title', 'status', 'team_lead_id'):
+            self.projects[project.pk] = project
+            self.projects_by_title[project.title.strip().lower()].append(project)
+
+        self.users = dict(User.objects.values_list('username', 'pk'))
+        superusers = set(User.objects.filter(is_superuser=True).values_list('pk', flat=True))
+
+        # Assignable users per project, as TaskForm's assignee queryset filters them
+        self.team = defaultdict(set)
+        for project_id, user_id in Project.team_members.through.objects.values_list('project_id', 'user_id'):
+            if self.privileged or user_id not in superusers:
+                self.team[project_id].add(user_id)
+
+    # --- Row validation ---
+
+    def _project(self, value):
+        value = str(value or '').strip()
+        if not value:
+            raise forms.ValidationError("This field is required.")
+        if value.isdigit() and int(value) in self.projects:
+            return self.projects[int(value)]
+        matches = self.projects_by_title.get(value.lower(), [])
+        if not matches:
+            raise forms.ValidationError(f"Unknown project {value!r}.")
+        if len(matches) > 1:
+            raise forms.ValidationError(f"Several projects are titled {value!r}; use the project id.")
+        return matches[0]
+
+    def _can_create_in(self, project):
+        # TaskCreateView.test_func
+        return self.permissions.can_create_task(project)
+
+    def build_task(self, row):
+        """An unsaved Task for `row`, or raises ValidationError with every problem found."""
+        errors = []
+        project = assignee_id = None
+        try:
+            project = self._project(row.get('project'))
+            if not self._can_create_in(project):
+                errors.append(f"project: you can't create tasks in {project.title!r}.")
+        except forms.ValidationError as e:
+            errors.append(f"project: {' '.join(e.messages)}")
+
+        username = str(row.get('assigned_to') or '').strip()
+        if username:
+            assignee_id = self.users.get(username)
+            if assignee_id is None:
+                errors.append(f"assigned_to: unknown user {username!r}.")
+            elif project and assignee_id not in self.team[project.pk]:
+                errors.append(f"assigned_to: {username!r} is not a member of {project.title!r}.")
+
+        data = {**ROW_DEFAULTS, **{k: v for k, v in row.items() if v not in (None, '')}}
+        form = TaskImportForm(data)
+        if not form.is_valid():
+            for field, messages in form.errors.items():
+                errors.append(f"{field}: {' '.join(messages)}")
+        if errors:
+            raise forms.ValidationError(errors)
+
+        task = form.instance
+        task.project = project
+        task.assigned_to_id = assignee_id
+        task.assigned_by = self.user
+        return task
+
+    # --- Import ---
+
+    def run(self, rows):
+        """Imports (line number, row) pairs; returns an ImportResult."""
+        result = ImportResult()
+        started = time.perf_counter()
+        batch = []
+        for line_number, row in rows:
+            result.rows += 1
+            if isinstance(row, Exception):
+                result.errors.append((line_number, str(row)))
+                continue
+            try:
+                batch.append(self.build_task(row))
+            except forms.ValidationError as e:
+                result.errors.append((line_number, '; '.join(e.messages)))
+                continue
+            if len(batch) >= self.batch_size:
+                self._insert(batch, result)
+                batch = []
+        self._insert(batch, result)
+        if result.created and not self.dry_run:
+            self._rebuild_derived_data(result.project_ids)
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def _insert(self, batch, result):
+        if not batch:
+            return
+        result.project_ids.update(task.project_id for task in batch)
+        result.created += len(batch)
+        if self.dry_run:
+            return
+        with transaction.atomic():
+            returns_pks = connection.features.can_return_rows_from_bulk_insert
+            last_pk = None if returns_pks else Task.objects.order_by('-pk').values_list('pk', flat=True).first()
+            Task.objects.bulk_create(batch)
+            if not returns_pks:
+                self._read_back_pks(batch, last_pk or 0)
+            TaskHistory.objects.bulk_create([
+                TaskHistory(task=task, old_status="N/A", new_status=task.get_status_display(), changed_by=self.user)
+                for task in batch
+            ])
+            tags.sync_task_tags([task for task in batch if task.tags])
+            search.index_tasks([task.pk for task in batch])
+
+    def _read_back_pks(self, batch, after_pk):
+        """
+        MySQL doesn't return the ids of a bulk insert. Reads them back: the user's tasks
+        above `after_pk`, matched on the created_at bulk_create stamped on each instance
+        (ids follow row order when two share a timestamp).
+        """
+        inserted = defaultdict(list)
+        rows = Task.objects.filter(pk__gt=after_pk, assigned_by=self.user).order_by('pk')
+        for pk, created_at in rows.values_list('pk', 'created_at'):
+            inserted[created_at].append(pk)
+        for task in batch:
+            task.pk = inserted[task.created_at].pop(0)
+
+    def _rebuild_derived_data(self, project_ids):
+        """bulk_create skips the signals: counters, memberships and rollups, once per project."""
+        for project_id in sorted(project_ids):
+            counters.rebuild_project(project_id)
+            membership.rebuild_project(project_id)
+        for project in Project.objects.filter(pk__in=project_ids):
+            project.recompute_rollup()
+
+
+def import_tasks(user, stream, fmt, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """Imports a text stream of CSV / JSONL rows; returns an ImportResult."""
+    importer = TaskImporter(user, batch_size=batch_size, dry_run=dry_run)
+    return importer.run(read_rows(stream, fmt))
+
+
+def import_uploaded_file(user, uploaded_file, fmt, **kwargs):
+    """import_tasks for a Django UploadedFile (read as UTF-8, BOM tolerated)."""
+    stream = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+    try:
+        return import_tasks(user, stream, fmt, **kwargs)
+    finally:
+        stream.detach()
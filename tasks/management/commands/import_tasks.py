@@ -0,0 +1,43 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importer import IMPORT_BATCH_SIZE, IMPORT_FORMATS, detect_format, import_tasks
+
+
+class Command(BaseCommand):
+    help = "Imports tasks from a CSV or JSONL file (the columns tasks:task_export writes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV / JSONL file to import.")
+        parser.add_argument('--user', required=True,
+                            help="Username the tasks are created by (their permissions apply).")
+        parser.add_argument('--format', choices=IMPORT_FORMATS,
+                            help="File format (default: from the file extension).")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help=f"Tasks inserted per bulk_create (default {IMPORT_BATCH_SIZE}).")
+        parser.add_argument('--dry-run', action='store_true', help="Validate every row but insert nothing.")
+        parser.add_argument('--max-errors', type=int, default=100,
+                            help="Rejected rows listed in the report (default 100).")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.select_related('profile').get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Unknown user {options['user']!r}.")
+        fmt = options['format'] or detect_format(options['path'])
+        if fmt is None:
+            raise CommandError("Can't tell the format from the file name; pass --format.")
+
+        with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+            result = import_tasks(user, stream, fmt, batch_size=options['batch_size'], dry_run=options['dry_run'])
+
+        for line_number, message in result.errors[:options['max_errors']]:
+            self.stdout.write(self.style.WARNING(f"line {line_number}: {message}"))
+        if len(result.errors) > options['max_errors']:
+            self.stdout.write(self.style.WARNING(f"... and {len(result.errors) - options['max_errors']} more."))
+
+        verb = "Validated" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result.created} of {result.rows} rows into {len(result.project_ids)} project(s) "
+            f"in {result.elapsed:.2f}s ({result.rows_per_second:.0f} rows/s); {len(result.errors)} rejected."
+        ))
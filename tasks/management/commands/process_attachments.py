@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from tasks.models import TaskAttachment
+from tasks.tasks import process_attachment
+
+
+class Command(BaseCommand):
+    help = "Queues thumbnail/metadata processing for attachments that haven't been processed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help="Reprocess every attachment, not just pending and failed ones.")
+
+    def handle(self, *args, **options):
+        attachments = TaskAttachment.objects.all()
+        if not options['all']:
+            attachments = attachments.filter(processing_status__in=['pending', 'failed'])
+        count = 0
+        for pk in attachments.values_list('pk', flat=True).iterator():
+            process_attachment.delay(pk)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Queued {count} attachments for processing."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from tasks import counters
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the precomputed dashboard counters from the task table (repairs drift)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, action='append', dest='projects',
+                            help="Only rebuild this project id (repeatable).")
+
+    def handle(self, *args, **options):
+        if options['projects']:
+            rows = sum(counters.rebuild_project(pk) for pk in options['projects'])
+        else:
+            rows = counters.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} dashboard counter rows."))
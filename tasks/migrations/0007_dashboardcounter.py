@@ -0,0 +1,74 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:27
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_counters(apps, schema_editor):
+    """Initial fill; mirrors tasks.counters.rebuild_project on the historical models."""
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('tasks', 'Task')
+    DashboardCounter = apps.get_model('tasks', 'DashboardCounter')
+
+    for project in Project.objects.all():
+        team = set(project.team_members.values_list('pk', flat=True))
+        if project.team_lead_id:
+            team.add(project.team_lead_id)
+
+        totals = defaultdict(lambda: [0, 0])
+        grouped = (
+            Task.objects.filter(project_id=project.pk).order_by()
+            .values('assigned_to_id', 'status').annotate(n=Count('id'), progress=Sum('progress'))
+        )
+        for row in grouped:
+            assignee = row['assigned_to_id']
+            keys = [(None, 'all')] + [(user_id, 'team') for user_id in team]
+            if assignee:
+                keys.append((assignee, 'personal'))
+            keys.extend((user_id, 'watch') for user_id in {assignee, project.team_lead_id} - {None})
+            for key in keys:
+                total = totals[(row['status'],) + key]
+                total[0] += row['n']
+                total[1] += row['progress'] or 0
+
+        DashboardCounter.objects.bulk_create([
+            DashboardCounter(
+                user_id=user_id, scope=scope, project_id=project.pk,
+                project_status=project.status, task_status=task_status,
+                task_count=count, progress_sum=progress,
+            )
+            for (task_status, user_id, scope), (count, progress) in totals.items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_overall_progress'),
+        ('tasks', '0006_alter_taskattachment_file'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('all', 'All Tasks'), ('personal', 'Assigned To User'), ('team', 'Projects User Leads Or Joins'), ('watch', 'Assigned To User Or Led By User')], max_length=20)),
+                ('project_status', models.CharField(max_length=20)),
+                ('task_status', models.CharField(max_length=20)),
+                ('task_count', models.IntegerField(default=0)),
+                ('progress_sum', models.BigIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_counters', to='projects.project')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'scope', 'project', 'task_status'), name='unique_dashboard_counter')],
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
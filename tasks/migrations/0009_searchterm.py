@@ -0,0 +1,89 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:33
+
+import re
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copies of tasks.search's tokenizer and weights as of this migration
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_TERM_LENGTH = 64
+MIN_TERM_LENGTH = 2
+FIELD_WEIGHTS = {
+    'title': 5,
+    'tags': 3,
+    'description': 1,
+    'comment': 1,
+}
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall(text.lower())
+        if len(token) >= MIN_TERM_LENGTH
+    ]
+
+
+def populate_index(apps, schema_editor):
+    """Initial fill; mirrors tasks.search.index_projects/index_tasks on the historical models."""
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('tasks', 'Task')
+    TaskComment = apps.get_model('tasks', 'TaskComment')
+    SearchTerm = apps.get_model('tasks', 'SearchTerm')
+
+    def postings(fields, **owner):
+        weights = defaultdict(int)
+        for field, texts in fields.items():
+            for text in texts:
+                for term in tokenize(text):
+                    weights[(term, field)] += FIELD_WEIGHTS[field]
+        return [SearchTerm(term=term, field=field, weight=weight, **owner) for (term, field), weight in weights.items()]
+
+    rows = []
+    for project in Project.objects.values('pk', 'title', 'description'):
+        rows.extend(postings({'title': [project['title']], 'description': [project['description']]}, project_id=project['pk']))
+
+    comments = defaultdict(list)
+    for task_id, text in TaskComment.objects.values_list('task_id', 'comment'):
+        comments[task_id].append(text)
+    for task in Task.objects.values('pk', 'title', 'description', 'tags').iterator():
+        rows.extend(postings({
+            'title': [task['title']],
+            'description': [task['description']],
+            'tags': (task['tags'] or '').split(','),
+            'comment': comments[task['pk']],
+        }, task_id=task['pk']))
+        if len(rows) >= 5000:
+            SearchTerm.objects.bulk_create(rows)
+            rows = []
+    SearchTerm.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_rollup_columns'),
+        ('tasks', '0008_task_updated_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('field', models.CharField(max_length=20)),
+                ('weight', models.IntegerField(default=1)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='projects.project')),
+                ('task', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='tasks.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'task'], name='searchterm_term_task_idx'), models.Index(fields=['term', 'project'], name='searchterm_term_project_idx')],
+            },
+        ),
+        migrations.RunPython(populate_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+MAX_TAG_LENGTH = 50
+
+
+def parse_tags(value):
+    """Frozen copy of tasks.tags.parse_tags as of this migration."""
+    if not value:
+        return []
+    names = (name.strip().lower()[:MAX_TAG_LENGTH] for name in value.split(','))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def split_tags(apps, schema_editor):
+    """Splits the existing comma-separated Task.tags strings into Tag / TaskTag rows."""
+    Task = apps.get_model('tasks', 'Task')
+    Tag = apps.get_model('tasks', 'Tag')
+    TaskTag = apps.get_model('tasks', 'TaskTag')
+
+    wanted = {
+        task_id: parse_tags(tags)
+        for task_id, tags in Task.objects.exclude(tags__isnull=True).exclude(tags='').values_list('pk', 'tags').iterator()
+    }
+    names = {name for names in wanted.values() for name in names}
+    Tag.objects.bulk_create([Tag(name=name) for name in sorted(names)], batch_size=1000)
+    tag_ids = dict(Tag.objects.values_list('name', 'pk'))
+    TaskTag.objects.bulk_create([
+        TaskTag(task_id=task_id, tag_id=tag_ids[name])
+        for task_id, names in wanted.items()
+        for name in names
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_searchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_tags', to='tasks.tag')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_tags', to='tasks.task')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='tag_set',
+            field=models.ManyToManyField(blank=True, related_name='tasks', through='tasks.TaskTag', to='tasks.tag'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktag',
+            index=models.Index(fields=['tag', 'task'], name='tasktag_tag_task_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tasktag',
+            constraint=models.UniqueConstraint(fields=('task', 'tag'), name='unique_task_tag'),
+        ),
+        migrations.RunPython(split_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_tags'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskhistory',
+            index=models.Index(fields=['task', 'changed_at', 'id'], name='taskhistory_task_changed_idx'),
+        ),
+    ]
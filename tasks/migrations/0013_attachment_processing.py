@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_attachment_storage_and_uploads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskattachment',
+            name='mime_type',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='taskattachment',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, help_text='Pages, for PDFs', null=True),
+        ),
+        migrations.AddField(
+            model_name='taskattachment',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed'), ('infected', 'Failed virus scan')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='taskattachment',
+            name='size',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Size in bytes', null=True),
+        ),
+        migrations.AddField(
+            model_name='taskattachment',
+            name='thumbnail',
+            field=models.ImageField(blank=True, upload_to='attachment_thumbnails/'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-18 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_attachment_processing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachmentupload',
+            name='parts',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='attachmentupload',
+            name='storage',
+            field=models.CharField(choices=[('cloudinary', 'Cloudinary'), ('filesystem', 'File system')], default='cloudinary', max_length=20),
+        ),
+    ]
@@ -0,0 +1,46 @@
+"""
+Request-scoped object loading for the task and project views.
+
+Permission checks (test_func), get_form, form_valid and the generic views all
+ask for the same object; without memoizing, each call re-runs the lookup and
+then lazily loads project / team_lead again.
+"""
+from django.shortcuts import get_object_or_404
+
+from .models import Task
+
+# Relations every permission check walks: task.project.team_lead and task.assigned_to
+TASK_RELATED = ('project', 'project__team_lead', 'assigned_to')
+
+
+class RequestCachedObjectMixin:
+    """
+    Memoizes get_object() for the lifetime of the request, loaded together with
+    `object_select_related`.
+    """
+    object_select_related = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.object_select_related:
+            queryset = queryset.select_related(*self.object_select_related)
+        return queryset
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if '_cached_object' not in self.__dict__:
+            self._cached_object = super().get_object()
+        return self._cached_object
+
+
+class TaskObjectMixin(RequestCachedObjectMixin):
+    object_select_related = TASK_RELATED
+
+
+def get_request_task(request, pk):
+    """Function-view counterpart of TaskObjectMixin: the task (with TASK_RELATED), once per request."""
+    tasks = request.__dict__.setdefault('_cached_tasks', {})
+    if pk not in tasks:
+        tasks[pk] = get_object_or_404(Task.objects.select_related(*TASK_RELATED), pk=pk)
+    return tasks[pk]
@@ -1,8 +1,13 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from projects.models import Project
 from cloudinary.models import CloudinaryField
 
+from .storage import get_backend
+
 class Task(models.Model):
     """Main Task model"""
     STATUS_CHOICES = (
@@ -32,9 +37,14 @@ class Task(models.Model):
     actual_hours = models.FloatField(blank=True, null=True, help_text="Actual hours spent")
     progress = models.IntegerField(default=0, help_text="Progress percentage (0-100)")
     tags = models.CharField(max_length=255, blank=True, null=True, help_text="Comma-separated tags")
+    # Normalized copy of `tags`, kept in sync by tasks/signals.py; query this, not the string
+    tag_set = models.ManyToManyField('Tag', through='TaskTag', related_name='tasks', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Fields the post_save/post_delete receivers diff against (counters, rollup, search index)
+    TRACKED_FIELDS = ('project_id', 'assigned_to_id', 'status', 'progress', 'title', 'description', 'tags')
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -42,8 +52,28 @@ class Task(models.Model):
             models.Index(fields=['priority']),
             models.Index(fields=['assigned_to']),
             models.Index(fields=['project']),
+            # Keyset pagination in TaskListView seeks on (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='task_updated_at_id_idx'),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance.tracked_values()
+        return instance
+
+    def tracked_values(self):
+        """Current values of TRACKED_FIELDS (deferred fields are left out)."""
+        return {f: self.__dict__[f] for f in self.TRACKED_FIELDS if f in self.__dict__}
+
+    def save(self, *args, **kwargs):
+        # Deferred loads don't give us a full snapshot, so read the old row once.
+        if not self._state.adding and len(getattr(self, '_loaded_values', {})) < len(self.TRACKED_FIELDS):
+            self._loaded_values = Task.objects.filter(pk=self.pk).values(*self.TRACKED_FIELDS).first() or {}
+        super().save(*args, **kwargs)
+        # Receivers have diffed against the old snapshot; re-arm it for the next save.
+        self._loaded_values = self.tracked_values()
+
     def get_status_history(self):
         return self.history.all().select_related('changed_by')
     
@@ -102,17 +132,80 @@ class TaskAttachment(models.Model):
     """File attachments for tasks"""
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='attachments')
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_attachments')
+    STORAGE_CHOICES = (
+        ('cloudinary', 'Cloudinary'),
+        ('filesystem', 'File system'),
+    )
+
+    PROCESSING_CHOICES = (
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+        ('infected', 'Failed virus scan'),
+    )
+
     # file = models.FileField(upload_to='task_attachments/')
+    # Cloudinary resource, or the file's name inside the filesystem storage (tasks/storage.py)
     file = CloudinaryField('resource', folder='task_attachments/')
     file_name = models.CharField(max_length=255)
+    storage = models.CharField(max_length=20, choices=STORAGE_CHOICES, default='cloudinary')
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    # Filled in after upload by tasks.tasks.process_attachment (tasks/processing.py)
+    processing_status = models.CharField(max_length=20, choices=PROCESSING_CHOICES, default='pending')
+    size = models.PositiveBigIntegerField(null=True, blank=True, help_text="Size in bytes")
+    mime_type = models.CharField(max_length=100, blank=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True, help_text="Pages, for PDFs")
+    thumbnail = models.ImageField(upload_to='attachment_thumbnails/', blank=True)
+
     class Meta:
         ordering = ['-uploaded_at']
 
     def __str__(self):
         return f"{self.file_name} - {self.task.title}"
 
+    @property
+    def thumbnail_url(self):
+        """Where the thumbnail is served; it lives with the attachment's backend (tasks/storage.py)."""
+        return get_backend(self.storage).thumbnail_url(self) if self.thumbnail else ''
+
+    @property
+    def is_blocked(self):
+        """Not served: rejected by the virus scanner or, while one is configured, not (successfully) scanned yet."""
+        if self.processing_status == 'infected':
+            return True
+        return bool(settings.ATTACHMENT_SCANNER) and self.processing_status in ('pending', 'failed')
+
+
+class AttachmentUpload(models.Model):
+    """A resumable chunked upload; becomes a TaskAttachment once every byte has arrived"""
+    STATUS_CHOICES = (
+        ('uploading', 'Uploading'),
+        ('processing', 'Processing'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='attachment_uploads')
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attachment_uploads')
+    file_name = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    # The backend holding the parts (and then the file), and the part names in offset order
+    storage = models.CharField(max_length=20, choices=TaskAttachment.STORAGE_CHOICES, default='cloudinary')
+    parts = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    error = models.CharField(max_length=255, blank=True)
+    attachment = models.OneToOneField(
+        TaskAttachment, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.file_name} ({self.received}/{self.size})"
+
 class TaskHistory(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='history')
     old_status = models.CharField(max_length=50)
@@ -122,8 +215,87 @@ class TaskHistory(models.Model):
 
     class Meta:
         ordering = ['-changed_at']
+        indexes = [
+            # The detail timeline pages a task's history by keyset on (changed_at, id)
+            models.Index(fields=['task', 'changed_at', 'id'], name='taskhistory_task_changed_idx'),
+        ]
 
     def __str__(self):
         return f"{self.task.title}: {self.old_status} -> {self.new_status}"
 
 
+
+
+class DashboardCounter(models.Model):
+    """
+    Maintained task counts behind the dashboard stat cards.
+    One row per audience (user + scope), project and task status; see tasks/counters.py.
+    """
+    SCOPE_CHOICES = (
+        ('all', 'All Tasks'),
+        ('personal', 'Assigned To User'),
+        ('team', 'Projects User Leads Or Joins'),
+        ('watch', 'Assigned To User Or Led By User'),
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='dashboard_counters')
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='dashboard_counters')
+    project_status = models.CharField(max_length=20)
+    task_status = models.CharField(max_length=20)
+    task_count = models.IntegerField(default=0)
+    progress_sum = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'scope', 'project', 'task_status'], name='unique_dashboard_counter'),
+        ]
+
+    def __str__(self):
+        return f"{self.user or 'everyone'}/{self.scope} {self.project_id}:{self.task_status} = {self.task_count}"
+
+
+class SearchTerm(models.Model):
+    """Inverted-index posting for task/project search; see tasks/search.py"""
+    term = models.CharField(max_length=64)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, null=True, blank=True, related_name='search_terms')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True, related_name='search_terms')
+    field = models.CharField(max_length=20)
+    weight = models.IntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term', 'task'], name='searchterm_term_task_idx'),
+            models.Index(fields=['term', 'project'], name='searchterm_term_project_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {'task ' + str(self.task_id) if self.task_id else 'project ' + str(self.project_id)}"
+
+
+class Tag(models.Model):
+    """A normalized (lower-cased) tag name; see tasks/tags.py"""
+    name = models.CharField(max_length=50, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class TaskTag(models.Model):
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='task_tags')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='task_tags')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'tag'], name='unique_task_tag'),
+        ]
+        indexes = [
+            # Tag filter / tag cloud go tag -> tasks
+            models.Index(fields=['tag', 'task'], name='tasktag_tag_task_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id}: {self.tag_id}"
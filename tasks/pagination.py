@@ -0,0 +1,88 @@
+"""
+Keyset (cursor) pagination on (<timestamp>, id), newest first.
+
+Offset pagination needs a COUNT(DISTINCT ...) plus an OFFSET scan that grows with
+the page number. Seeking from the last row seen walks the Task(updated_at, id)
+index instead, so page N costs the same as page 1. The task history timeline
+pages the same way on TaskHistory(task, changed_at).
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(obj, field='updated_at'):
+    raw = f"{getattr(obj, field).isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns (timestamp, id), or None for a missing/garbled cursor (treated as page 1)."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, pk = raw.split('|')
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+class CursorPage:
+    """One page of a keyset-paginated queryset, newest first."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, total_count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.total_count = total_count
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def paginate_by_cursor(queryset, page_size, after=None, before=None, with_count=False, field='updated_at'):
+    """
+    Returns the page after the `after` cursor (or before the `before` cursor),
+    seeking on (`field`, id). The exact total is only counted when `with_count` is set.
+    """
+    total_count = queryset.count() if with_count else None
+    after, before = decode_cursor(after), decode_cursor(before)
+
+    if before:
+        timestamp, pk = before
+        rows = list(
+            queryset.filter(Q(**{f'{field}__gt': timestamp}) | Q(**{field: timestamp, 'id__gt': pk}))
+            .order_by(field, 'id')[:page_size + 1]
+        )
+        has_previous = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        has_next = True
+    else:
+        qs = queryset.order_by(f'-{field}', '-id')
+        if after:
+            timestamp, pk = after
+            qs = qs.filter(Q(**{f'{field}__lt': timestamp}) | Q(**{field: timestamp, 'id__lt': pk}))
+        rows = list(qs[:page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        has_previous = after is not None
+
+    return CursorPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1], field) if rows and has_next else None,
+        previous_cursor=encode_cursor(rows[0], field) if rows and has_previous else None,
+        total_count=total_count,
+    )
@@ -0,0 +1,127 @@
+"""
+Post-upload attachment processing, run by tasks.tasks.process_attachment.
+
+New attachments are queued once their row commits, so add_attachment doesn't wait
+on any of this. The task opens the original through its storage backend
+(tasks/storage.py) and, in order:
+
+    scan      -> settings.ATTACHMENT_SCANNER, if set; a rejected file is marked
+                 'infected' and download_attachment refuses it (and, with a scanner
+                 set, any file still 'pending' or 'failed')
+    metadata  -> size and MIME type (sniffed by Pillow for images, else guessed from the name)
+    pdf       -> page count
+    image     -> a JPEG thumbnail of at most ATTACHMENT_THUMBNAIL_SIZE px, stored by the
+                 attachment's backend
+
+The results land on the TaskAttachment with processing_status 'ready', so the
+detail page shows thumbnails and sizes without touching the originals.
+"""
+import io
+import logging
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .storage import get_backend
+
+logger = logging.getLogger(__name__)
+
+# A page object in an uncompressed PDF; "/Type /Pages" (the page tree) doesn't match
+PDF_PAGE_RE = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+
+
+def schedule_processing(attachment):
+    from .tasks import process_attachment
+
+    def schedule():
+        try:
+            process_attachment.delay(attachment.pk)
+        except Exception:
+            # Broker down: leave it 'pending' for `manage.py process_attachments`,
+            # rather than doing the work inside the upload request
+            logger.exception("Could not queue processing for attachment %s", attachment.pk)
+
+    transaction.on_commit(schedule)
+
+
+def file_size(file):
+    file.seek(0, io.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+def scan(file):
+    """True unless the configured scanner rejects the file."""
+    if not settings.ATTACHMENT_SCANNER:
+        return True
+    file.seek(0)
+    clean = import_string(settings.ATTACHMENT_SCANNER)(file)
+    file.seek(0)
+    return clean
+
+
+def pdf_page_count(file):
+    """Pages in a PDF; pypdf when installed, else page objects counted in the raw bytes."""
+    file.seek(0)
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        # Misses pages packed into compressed object streams; None rather than a wrong 0
+        count = len(PDF_PAGE_RE.findall(file.read()))
+        return count or None
+    return len(PdfReader(file).pages)
+
+
+def render_thumbnail(image):
+    """JPEG bytes of `image` scaled to fit ATTACHMENT_THUMBNAIL_SIZE."""
+    size = settings.ATTACHMENT_THUMBNAIL_SIZE
+    # JPEG decoders can downscale while decoding, far cheaper than a full-size load
+    image.draft('RGB', (size, size))
+    image.thumbnail((size, size))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    out = io.BytesIO()
+    image.save(out, format='JPEG', quality=80, optimize=True)
+    return out.getvalue()
+
+
+def process(attachment):
+    """Scans, measures and thumbnails one attachment and saves the results on it."""
+    from PIL import Image, UnidentifiedImageError
+
+    backend = get_backend(attachment.storage)
+    with backend.open(attachment) as file:
+        attachment.size = file_size(file)
+        attachment.mime_type = mimetypes.guess_type(attachment.file_name)[0] or 'application/octet-stream'
+
+        if not scan(file):
+            logger.warning("Attachment %s was rejected by the virus scanner", attachment.pk)
+            attachment.processing_status = 'infected'
+            attachment.save(update_fields=['size', 'mime_type', 'processing_status'])
+            return attachment
+
+        thumbnail = None
+        if attachment.size <= settings.ATTACHMENT_PROCESSING_MAX_SIZE:
+            if attachment.mime_type == 'application/pdf':
+                attachment.page_count = pdf_page_count(file)
+            else:
+                file.seek(0)
+                try:
+                    with Image.open(file) as image:
+                        attachment.mime_type = Image.MIME.get(image.format, attachment.mime_type)
+                        thumbnail = render_thumbnail(image)
+                except (UnidentifiedImageError, Image.DecompressionBombError):
+                    # Not an image Pillow can read, or too big to decode safely
+                    pass
+
+    if thumbnail:
+        backend.save_thumbnail(attachment, f"{Path(attachment.file_name).stem}.jpg", ContentFile(thumbnail))
+    attachment.processing_status = 'ready'
+    attachment.save(update_fields=['size', 'mime_type', 'page_count', 'thumbnail', 'processing_status'])
+    return attachment
@@ -0,0 +1,191 @@
+"""
+Inverted index for task and project search.
+
+Text is tokenized in Python and stored as SearchTerm postings (term -> task or
+project, field, weight) in an ordinary table, so it behaves the same on SQLite
+locally and MySQL in production. Lookups are indexed equality / prefix matches
+on `term` instead of leading-wildcard icontains scans.
+
+Task documents: title, description, tags and comments (plus the owning project's
+title, matched through the project postings). Project documents: title, description.
+
+The dashboard, TaskListView and ProjectListView all go through task_search_filter /
+project_search_filter. ranked_tasks orders matches by relevance (the posting weights);
+the dashboard's recent tasks use it when searching, while the cursor-paginated task
+list keeps its updated_at order.
+"""
+import re
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from projects.models import Project
+from .models import SearchTerm, Task, TaskComment
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Longer terms are truncated to fit the column; shorter ones are noise (a query made
+# only of short terms falls back to icontains).
+MAX_TERM_LENGTH = 64
+MIN_TERM_LENGTH = 2
+
+# The term being typed (the last one) is prefix-matched once it's this long.
+MIN_PREFIX_LENGTH = 2
+
+FIELD_WEIGHTS = {
+    'title': 5,
+    'tags': 3,
+    'description': 1,
+    'comment': 1,
+}
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall(text.lower())
+        if len(token) >= MIN_TERM_LENGTH
+    ]
+
+
+def _postings(fields, **owner):
+    """SearchTerm rows for one document: one row per (term, field), weight = hits x field weight."""
+    weights = defaultdict(int)
+    for field, texts in fields.items():
+        for text in texts:
+            for term in tokenize(text):
+                weights[(term, field)] += FIELD_WEIGHTS[field]
+    return [SearchTerm(term=term, field=field, weight=weight, **owner) for (term, field), weight in weights.items()]
+
+
+# --- Indexing ---
+
+@transaction.atomic
+def index_tasks(task_ids):
+    """(Re)builds the postings of the given tasks in a constant number of queries."""
+    task_ids = list(task_ids)
+    if not task_ids:
+        return 0
+    comments = defaultdict(list)
+    for task_id, text in TaskComment.objects.filter(task_id__in=task_ids).values_list('task_id', 'comment'):
+        comments[task_id].append(text)
+
+    rows = []
+    for task in Task.objects.filter(pk__in=task_ids).values('pk', 'title', 'description', 'tags'):
+        rows.extend(_postings({
+            'title': [task['title']],
+            'description': [task['description']],
+            # Tags are comma-separated; each one tokenizes on its own
+            'tags': (task['tags'] or '').split(','),
+            'comment': comments[task['pk']],
+        }, task_id=task['pk']))
+
+    SearchTerm.objects.filter(task_id__in=task_ids).delete()
+    SearchTerm.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def index_task(task_id):
+    return index_tasks([task_id])
+
+
+@transaction.atomic
+def index_projects(project_ids):
+    project_ids = list(project_ids)
+    rows = []
+    for project in Project.objects.filter(pk__in=project_ids).values('pk', 'title', 'description'):
+        rows.extend(_postings({
+            'title': [project['title']],
+            'description': [project['description']],
+        }, project_id=project['pk']))
+
+    SearchTerm.objects.filter(project_id__in=project_ids).delete()
+    SearchTerm.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def rebuild_index(batch_size=500):
+    """Drops and rebuilds every posting. Returns the number of rows written."""
+    SearchTerm.objects.all().delete()
+    written = index_projects(Project.objects.values_list('pk', flat=True))
+    task_ids = list(Task.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(task_ids), batch_size):
+        written += index_tasks(task_ids[start:start + batch_size])
+    return written
+
+
+# --- Querying ---
+
+def _query_terms(query):
+    """(term, is_prefix) pairs; only the last term is prefix-matched (search-as-you-type)."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    return [
+        (term, i == len(terms) - 1 and len(term) >= MIN_PREFIX_LENGTH)
+        for i, term in enumerate(terms)
+    ]
+
+
+def _matching(term, is_prefix):
+    lookup = {'term__startswith': term} if is_prefix else {'term': term}
+    return SearchTerm.objects.filter(**lookup)
+
+
+def task_search_filter(query):
+    """
+    Q for tasks matching every query term in their own text or their project's title.
+    Each term becomes an indexed semi-join on the postings table.
+    """
+    terms = _query_terms(query)
+    if not terms:
+        # Nothing long enough to be indexed ("a", "#1"): the plain substring match
+        return Q(title__icontains=query.strip()) | Q(project__title__icontains=query.strip())
+
+    match = Q()
+    for term, is_prefix in terms:
+        postings = _matching(term, is_prefix)
+        match &= (
+            Q(pk__in=postings.filter(task__isnull=False).values('task_id'))
+            | Q(project_id__in=postings.filter(project__isnull=False, field='title').values('project_id'))
+        )
+    return match
+
+
+def project_search_filter(query):
+    """Q for projects whose title or description matches every query term."""
+    terms = _query_terms(query)
+    if not terms:
+        return Q(title__icontains=query.strip()) | Q(description__icontains=query.strip())
+
+    match = Q()
+    for term, is_prefix in terms:
+        match &= Q(pk__in=_matching(term, is_prefix).filter(project__isnull=False).values('project_id'))
+    return match
+
+
+def ranked_tasks(queryset, query):
+    """
+    `queryset` (already narrowed by task_search_filter) ordered best match first, most
+    recently updated on ties. Score = summed posting weights of the task's own hits plus
+    its project-title hits, two correlated subqueries on the postings' (term, owner) indexes.
+    """
+    terms = _query_terms(query)
+    if not terms:
+        return queryset.order_by('-updated_at')
+
+    term_match = Q()
+    for term, is_prefix in terms:
+        term_match |= Q(term__startswith=term) if is_prefix else Q(term=term)
+
+    def score(**owner):
+        postings = SearchTerm.objects.filter(term_match, **owner).order_by()
+        owner_field = next(iter(owner))
+        total = postings.values(owner_field).annotate(total=Sum('weight')).values('total')
+        return Coalesce(Subquery(total), 0)
+
+    return queryset.annotate(
+        search_score=score(task_id=OuterRef('pk')) + score(project_id=OuterRef('project_id'), field='title'),
+    ).order_by('-search_score', '-updated_at')
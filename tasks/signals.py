@@ -0,0 +1,186 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from projects.models import Project
+from . import choices, counters, events, processing, search, storage, tags
+from .bulk import from_bulk_delete
+from .models import DashboardCounter, Task, TaskAttachment, TaskComment
+
+# Fields that feed the search index
+TASK_SEARCH_FIELDS = ('title', 'description', 'tags')
+PROJECT_SEARCH_FIELDS = ('title', 'description')
+
+
+def _text_changed(instance, created, fields):
+    if created:
+        return True
+    old = getattr(instance, '_loaded_values', None)
+    return not old or any(old[f] != getattr(instance, f) for f in fields)
+
+
+@receiver(post_save, sender=Task)
+def update_dashboard_counters(sender, instance, created, raw=False, **kwargs):
+    """Applies the task's old -> new delta to the maintained dashboard counters."""
+    if raw:
+        return
+    old = None if created else getattr(instance, '_loaded_values', None)
+    counters.apply_task_change(old, instance.tracked_values())
+
+
+@receiver(post_delete, sender=Task)
+def remove_from_dashboard_counters(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Project):
+        # The project's counter rows cascade away with it
+        return
+    if from_bulk_delete(origin):
+        # tasks.bulk rebuilds the project's counters once afterwards
+        return
+    counters.apply_task_change(getattr(instance, '_loaded_values', None) or instance.tracked_values(), None)
+
+
+@receiver(post_save, sender=Project)
+def sync_counter_project_status(sender, instance, created, raw=False, **kwargs):
+    """Keeps the denormalized project status on counter rows and the lead's rows current."""
+    if created or raw:
+        return
+    old = getattr(instance, '_loaded_values', {})
+    if old.get('team_lead_id', instance.team_lead_id) != instance.team_lead_id:
+        # The lead's team/watch rows change shape; rebuild this one project.
+        counters.rebuild_project(instance.pk)
+    elif old.get('status', instance.status) != instance.status:
+        counters.set_project_status(instance.pk, instance.status)
+
+
+@receiver(m2m_changed, sender=Project.team_members.through)
+def sync_counter_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse and action == 'post_clear':
+        # user.projects_assigned.clear(): the projects are only known from the counters
+        project_ids = set(
+            DashboardCounter.objects.filter(user=instance, scope='team').values_list('project_id', flat=True)
+        )
+    elif reverse:
+        # user.projects_assigned.add(...): instance is the user, pk_set the projects
+        project_ids = pk_set
+    else:
+        project_ids = [instance.pk]
+    for project_id in project_ids:
+        counters.rebuild_project(project_id)
+
+
+# --- Search index ---
+
+@receiver(post_save, sender=Task)
+def update_task_search_index(sender, instance, created, raw=False, **kwargs):
+    if raw or not _text_changed(instance, created, TASK_SEARCH_FIELDS):
+        return
+    search.index_task(instance.pk)
+
+
+@receiver(post_save, sender=TaskComment)
+def update_comment_search_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_task(instance.task_id)
+
+
+@receiver(post_delete, sender=TaskComment)
+def remove_comment_from_search_index(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, (Task, Project)) or from_bulk_delete(origin):
+        # The task's postings cascade away with it
+        return
+    search.index_task(instance.task_id)
+
+
+@receiver(post_save, sender=Project)
+def update_project_search_index(sender, instance, created, raw=False, **kwargs):
+    if raw or not _text_changed(instance, created, PROJECT_SEARCH_FIELDS):
+        return
+    search.index_projects([instance.pk])
+
+
+# --- Normalized tags ---
+
+@receiver(post_save, sender=Task)
+def sync_task_tags(sender, instance, created, raw=False, **kwargs):
+    if raw or not _text_changed(instance, created, ('tags',)):
+        return
+    tags.sync_task_tags([instance])
+
+
+@receiver(post_delete, sender=Task)
+def expire_tag_cloud(sender, instance, origin=None, **kwargs):
+    # TaskTag rows cascade with the task; cached counts must not outlive them
+    if instance.tags and not from_bulk_delete(origin):
+        tags.bump_tag_cloud_version()
+
+
+# --- Live updates (tasks:event_stream) ---
+
+@receiver(post_save, sender=Task)
+def publish_task_change(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    old = getattr(instance, '_loaded_values', None)
+    if not old:
+        return
+    if old['status'] != instance.status:
+        events.publish_on_commit(events.task_event('status', instance))
+    elif old['progress'] != instance.progress:
+        events.publish_on_commit(events.task_event('progress', instance))
+
+
+@receiver(post_save, sender=TaskComment)
+def publish_new_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        events.publish_on_commit(events.comment_event(instance))
+
+
+@receiver(post_save, sender=TaskAttachment)
+def publish_new_attachment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        events.publish_on_commit(events.attachment_event(instance))
+
+
+# --- Attachment files ---
+
+@receiver(post_save, sender=TaskAttachment)
+def queue_attachment_processing(sender, instance, created, raw=False, **kwargs):
+    """Thumbnails, metadata and the virus scan run in Celery once the row commits."""
+    if created and not raw:
+        processing.schedule_processing(instance)
+
+
+@receiver(post_delete, sender=TaskAttachment)
+def delete_stored_file(sender, instance, **kwargs):
+    """Removes the file and its thumbnail once the row's deletion has committed (tasks/storage.py)."""
+    backend = storage.get_backend(instance.storage)
+    # robust: a storage hiccup leaves an orphaned file, not a failed delete
+    transaction.on_commit(lambda: backend.delete(instance), robust=True)
+    if instance.thumbnail:
+        transaction.on_commit(lambda: backend.delete_thumbnail(instance), robust=True)
+
+
+# --- Filter / form choice lists (tasks/choices.py) ---
+
+@receiver(post_save, sender=Project)
+def expire_project_choices(sender, instance, created, raw=False, **kwargs):
+    if raw or not _text_changed(instance, created, ('title', 'team_lead_id')):
+        return
+    choices.forget_choices([instance.pk])
+
+
+@receiver(post_delete, sender=Project)
+def expire_deleted_project_choices(sender, instance, **kwargs):
+    choices.forget_choices([instance.pk])
+
+
+@receiver(m2m_changed, sender=Project.team_members.through)
+def expire_team_choices(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # user.projects_assigned.clear(): the projects are only known beforehand
+        choices.forget_choices(instance.projects_assigned.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove') or (action == 'post_clear' and not reverse):
+        choices.forget_choices(pk_set if reverse else [instance.pk])
@@ -0,0 +1,170 @@
+"""
+Where attachment files live (settings.ATTACHMENT_STORAGE).
+
+    cloudinary -> uploaded to Cloudinary; links are signed, cached URLs (tasks/attachment_urls.py)
+    filesystem -> saved in a Django storage and streamed by tasks:download_attachment, so
+                  nothing leaves the network (tests, air-gapped installs). The storage is a
+                  directory under ATTACHMENT_ROOT, or the STORAGES alias named by
+                  ATTACHMENT_STORAGE_ALIAS (an S3-compatible bucket, say)
+
+The setting only picks where new files go: each TaskAttachment records its backend
+in `storage`, and is opened, linked and deleted through that one. For the filesystem
+backend the `file` column holds the name inside the storage. Thumbnails
+(tasks/processing.py) follow their attachment: the default storage for Cloudinary
+attachments, the attachment storage (served by tasks:download_attachment) otherwise.
+The parts of a chunked upload (tasks/uploads.py) are kept by the backend too, so the
+web process that receives them and the Celery worker that assembles them share them.
+"""
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, storages
+from django.http import FileResponse, HttpResponseRedirect
+from django.urls import reverse
+from django.utils.text import get_valid_filename
+
+from .attachment_urls import attachment_url
+
+# Cloudinary originals read back for processing stay in memory up to this size
+DOWNLOAD_SPOOL_SIZE = 10 * 1024 * 1024
+DOWNLOAD_TIMEOUT = 30
+
+
+def _download(url):
+    """The file at `url`, downloaded into a temporary file."""
+    import requests
+
+    spool = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_SIZE)
+    with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        response.raise_for_status()
+        for data in response.iter_content(chunk_size=64 * 1024):
+            spool.write(data)
+    spool.seek(0)
+    return spool
+
+
+class CloudinaryBackend:
+    name = 'cloudinary'
+
+    def save(self, attachment, file):
+        """Uploads `file` with the model field's options and sets attachment.file; doesn't save the row."""
+        from cloudinary import uploader
+
+        field = attachment._meta.get_field('file')
+        options = {'type': field.type, 'resource_type': field.resource_type, **field.options}
+        attachment.file = uploader.upload_resource(file, **options)
+
+    def url(self, attachment, kind):
+        return attachment_url(attachment, kind)
+
+    def open(self, attachment):
+        """The original, downloaded into a temporary file (background processing only)."""
+        return _download(self.url(attachment, 'view'))
+
+    def response(self, attachment, kind):
+        return HttpResponseRedirect(self.url(attachment, kind))
+
+    def delete(self, attachment):
+        # Cloudinary assets are left in place, as they always have been
+        pass
+
+    def save_thumbnail(self, attachment, name, content):
+        attachment.thumbnail.save(name, content, save=False)
+
+    def thumbnail_url(self, attachment):
+        return attachment.thumbnail.url
+
+    def thumbnail_response(self, attachment):
+        return HttpResponseRedirect(self.thumbnail_url(attachment))
+
+    def delete_thumbnail(self, attachment):
+        attachment.thumbnail.delete(save=False)
+
+    # Chunked-upload parts (tasks/uploads.py): private raw assets the worker reads back
+
+    def save_part(self, name, file):
+        from cloudinary import uploader
+
+        return uploader.upload(file, public_id=name, resource_type='raw', type='private')['public_id']
+
+    def open_part(self, name):
+        from cloudinary.utils import private_download_url
+
+        return _download(private_download_url(name, '', resource_type='raw', type='private'))
+
+    def delete_part(self, name):
+        from cloudinary import uploader
+
+        uploader.destroy(name, resource_type='raw', type='private', invalidate=True)
+
+
+class FileSystemBackend:
+    name = 'filesystem'
+
+    @property
+    def storage(self):
+        if settings.ATTACHMENT_STORAGE_ALIAS:
+            return storages[settings.ATTACHMENT_STORAGE_ALIAS]
+        return FileSystemStorage(location=settings.ATTACHMENT_ROOT)
+
+    @staticmethod
+    def stored_name(attachment):
+        """The name inside the storage; the Cloudinary field parses it into public_id + format on load."""
+        resource = attachment.file
+        if isinstance(resource, str):
+            return resource
+        return f"{resource.public_id}.{resource.format}" if resource.format else resource.public_id
+
+    def save(self, attachment, file):
+        # A directory per file keeps the original name without collisions
+        name = f"task_attachments/{uuid.uuid4().hex}/{get_valid_filename(attachment.file_name) or 'file'}"
+        attachment.file = self.storage.save(name, file)
+
+    def url(self, attachment, kind):
+        url = reverse('tasks:download_attachment', args=[attachment.pk])
+        return f"{url}?inline=1" if kind == 'view' else url
+
+    def open(self, attachment):
+        return self.storage.open(self.stored_name(attachment))
+
+    def response(self, attachment, kind):
+        return FileResponse(
+            self.storage.open(self.stored_name(attachment)),
+            as_attachment=kind == 'download',
+            filename=attachment.file_name,
+        )
+
+    def delete(self, attachment):
+        self.storage.delete(self.stored_name(attachment))
+
+    def save_thumbnail(self, attachment, name, content):
+        # Only the name goes in the thumbnail column; the field's own storage is never used
+        name = f"attachment_thumbnails/{uuid.uuid4().hex}/{get_valid_filename(name) or 'thumbnail.jpg'}"
+        attachment.thumbnail = self.storage.save(name, content)
+
+    def thumbnail_url(self, attachment):
+        return f"{reverse('tasks:download_attachment', args=[attachment.pk])}?thumbnail=1"
+
+    def thumbnail_response(self, attachment):
+        return FileResponse(self.storage.open(attachment.thumbnail.name), content_type='image/jpeg')
+
+    def delete_thumbnail(self, attachment):
+        self.storage.delete(attachment.thumbnail.name)
+
+    def save_part(self, name, file):
+        return self.storage.save(name, file)
+
+    def open_part(self, name):
+        return self.storage.open(name)
+
+    def delete_part(self, name):
+        self.storage.delete(name)
+
+
+BACKENDS = {backend.name: backend for backend in (CloudinaryBackend(), FileSystemBackend())}
+
+
+def get_backend(name=None):
+    """The backend an attachment was stored with, or (no name) the one new files go to."""
+    return BACKENDS[name or settings.ATTACHMENT_STORAGE]
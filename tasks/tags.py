@@ -0,0 +1,83 @@
+"""
+Normalized task tags.
+
+Task.tags stays the comma-separated string forms, the admin and API clients read
+and write. Whenever it changes, the Tag / TaskTag rows are synced from it so tag
+filters and per-tag counts are indexed lookups on TaskTag(tag, task) instead of
+icontains scans over the string.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Tag, TaskTag
+
+MAX_TAG_LENGTH = 50
+
+# Bumped on every tag change; part of each cached tag-cloud key
+TAG_CLOUD_VERSION_KEY = 'tag-cloud-version'
+TAG_CLOUD_TIMEOUT = 300
+
+
+def parse_tags(value):
+    """'Backend, urgent,,backend' -> ['backend', 'urgent'] (lower-cased, deduplicated, in order)."""
+    if not value:
+        return []
+    names = (name.strip().lower()[:MAX_TAG_LENGTH] for name in value.split(','))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def _get_tags(names):
+    """Tag rows for the given names, creating the missing ones."""
+    tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+    missing = [name for name in names if name not in tags]
+    if missing:
+        Tag.objects.bulk_create([Tag(name=name) for name in missing], ignore_conflicts=True)
+        tags.update((tag.name, tag) for tag in Tag.objects.filter(name__in=missing))
+    return tags
+
+
+@transaction.atomic
+def sync_task_tags(tasks):
+    """Rewrites the TaskTag rows of the given tasks from their `tags` strings."""
+    wanted = {task.pk: parse_tags(task.tags) for task in tasks}
+    if not wanted:
+        return
+    tags = _get_tags({name for names in wanted.values() for name in names})
+
+    TaskTag.objects.filter(task_id__in=wanted).delete()
+    TaskTag.objects.bulk_create([
+        TaskTag(task_id=task_id, tag=tags[name])
+        for task_id, names in wanted.items()
+        for name in names
+    ], batch_size=1000)
+    bump_tag_cloud_version()
+
+
+def bump_tag_cloud_version():
+    # A timestamp rather than incr(): an evicted counter restarting at 1 could revive stale entries
+    cache.set(TAG_CLOUD_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def tag_counts(task_queryset, scope):
+    """
+    [{'name': ..., 'count': ...}] over the tasks in `task_queryset`, most used first.
+    `scope` names the audience the queryset was built for ('all' or a user id); the
+    result is cached per scope until any task's tags change (or TAG_CLOUD_TIMEOUT).
+    """
+    version = cache.get_or_set(TAG_CLOUD_VERSION_KEY, time.time_ns, timeout=None)
+    key = f'tag-cloud:{scope}:{version}'
+    counts = cache.get(key)
+    if counts is None:
+        counts = list(
+            TaskTag.objects.filter(task__in=task_queryset.order_by().values('pk'))
+            .values('tag__name')
+            .annotate(count=Count('task_id'))
+            .order_by('-count', 'tag__name')
+            .values_list('tag__name', 'count')
+        )
+        counts = [{'name': name, 'count': count} for name, count in counts]
+        cache.set(key, counts, TAG_CLOUD_TIMEOUT)
+    return counts
@@ -0,0 +1,41 @@
+import logging
+
+from celery import shared_task
+
+from .models import AttachmentUpload, TaskAttachment
+from .processing import process
+from .uploads import expire_uploads, finalize_upload
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def finalize_attachment_upload(upload_id):
+    """Stores a fully received chunked upload and creates its attachment (tasks/uploads.py)."""
+    upload = AttachmentUpload.objects.filter(pk=upload_id, status='processing').first()
+    if upload is None:
+        return None
+    attachment = finalize_upload(upload)
+    return attachment.pk if attachment else None
+
+
+@shared_task
+def expire_attachment_uploads():
+    """Deletes abandoned chunked uploads and their part files (scheduled hourly by Celery beat)."""
+    return expire_uploads()
+
+
+@shared_task
+def process_attachment(attachment_id):
+    """Virus scan, metadata and thumbnail for a new attachment (tasks/processing.py)."""
+    attachment = TaskAttachment.objects.filter(pk=attachment_id).first()
+    if attachment is None:
+        return None
+    try:
+        process(attachment)
+    except Exception:
+        # Unreachable original, corrupt file...: keep the attachment, without extras
+        logger.exception("Could not process attachment %s", attachment_id)
+        TaskAttachment.objects.filter(pk=attachment_id).update(processing_status='failed')
+        return 'failed'
+    return attachment.processing_status
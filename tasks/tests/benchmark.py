@@ -0,0 +1,141 @@
+"""
+Route benchmark harness (used by test_benchmark.py).
+
+Requests every named route of the tasks, projects and accounts apps as each role,
+recording query count, wall time and response size. Each request runs inside a
+rolled-back atomic block, so POST endpoints don't change the dataset for the
+routes measured after them.
+"""
+import json
+import logging
+import time
+from pathlib import Path
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+
+BENCHMARK_NAMESPACES = ('tasks', 'projects', 'accounts')
+BENCHMARK_ROLES = ('admin', 'manager', 'developer', 'observer')
+
+BUDGETS_PATH = Path(__file__).with_name('benchmark_budgets.json')
+
+# URL kwargs per route, from the benchmark fixture (routes without kwargs are omitted)
+ROUTE_KWARGS = {
+    'tasks:task_detail': lambda f: {'pk': f.task.pk},
+    'tasks:task_update': lambda f: {'pk': f.task.pk},
+    'tasks:task_delete': lambda f: {'pk': f.task.pk},
+    'tasks:add_comment': lambda f: {'pk': f.task.pk},
+    'tasks:comment_edit': lambda f: {'pk': f.comment.pk},
+    'tasks:comment_delete': lambda f: {'pk': f.comment.pk},
+    'tasks:update_status': lambda f: {'pk': f.task.pk},
+    'tasks:update_progress': lambda f: {'pk': f.task.pk},
+    'tasks:add_attachment': lambda f: {'pk': f.task.pk},
+    'tasks:delete_attachment': lambda f: {'pk': f.attachment.pk},
+    'tasks:start_attachment_upload': lambda f: {'pk': f.task.pk},
+    'tasks:attachment_upload': lambda f: {'upload_id': f.upload.pk},
+    'tasks:download_attachment': lambda f: {'pk': f.attachment.pk},
+    'tasks:clear_history': lambda f: {'pk': f.task.pk},
+    'tasks:task_history': lambda f: {'pk': f.task.pk},
+    'projects:project_detail': lambda f: {'pk': f.project.pk},
+    'projects:project_update': lambda f: {'pk': f.project.pk},
+    'projects:project_delete': lambda f: {'pk': f.project.pk},
+    'projects:get_project_members': lambda f: {'project_id': f.project.pk},
+    'accounts:password_reset_confirm': lambda f: {'uidb64': f.reset_uidb64, 'token': f.reset_token},
+}
+
+# Routes whose interesting path is a POST: (data, is_ajax). Everything else is a plain GET.
+ROUTE_POSTS = {
+    'tasks:update_status': ({'status': 'in_review'}, True),
+    'tasks:update_progress': ({'progress': 50}, True),
+    'tasks:add_comment': ({'comment': 'Benchmark comment'}, True),
+}
+
+# Transaction bookkeeping of the rollback wrapper; not the view's queries
+_WRAPPER_SQL = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+def named_routes(namespaces=BENCHMARK_NAMESPACES):
+    resolver = get_resolver()
+    for namespace in namespaces:
+        _, app_resolver = resolver.namespace_dict[namespace]
+        for pattern in app_resolver.url_patterns:
+            if getattr(pattern, 'name', None):
+                yield f'{namespace}:{pattern.name}'
+
+
+def _measure(client, route, url):
+    data, is_ajax = ROUTE_POSTS.get(route, (None, False))
+    headers = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'} if is_ajax else {}
+    cache.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        started = time.perf_counter()
+        with transaction.atomic():
+            if data is None:
+                response = client.get(url, **headers)
+            else:
+                response = client.post(url, data, **headers)
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+            transaction.set_rollback(True)
+        elapsed = time.perf_counter() - started
+    queries = [q for q in ctx.captured_queries if not q['sql'].startswith(_WRAPPER_SQL)]
+    return {
+        'method': 'GET' if data is None else 'POST',
+        'status': response.status_code,
+        'queries': len(queries),
+        'ms': round(elapsed * 1000, 2),
+        'bytes': len(body),
+    }
+
+
+def run_benchmark(fixture, users, roles=BENCHMARK_ROLES):
+    """[{route, role, method, status, queries, ms, bytes}] for every named route x role."""
+    results = []
+    # 403s/404s/500s are expected for some role x route pairs; they're in the report
+    request_logger = logging.getLogger('django.request')
+    level = request_logger.level
+    request_logger.setLevel(logging.CRITICAL)
+    try:
+        for role in roles:
+            client = Client(raise_request_exception=False)
+            client.force_login(users[role])
+            for route in named_routes():
+                kwargs = ROUTE_KWARGS[route](fixture) if route in ROUTE_KWARGS else {}
+                url = reverse(route, kwargs=kwargs)
+                results.append({'route': route, 'role': role, **_measure(client, route, url)})
+    finally:
+        request_logger.setLevel(level)
+    return results
+
+
+def load_budgets(path=BUDGETS_PATH):
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def write_budgets(results, path=BUDGETS_PATH):
+    budgets = {}
+    for row in results:
+        budgets.setdefault(row['route'], {})[row['role']] = row['queries']
+    path.write_text(json.dumps(budgets, indent=2, sort_keys=True) + '\n')
+
+
+def check_budgets(results, budgets):
+    """Human-readable violations: over budget, or no budget checked in for a route/role."""
+    violations = []
+    for row in results:
+        budget = budgets.get(row['route'], {}).get(row['role'])
+        if budget is None:
+            violations.append(f"{row['route']} as {row['role']}: no budget ({row['queries']} queries)")
+        elif row['queries'] > budget:
+            violations.append(f"{row['route']} as {row['role']}: {row['queries']} queries > budget {budget}")
+    return violations
+
+
+def write_report(results, path, meta=None):
+    path = Path(path)
+    path.write_text(json.dumps({'meta': meta or {}, 'results': results}, indent=2) + '\n')
+    return path
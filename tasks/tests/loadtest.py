@@ -0,0 +1,145 @@
+"""
+Per-process concurrency load test for the hot AJAX endpoints (used by test_loadtest.py).
+
+Sends the same request N times through an endpoint's sync view, on a fixed pool of
+worker threads (a gunicorn sync worker has 1, run.sh starts 2), and through its
+async variant as concurrent requests on one event loop, each in its own
+ThreadSensitiveContext as config.asgi serves them. Every SQL query is delayed by
+a fixed latency to stand in for MySQL round trips (SQLite answers in
+microseconds). The report has wall time, throughput and the most queries that
+were in flight at once.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncRequestFactory, RequestFactory
+from django.utils.functional import SimpleLazyObject
+
+
+class QueryLatency:
+    """Execute wrapper that delays every query on every connection and counts queries in flight."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self._lock = threading.Lock()
+        self.in_flight = self.peak = self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.in_flight += 1
+            self.queries += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(self.seconds)
+            return execute(sql, params, many, context)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _wrap(self, connection):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def _on_connection_created(self, sender, connection, **kwargs):
+        self._wrap(connection)
+
+    @contextmanager
+    def installed(self):
+        # Worker and ORM threads open their own connections; wrap each as it connects
+        connection_created.connect(self._on_connection_created)
+        local = list(connections.all(initialized_only=True))
+        for connection in local:
+            self._wrap(connection)
+        try:
+            yield self
+        finally:
+            connection_created.disconnect(self._on_connection_created)
+            for connection in local:
+                connection.execute_wrappers.remove(self)
+
+
+def _attach_user(request, user_id):
+    """What AuthenticationMiddleware would do: a lazily loaded request.user and auser()."""
+    request.user = SimpleLazyObject(lambda: User.objects.get(pk=user_id))
+
+    async def auser():
+        if not hasattr(request, '_acached_user'):
+            request._acached_user = await User.objects.aget(pk=user_id)
+        return request._acached_user
+
+    request.auser = auser
+    return request
+
+
+def _build(factory, user_id, method, path, data, ajax):
+    headers = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'} if ajax else {}
+    request = getattr(factory, method.lower())(path, data or {}, **headers)
+    return _attach_user(request, user_id)
+
+
+def _summary(mode, workers, statuses, elapsed, latency):
+    return {
+        'mode': mode,
+        'workers': workers,
+        'requests': len(statuses),
+        'statuses': sorted(set(statuses)),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(statuses) / elapsed, 1) if elapsed else 0.0,
+        'queries': latency.queries,
+        'peak_queries_in_flight': latency.peak,
+    }
+
+
+def run_sync(view, user_id, path, requests, threads, latency_seconds, method='GET', data=None, ajax=True,
+             view_kwargs=None):
+    """The sync view on `threads` worker threads, as one WSGI process serves it."""
+    factory = RequestFactory()
+    latency = QueryLatency(latency_seconds)
+
+    def one(_):
+        request = _build(factory, user_id, method, path, data, ajax)
+        try:
+            return view(request, **(view_kwargs or {})).status_code
+        finally:
+            connections.close_all()
+
+    with latency.installed():
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            statuses = list(pool.map(one, range(requests)))
+        elapsed = time.perf_counter() - started
+    return _summary('sync', threads, statuses, elapsed, latency)
+
+
+def run_async(view, user_id, path, requests, concurrency, latency_seconds, method='GET', data=None, ajax=True,
+              view_kwargs=None):
+    """The async view with up to `concurrency` requests in flight on one event loop."""
+    factory = AsyncRequestFactory()
+    latency = QueryLatency(latency_seconds)
+
+    async def one(semaphore):
+        async with semaphore:
+            # ASGIHandler gives every request its own context, so its ORM calls
+            # get their own thread instead of queueing behind other requests
+            async with ThreadSensitiveContext():
+                request = _build(factory, user_id, method, path, data, ajax)
+                response = await view(request, **(view_kwargs or {}))
+                await sync_to_async(connections.close_all)()
+                return response.status_code
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(one(semaphore) for _ in range(requests)))
+
+    with latency.installed():
+        started = time.perf_counter()
+        statuses = asyncio.run(main())
+        elapsed = time.perf_counter() - started
+    return _summary('async', concurrency, statuses, elapsed, latency)
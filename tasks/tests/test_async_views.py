@@ -0,0 +1,64 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, override_settings
+from django.urls import include, path, reverse
+
+from tasks import async_views, views
+from tasks.models import Task, TaskComment, TaskHistory
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+# The tasks routes as AJAX_VIEWS_MODE='async' wires them
+urlpatterns = [
+    path('', include(([
+        path('', async_views.dashboard, name='dashboard'),
+        path('tasks/<int:pk>/', views.TaskDetailView.as_view(), name='task_detail'),
+        path('tasks/<int:pk>/comment/', async_views.add_comment, name='add_comment'),
+        path('tasks/<int:pk>/status/', async_views.update_task_status, name='update_status'),
+        path('tasks/<int:pk>/progress/', async_views.update_progress, name='update_progress'),
+    ], 'tasks'))),
+]
+
+AJAX = {'headers': {'x-requested-with': 'XMLHttpRequest'}}
+
+
+@override_settings(ROOT_URLCONF='tasks.tests.test_async_views')
+class AsyncAjaxViewTests(BaseTaskTestCase):
+
+    async def client_for(self, user):
+        client = AsyncClient()
+        await client.aforce_login(user)
+        return client
+
+    async def test_progress_applies_the_slider_rules(self):
+        client = await self.client_for(self.developer)
+        response = await client.post(reverse('tasks:update_progress', args=[self.task.pk]), {'progress': 90}, **AJAX)
+        data = json.loads(response.content)
+        self.assertEqual((data['progress'], data['new_status'], data['log_old']), (90, 'In Review', 'To Do'))
+        task = await Task.objects.aget(pk=self.task.pk)
+        self.assertEqual((task.status, task.progress), ('in_review', 90))
+        self.assertEqual(await TaskHistory.objects.filter(task=task).acount(), 1)
+
+    async def test_status_requires_edit_rights(self):
+        client = await self.client_for(self.other_dev)
+        response = await client.post(reverse('tasks:update_status', args=[self.task.pk]), {'status': 'completed'}, **AJAX)
+        self.assertEqual(response.status_code, 403)
+
+        client = await self.client_for(self.manager)
+        response = await client.post(reverse('tasks:update_status', args=[self.task.pk]), {'status': 'completed'}, **AJAX)
+        self.assertEqual(json.loads(response.content)['progress'], 100)
+
+    async def test_comment(self):
+        client = await self.client_for(self.developer)
+        response = await client.post(reverse('tasks:add_comment', args=[self.task.pk]), {'comment': "Async hello"}, **AJAX)
+        self.assertEqual(json.loads(response.content)['user'], 'dev')
+        self.assertTrue(await TaskComment.objects.filter(task=self.task, commented_by=self.developer).aexists())
+
+    async def test_dashboard_matches_the_sync_view(self):
+        client = await self.client_for(self.developer)
+        for params in ({'view': 'personal'}, {'view': 'team', 'q': 'test'}):
+            response = await client.get(reverse('tasks:dashboard'), params, **AJAX)
+            with override_settings(ROOT_URLCONF='config.urls'):
+                await sync_to_async(self.client.force_login)(self.developer)
+                expected = await sync_to_async(self.client.get)(reverse('tasks:dashboard'), params, **AJAX)
+            self.assertEqual(json.loads(response.content), json.loads(expected.content))
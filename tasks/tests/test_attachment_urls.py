@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from tasks import attachment_urls
+from tasks.models import TaskAttachment
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+SIGNED = []
+
+
+def stub_signer(attachment, kind):
+    SIGNED.append((attachment.pk, kind))
+    return f"https://signed.test/{kind}/{attachment.pk}/v{attachment.file.version}"
+
+
+@override_settings(ATTACHMENT_URL_SIGNER='tasks.tests.test_attachment_urls.stub_signer')
+class AttachmentUrlTests(BaseTaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        SIGNED.clear()
+        for i in range(1, 4):
+            TaskAttachment.objects.create(task=self.task, uploaded_by=self.developer,
+                                          file=f'image/upload/v{i}/task_attachments/f{i}.pdf', file_name=f"f{i}.pdf")
+        # Loaded back, as views see them: file is a CloudinaryResource with a version
+        self.files = list(TaskAttachment.objects.filter(task=self.task))
+
+    def test_batch_signs_each_file_once(self):
+        urls = attachment_urls.attachment_urls(self.files, 'view')
+        self.assertEqual(len(urls), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(attachment_urls.attachment_urls(self.files, 'view'), urls)
+        self.assertEqual(len(SIGNED), 3)
+
+        # Kinds and versions are cached apart
+        attachment_urls.attachment_url(self.files[0], 'download')
+        self.files[0].file.version = '99'
+        self.assertTrue(attachment_urls.attachment_url(self.files[0], 'view').endswith('/v99'))
+        self.assertEqual(len(SIGNED), 5)
+
+    @override_settings(ATTACHMENT_URL_LIFETIME=3600)
+    def test_ttl_is_below_the_signature_lifetime(self):
+        with patch.object(cache, 'set_many') as set_many:
+            attachment_urls.attachment_urls(self.files[:1])
+        self.assertEqual(set_many.call_args.args[1], 3600 - attachment_urls.URL_EXPIRY_MARGIN)
+
+    def test_detail_page_and_download_use_the_cache(self):
+        self.client.login(username='dev', password='pass')
+        response = self.client.get(reverse('tasks:task_detail', args=[self.task.pk]))
+        self.assertContains(response, f'data-url="https://signed.test/view/{self.files[0].pk}/')
+        response = self.client.get(reverse('tasks:task_detail', args=[self.task.pk]))
+        self.assertEqual(len(SIGNED), 3)
+
+        for _ in range(2):
+            response = self.client.get(reverse('tasks:download_attachment', args=[self.files[0].pk]))
+            self.assertTrue(response['Location'].startswith('https://signed.test/download/'))
+        self.assertEqual(len(SIGNED), 4)
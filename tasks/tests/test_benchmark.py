@@ -0,0 +1,89 @@
+import os
+import tempfile
+from types import SimpleNamespace
+
+import cloudinary
+
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test import TestCase
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from create_demo_data import seed_synthetic
+from tasks.models import AttachmentUpload, Task, TaskAttachment, TaskComment
+from tasks.tests import benchmark
+
+# Dataset size; the checked-in budgets were measured at these defaults.
+# e.g. BENCHMARK_TASKS=200000 BENCHMARK_USERS=500 BENCHMARK_PROJECTS=50 for a full run.
+DATASET = {
+    'projects': int(os.getenv('BENCHMARK_PROJECTS', '4')),
+    'users': int(os.getenv('BENCHMARK_USERS', '40')),
+    'tasks': int(os.getenv('BENCHMARK_TASKS', '400')),
+}
+
+
+class RouteBenchmarkTests(TestCase):
+    """
+    Query-count budgets for every named route and role. After an intentional change,
+    re-measure with BENCHMARK_WRITE_BUDGETS=1 and commit benchmark_budgets.json.
+    The JSON report goes to BENCHMARK_REPORT (default: the temp directory).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # Signed attachment URLs are built locally but need an account name
+        config = cloudinary.config()
+        cls._cloudinary = (config.cloud_name, config.api_key, config.api_secret)
+        cloudinary.config(cloud_name='benchmark', api_key='benchmark', api_secret='benchmark')
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cloud_name, api_key, api_secret = cls._cloudinary
+        cloudinary.config(cloud_name=cloud_name, api_key=api_key, api_secret=api_secret)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_synthetic(**DATASET, stdout=lambda *args: None)
+        developer = cls.users['developer']
+        task = Task.objects.filter(assigned_to=developer, project__status='active').first()
+        task = task or Task.objects.filter(assigned_to=developer).first()
+        cls.fixture = SimpleNamespace(
+            task=task,
+            project=task.project,
+            comment=TaskComment.objects.create(task=task, commented_by=developer, comment="Benchmark"),
+            attachment=TaskAttachment.objects.create(
+                task=task, uploaded_by=developer, file='task_attachments/sample', file_name='sample.pdf'
+            ),
+            upload=AttachmentUpload.objects.create(
+                task=task, uploaded_by=developer, file_name='sample.zip', size=1024
+            ),
+            reset_uidb64=urlsafe_base64_encode(force_bytes(developer.pk)),
+            reset_token=default_token_generator.make_token(developer),
+        )
+
+    def test_every_route_with_arguments_has_a_fixture(self):
+        for route in benchmark.named_routes():
+            with self.subTest(route=route):
+                pattern_has_args = '<' in str(self.resolve_pattern(route))
+                self.assertEqual(pattern_has_args, route in benchmark.ROUTE_KWARGS)
+
+    def resolve_pattern(self, route):
+        from django.urls import get_resolver
+        namespace, name = route.split(':')
+        _, app_resolver = get_resolver().namespace_dict[namespace]
+        return next(p.pattern for p in app_resolver.url_patterns if getattr(p, 'name', None) == name)
+
+    def test_query_budgets(self):
+        results = benchmark.run_benchmark(self.fixture, self.users)
+        report = benchmark.write_report(
+            results,
+            os.getenv('BENCHMARK_REPORT', os.path.join(tempfile.gettempdir(), 'taskflow_benchmark.json')),
+            meta={'dataset': DATASET, 'vendor': connection.vendor},
+        )
+        if os.getenv('BENCHMARK_WRITE_BUDGETS'):
+            benchmark.write_budgets(results)
+        violations = benchmark.check_budgets(results, benchmark.load_budgets())
+        self.assertEqual(violations, [], f"Query budgets exceeded (report: {report})")
@@ -0,0 +1,103 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+
+from projects.models import Project, ProjectMembership
+from tasks.bulk import BulkActionError, apply_bulk_action
+from tasks.models import Task, TaskHistory
+from tasks.tests.test_dashboard_counters import snapshot
+from tasks.tests.test_tasks import BaseTaskTestCase
+from tasks import counters
+
+
+class BulkActionTests(BaseTaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tasks = Task.objects.bulk_create(
+            Task(title=f"Bulk {i}", project=self.project, assigned_by=self.manager, status='todo', progress=0)
+            for i in range(30)
+        )
+        self.project.recompute_rollup()
+        counters.rebuild_project(self.project.pk)
+        self.ids = [task.pk for task in self.tasks]
+
+    def assertDerivedDataConsistent(self):
+        incremental = snapshot()
+        counters.rebuild_all()
+        self.assertEqual(incremental, snapshot())
+        project = Project.objects.get(pk=self.project.pk)
+        expected = project.aggregate_rollup()
+        self.assertEqual({f: getattr(project, f) for f in expected}, expected)
+
+    def test_status_writes_history_and_rollup_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            result = apply_bulk_action(self.manager, self.ids, 'status', 'completed')
+        self.assertEqual(len(result.changed), 30)
+        self.assertEqual(Task.objects.filter(pk__in=self.ids, status='completed', progress=100).count(), 30)
+        self.assertEqual(TaskHistory.objects.filter(task_id__in=self.ids, new_status='Completed').count(), 30)
+        # Constant in the number of tasks: no per-row saves, inserts or rollups
+        self.assertLess(len(ctx.captured_queries), 30)
+        self.assertDerivedDataConsistent()
+
+    def test_permissions_follow_single_task_views(self):
+        self.tasks[0].assigned_to = self.developer
+        self.tasks[0].save()
+        result = apply_bulk_action(self.developer, self.ids[:3], 'status', 'in_progress')
+        self.assertEqual(result.changed, [self.ids[0]])
+        self.assertEqual(sorted(result.skipped), self.ids[1:3])
+        # Developers can't reassign or delete, even their own tasks
+        self.assertEqual(apply_bulk_action(self.developer, self.ids[:1], 'priority', 'high').changed, [])
+        self.assertEqual(apply_bulk_action(self.developer, self.ids[:1], 'delete').changed, [])
+
+    def test_assignee_must_be_on_the_project_team(self):
+        result = apply_bulk_action(self.manager, self.ids, 'assignee', self.other_dev.pk)
+        self.assertEqual(result.changed, [])
+        result = apply_bulk_action(self.manager, self.ids, 'assignee', self.developer.pk)
+        self.assertEqual(len(result.changed), 30)
+        membership = ProjectMembership.objects.get(user=self.developer, project=self.project)
+        self.assertEqual(membership.assigned_task_count, 31)
+        self.assertDerivedDataConsistent()
+
+    def test_delete_skips_per_row_signals(self):
+        apply_bulk_action(self.admin, self.ids, 'delete')
+        self.assertFalse(Task.objects.filter(pk__in=self.ids).exists())
+        self.assertDerivedDataConsistent()
+
+    def test_invalid_value(self):
+        with self.assertRaises(BulkActionError):
+            apply_bulk_action(self.manager, self.ids, 'status', 'bogus')
+
+    def test_endpoint(self):
+        self.client.login(username='manager', password='pass')
+        response = self.client.post(
+            reverse('tasks:bulk_action'),
+            {'action': 'priority', 'value': 'high', 'task_ids': self.ids},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.json()['status'], 'success')
+        self.assertEqual(Task.objects.filter(pk__in=self.ids, priority='high').count(), 30)
+        response = self.client.post(
+            reverse('tasks:bulk_action'), {'action': 'explode', 'task_ids': self.ids},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_toolbar_offers_the_assignees_the_action_accepts(self):
+        root = User.objects.create_superuser(username='root', password='pass')
+        # The cached superuser ids would outlive this test's rollback
+        self.addCleanup(cache.clear)
+        self.project.team_members.add(root)
+        stranger = User.objects.create_user(username='stranger', password='pass')
+        elsewhere = Project.objects.create(title="Elsewhere", status='active', created_by=self.admin)
+        elsewhere.team_members.add(stranger)
+
+        def offered(username):
+            self.client.login(username=username, password='pass')
+            response = self.client.get(reverse('tasks:task_list'))
+            return {user.username for user in response.context['bulk_assignees']}
+
+        self.assertEqual(offered('dev'), {'dev', 'manager', 'admin'})
+        self.assertTrue({'root', 'stranger'} <= offered('manager'))
@@ -0,0 +1,64 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from tasks.filters import TaskFilter
+from tasks.forms import TaskForm
+from tasks.models import Task
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+
+class ChoiceCacheTests(BaseTaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def filter_bar(self, user, data=None):
+        filterset = TaskFilter(data or {}, queryset=Task.objects.all(), user=user)
+        form = filterset.form
+        return filterset, str(form['project']) + str(form['assigned_to'])
+
+    def options(self, field):
+        return [label for value, label in field.choices if value != '']
+
+    def test_warm_filter_bar_costs_no_queries(self):
+        developer = User.objects.get(pk=self.developer.pk)
+        self.filter_bar(developer)
+        with self.assertNumQueries(0):
+            _, html = self.filter_bar(developer)
+        self.assertIn("Test Project", html)
+        self.assertIn(">manager<", html)
+
+    def test_team_and_project_changes_expire_the_lists(self):
+        newcomer = User.objects.create_user(username='newcomer', password='pass')
+        filterset, _ = self.filter_bar(self.developer)
+        self.assertNotIn('newcomer', self.options(filterset.form.fields['assigned_to']))
+
+        self.project.team_members.add(newcomer)
+        self.project.title = "Renamed"
+        self.project.save()
+        filterset, _ = self.filter_bar(self.developer)
+        self.assertIn('newcomer', self.options(filterset.form.fields['assigned_to']))
+        self.assertEqual(self.options(filterset.form.fields['project']), ["Renamed"])
+
+        newcomer.projects_assigned.clear()
+        filterset, _ = self.filter_bar(self.developer)
+        self.assertNotIn('newcomer', self.options(filterset.form.fields['assigned_to']))
+
+    def test_submitted_values_are_still_validated(self):
+        hidden = User.objects.create_user(username='hidden', password='pass')
+        filterset, _ = self.filter_bar(self.developer, {'assigned_to': hidden.pk})
+        self.assertFalse(filterset.form.is_valid())
+
+    def test_task_form_uses_the_cached_team(self):
+        root = User.objects.create_superuser(username='root', password='pass')
+        self.project.team_members.add(root)
+        developer = User.objects.select_related('profile').get(pk=self.developer.pk)
+        task = Task.objects.select_related('project').get(pk=self.task.pk)
+        str(TaskForm(instance=task, user=developer)['assigned_to'])
+        with self.assertNumQueries(0):
+            form = TaskForm(instance=task, user=developer)
+            str(form['assigned_to'])
+        # Non-privileged users don't get superusers offered
+        self.assertNotIn('root', self.options(form.fields['assigned_to']))
+        self.assertIn('root', self.options(TaskForm(instance=task, user=self.admin).fields['assigned_to']))
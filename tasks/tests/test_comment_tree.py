@@ -0,0 +1,57 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.comments import build_comment_tree, load_comment_tree
+from tasks.models import TaskComment
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+
+class CommentTreeTests(BaseTaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.root = TaskComment.objects.create(task=self.task, commented_by=self.developer, comment="Root")
+        self.reply = TaskComment.objects.create(
+            task=self.task, commented_by=self.manager, comment="Reply", parent=self.root
+        )
+        self.nested = TaskComment.objects.create(
+            task=self.task, commented_by=self.developer, comment="Nested", parent=self.reply
+        )
+        self.second = TaskComment.objects.create(task=self.task, commented_by=self.manager, comment="Second")
+
+    def test_tree_shape(self):
+        with self.assertNumQueries(1):
+            tree = load_comment_tree(self.task)
+            usernames = [node.comment.commented_by.username for node in tree]
+        self.assertEqual(usernames, ['dev', 'manager'])
+        self.assertEqual(tree.count, 4)
+        first = tree.roots[0]
+        self.assertEqual([n.comment for n in first.children], [self.reply])
+        # replies flattens the whole thread under its root, depth-first
+        self.assertEqual([(n.comment, n.depth) for n in first.replies], [(self.reply, 1), (self.nested, 2)])
+
+    def test_orphaned_reply_becomes_root(self):
+        tree = build_comment_tree([self.reply, self.nested])
+        self.assertEqual([n.comment for n in tree.roots], [self.reply])
+        self.assertEqual(tree.roots[0].depth, 0)
+
+    def test_detail_page_queries_do_not_grow_with_replies(self):
+        self.client.login(username='dev', password='pass')
+        url = reverse('tasks:task_detail', args=[self.task.pk])
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            return len(ctx.captured_queries), response
+
+        baseline, _ = count_queries()
+        TaskComment.objects.bulk_create(
+            TaskComment(task=self.task, commented_by=self.manager, comment=f"Reply {i}", parent=self.root)
+            for i in range(200)
+        )
+        queries, response = count_queries()
+        self.assertEqual(queries, baseline)
+        self.assertEqual(response.context['comment_tree'].count, 204)
+        self.assertContains(response, 'Reply 199')
@@ -0,0 +1,77 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks import counters
+from tasks.models import DashboardCounter, Task
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+
+def snapshot():
+    return sorted(
+        DashboardCounter.objects.filter(task_count__gt=0).values_list(
+            'user_id', 'scope', 'project_id', 'project_status', 'task_status', 'task_count', 'progress_sum'
+        ),
+        key=str,
+    )
+
+
+class DashboardCounterTests(BaseTaskTestCase):
+
+    def assertMatchesRebuild(self):
+        incremental = snapshot()
+        counters.rebuild_all()
+        self.assertEqual(incremental, snapshot())
+
+    def test_create_counts_for_every_audience(self):
+        scopes = set(DashboardCounter.objects.filter(task_count=1).values_list('user__username', 'scope'))
+        self.assertIn((None, 'all'), scopes)
+        self.assertIn(('dev', 'personal'), scopes)
+        self.assertIn(('dev', 'team'), scopes)
+        self.assertIn(('manager', 'watch'), scopes)
+        self.assertMatchesRebuild()
+
+    def test_status_progress_and_reassignment_apply_deltas(self):
+        self.task.status = 'in_progress'
+        self.task.progress = 40
+        self.task.save()
+        self.task.assigned_to = self.other_dev
+        self.task.save()
+        Task.objects.create(title="Second", project=self.project, assigned_by=self.manager, status='blocked')
+        self.assertMatchesRebuild()
+
+    def test_title_only_save_issues_no_counter_queries(self):
+        self.task.title = "Renamed"
+        with CaptureQueriesContext(connection) as ctx:
+            self.task.save()
+        self.assertFalse([q for q in ctx.captured_queries if 'dashboardcounter' in q['sql']])
+
+    def test_project_status_and_membership_changes(self):
+        self.project.status = 'on_hold'
+        self.project.save()
+        self.project.team_members.add(self.other_dev)
+        self.project.team_members.remove(self.developer)
+        self.assertEqual(
+            set(DashboardCounter.objects.values_list('project_status', flat=True)), {'on_hold'}
+        )
+        self.assertMatchesRebuild()
+
+    def test_delete_removes_contribution(self):
+        self.task.delete()
+        self.assertEqual(snapshot(), [])
+
+    def test_dashboard_reads_counters(self):
+        self.task.status = 'blocked'
+        self.task.save()
+        self.client.login(username='dev', password='pass')
+        response = self.client.get(reverse('tasks:dashboard'))
+        self.assertEqual(response.context['blocked_tasks_count'], 1)
+        self.assertEqual(response.context['projects_with_blocked_tasks'], 1)
+
+    def test_rebuild_command_repairs_drift(self):
+        DashboardCounter.objects.update(task_count=99)
+        call_command('rebuild_dashboard_counters', stdout=io.StringIO())
+        self.assertEqual(DashboardCounter.objects.get(user=None, scope='all').task_count, 1)
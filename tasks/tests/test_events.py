@@ -0,0 +1,142 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+from django.test import AsyncClient
+from django.urls import reverse
+
+from tasks import events
+from tasks.bulk import apply_bulk_action
+from tasks.models import Task, TaskComment
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+
+class InMemoryBrokerTests(BaseTaskTestCase):
+
+    async def test_fans_out_to_every_subscriber(self):
+        broker = events.InMemoryBroker()
+        first, second = await broker.subscribe(), await broker.subscribe()
+        broker.publish({'type': 'status', 'task_id': 1})
+        self.assertEqual((await first.get(1))['task_id'], 1)
+        self.assertEqual((await second.get(1))['task_id'], 1)
+
+        await second.aclose()
+        broker.publish({'type': 'status', 'task_id': 2})
+        self.assertEqual((await first.get(1))['task_id'], 2)
+        self.assertIsNone(await second.get(0.01))
+
+    async def test_slow_subscriber_keeps_the_newest_events(self):
+        broker = events.InMemoryBroker()
+        subscription = await broker.subscribe()
+        for task_id in range(events.SUBSCRIBER_QUEUE_SIZE + 5):
+            broker.publish({'type': 'progress', 'task_id': task_id})
+        await asyncio.sleep(0)
+        self.assertEqual(subscription.queue.qsize(), events.SUBSCRIBER_QUEUE_SIZE)
+        self.assertEqual((await subscription.get(1))['task_id'], 5)
+
+
+@patch('tasks.events.publish')
+class EventPublishingTests(BaseTaskTestCase):
+
+    def test_status_change_publishes_after_commit(self, publish):
+        task = Task.objects.get(pk=self.task.pk)
+        task.status = 'in_progress'
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+        publish.assert_called_once()
+        event = publish.call_args.args[0]
+        self.assertEqual((event['type'], event['task_id'], event['status']), ('status', task.pk, 'in_progress'))
+
+    def test_progress_only_and_unrelated_saves(self, publish):
+        task = Task.objects.get(pk=self.task.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            task.progress = 40
+            task.save()
+            task.title = "Renamed"
+            task.save()
+        self.assertEqual([c.args[0]['type'] for c in publish.call_args_list], ['progress'])
+
+    def test_bulk_status_changes_publish_one_event_per_changed_task(self, publish):
+        other = Task.objects.create(title="Done", project=self.project, assigned_by=self.manager, status='completed')
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_bulk_action(self.manager, [self.task.pk, other.pk], 'status', 'completed')
+            apply_bulk_action(self.manager, [self.task.pk], 'priority', 'high')
+        events_sent = [call.args[0] for call in publish.call_args_list]
+        self.assertEqual([(e['type'], e['task_id'], e['status']) for e in events_sent],
+                         [('status', self.task.pk, 'completed')])
+
+    def test_new_comment(self, publish):
+        with self.captureOnCommitCallbacks(execute=True):
+            TaskComment.objects.create(task=self.task, commented_by=self.developer, comment="On it")
+        event = publish.call_args.args[0]
+        self.assertEqual((event['type'], event['user'], event['comment']), ('comment', 'dev', "On it"))
+
+
+class EventStreamViewTests(BaseTaskTestCase):
+
+    def test_wsgi_answers_no_content(self):
+        self.client.login(username='dev', password='pass')
+        response = self.client.get(reverse('tasks:event_stream'))
+        self.assertEqual(response.status_code, 204)
+
+    async def test_streams_visible_events(self):
+        broker = events.InMemoryBroker()
+        client = AsyncClient()
+        await client.aforce_login(self.other_dev)
+        with patch('tasks.events.get_broker', return_value=broker):
+            response = await client.get(reverse('tasks:event_stream'))
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            stream = aiter(response.streaming_content)
+            self.assertTrue((await anext(stream)).startswith(b'retry:'))
+
+            # dev2 isn't on the project's team: the first event is filtered out
+            frame = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0)
+            broker.publish({'type': 'status', 'task_id': self.task.pk, 'project_id': self.project.pk,
+                            'assigned_to_id': self.developer.pk})
+            broker.publish({'type': 'status', 'task_id': 99, 'project_id': 0,
+                            'assigned_to_id': self.other_dev.pk})
+            name, data = (await asyncio.wait_for(frame, 1)).decode().splitlines()[:2]
+            self.assertEqual(name, 'event: status')
+            self.assertEqual(json.loads(data.removeprefix('data: '))['task_id'], 99)
+            await stream.aclose()
+
+    async def test_task_stream_keeps_the_user_scope(self):
+        broker = events.InMemoryBroker()
+        client = AsyncClient()
+        await client.aforce_login(self.other_dev)
+        with patch('tasks.events.get_broker', return_value=broker):
+            response = await client.get(reverse('tasks:event_stream'), {'task': self.task.pk})
+            stream = aiter(response.streaming_content)
+            await anext(stream)
+
+            # dev2 can't see the project, so asking for its task streams nothing
+            frame = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0)
+            broker.publish({'type': 'status', 'task_id': self.task.pk, 'project_id': self.project.pk,
+                            'assigned_to_id': self.developer.pk})
+            broker.publish({'type': 'status', 'task_id': 99, 'project_id': 0,
+                            'assigned_to_id': self.other_dev.pk})
+            broker.publish({'type': 'progress', 'task_id': self.task.pk, 'project_id': self.project.pk,
+                            'assigned_to_id': self.other_dev.pk})
+            name, data = (await asyncio.wait_for(frame, 1)).decode().splitlines()[:2]
+            self.assertEqual(name, 'event: progress')
+            self.assertEqual(json.loads(data.removeprefix('data: '))['task_id'], self.task.pk)
+            await stream.aclose()
+
+    async def test_dashboard_stream_pushes_counters_after_changes(self):
+        broker = events.InMemoryBroker()
+        client = AsyncClient()
+        await client.aforce_login(self.developer)
+        with patch('tasks.events.get_broker', return_value=broker), patch('tasks.views.EVENT_STREAM_STATS_DELAY', 0):
+            response = await client.get(reverse('tasks:event_stream'), {'view': 'personal'})
+            stream = aiter(response.streaming_content)
+            await anext(stream)
+            frame = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0)
+            broker.publish(events.task_event('status', self.task))
+            self.assertTrue((await asyncio.wait_for(frame, 1)).startswith(b'event: status'))
+            name, data = (await asyncio.wait_for(anext(stream), 1)).decode().splitlines()[:2]
+            self.assertEqual(name, 'event: stats')
+            self.assertEqual(json.loads(data.removeprefix('data: '))['total_active'], 1)
+            await stream.aclose()
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+
+from django.urls import reverse
+
+from tasks.export import EXPORT_COLUMNS, export_rows
+from tasks.models import Task
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+
+class TaskExportTests(BaseTaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        Task.objects.create(
+            title="=HYPERLINK(\"x\")", project=self.project, assigned_to=self.developer,
+            assigned_by=self.manager, status='in_progress', priority='high', progress=40,
+        )
+        self.client.login(username='manager', password='pass')
+
+    def export(self, **params):
+        response = self.client.get(reverse('tasks:task_export'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        rows = list(csv.reader(io.StringIO(self.export())))
+        self.assertEqual(rows[0], [name for name, _ in EXPORT_COLUMNS])
+        self.assertEqual(len(rows), 3)
+        by_title = {row[1]: dict(zip(rows[0], row)) for row in rows[1:]}
+        self.assertEqual(by_title['Test Task']['assigned_to'], 'dev')
+        self.assertEqual(by_title['Test Task']['project'], 'Test Project')
+        # Formula-looking cells are neutralized for spreadsheet apps
+        self.assertIn("'=HYPERLINK(\"x\")", by_title)
+
+    def test_jsonl_applies_the_list_filters(self):
+        lines = self.export(format='jsonl', priority='high').splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['status'], 'in_progress')
+
+    def test_scope_matches_the_task_list(self):
+        self.client.login(username='dev2', password='pass')
+        self.assertEqual(len(self.export(format='jsonl').splitlines()), 0)
+
+    def test_reads_one_query_for_rows(self):
+        response = self.client.get(reverse('tasks:task_export'), {'format': 'jsonl'})
+        with self.assertNumQueries(1):
+            b''.join(response.streaming_content)
+
+    def test_rows_are_read_in_keyset_chunks(self):
+        Task.objects.bulk_create(
+            Task(title=f"Bulk {i}", project=self.project, assigned_by=self.manager) for i in range(5)
+        )
+        # 7 rows in chunks of 2: four short queries, none reading the whole table
+        with self.assertNumQueries(4):
+            rows = list(export_rows(Task.objects.all(), chunk_size=2))
+        ids = [row[0] for row in rows]
+        self.assertEqual(ids, sorted(Task.objects.values_list('pk', flat=True)))
+
+    def test_unknown_format(self):
+        response = self.client.get(reverse('tasks:task_export'), {'format': 'xls'})
+        self.assertEqual(response.status_code, 400)
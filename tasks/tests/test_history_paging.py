@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.history import HISTORY_PAGE_SIZE, history_page
+from tasks.models import TaskHistory
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+
+class HistoryPagingTests(BaseTaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        rows = TaskHistory.objects.bulk_create(
+            TaskHistory(task=self.task, old_status='To Do', new_status=f'Step {i}', changed_by=self.developer)
+            for i in range(HISTORY_PAGE_SIZE + 5)
+        )
+        # auto_now_add stamps the whole batch alike; spread it out, keeping two ties for the id tie-break
+        now = timezone.now()
+        for i, row in enumerate(rows):
+            row.changed_at = now - timedelta(minutes=max(i, 1))
+        TaskHistory.objects.bulk_update(rows, ['changed_at'])
+        self.newest_first = [f'Step {i}' for i in range(len(rows))]
+        self.newest_first[0], self.newest_first[1] = 'Step 1', 'Step 0'  # same minute: higher id first
+        self.client.login(username='dev', password='pass')
+
+    def test_pages_cover_history_once_in_order(self):
+        first = history_page(self.task, page_size=10)
+        second = history_page(self.task, after=first.next_cursor, page_size=10)
+        third = history_page(self.task, after=second.next_cursor, page_size=10)
+        seen = [log.new_status for page in (first, second, third) for log in page]
+        self.assertEqual(seen, self.newest_first)
+        self.assertFalse(third.has_next)
+
+    def test_detail_renders_latest_page_only(self):
+        response = self.client.get(reverse('tasks:task_detail', args=[self.task.pk]))
+        page = response.context['history_page']
+        self.assertEqual(len(page), HISTORY_PAGE_SIZE)
+        self.assertTrue(page.has_next)
+        self.assertContains(response, 'btn-load-older-history')
+
+    def test_endpoint_returns_older_entries(self):
+        page = history_page(self.task)
+        with self.assertNumQueries(4):  # session, user, task, history page
+            response = self.client.get(
+                reverse('tasks:task_history', args=[self.task.pk]), {'cursor': page.next_cursor}
+            )
+        data = response.json()
+        self.assertIsNone(data['next_cursor'])
+        for status in self.newest_first[HISTORY_PAGE_SIZE:]:
+            self.assertIn(status, data['html'])
+        self.assertNotIn(f'>{self.newest_first[0]}<', data['html'])
@@ -0,0 +1,92 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from projects.models import Project, ProjectMembership
+from tasks.importer import import_tasks
+from tasks.models import SearchTerm, Task, TaskHistory
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+CSV_ROWS = """title,project,assigned_to,status,priority,progress,tags
+Migrate invoices,Test Project,dev,in_progress,high,30,"billing, legacy"
+No project,,dev,todo,low,0,
+Outsider,Test Project,dev2,todo,low,0,
+Bad status,Test Project,,shipped,low,0,
+Too far,Test Project,,todo,low,140,
+Plain,Test Project,,,,,
+"""
+
+
+class TaskImportTests(BaseTaskTestCase):
+
+    def test_valid_rows_are_inserted_and_bad_rows_reported(self):
+        result = import_tasks(self.manager, io.StringIO(CSV_ROWS), 'csv', batch_size=1)
+        self.assertEqual((result.rows, result.created), (6, 2))
+        problems = dict(result.errors)
+        self.assertIn('project: This field is required.', problems[3])
+        self.assertIn("'dev2' is not a member", problems[4])
+        self.assertIn('status:', problems[5])
+        self.assertIn('progress:', problems[6])
+
+        task = Task.objects.get(title="Migrate invoices")
+        self.assertEqual((task.assigned_to, task.assigned_by, task.status), (self.developer, self.manager, 'in_progress'))
+        self.assertEqual(Task.objects.get(title="Plain").priority, 'medium')
+        self.assertEqual(TaskHistory.objects.get(task=task).old_status, "N/A")
+        self.assertEqual(set(task.tag_set.values_list('name', flat=True)), {'billing', 'legacy'})
+        self.assertTrue(SearchTerm.objects.filter(task=task, term='invoices').exists())
+
+        # Derived data the per-task signals would have maintained
+        project = Project.objects.get(pk=self.project.pk)
+        expected = project.aggregate_rollup()
+        self.assertEqual({f: getattr(project, f) for f in expected}, expected)
+        self.assertEqual(ProjectMembership.objects.get(user=self.developer, project=self.project).assigned_task_count, 2)
+
+    def test_ids_are_read_back_when_the_backend_does_not_return_them(self):
+        # MySQL: bulk_create leaves the pks unset
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            result = import_tasks(self.manager, io.StringIO(CSV_ROWS), 'csv', batch_size=2)
+        self.assertEqual(result.created, 2)
+        for title in ("Migrate invoices", "Plain"):
+            task = Task.objects.get(title=title)
+            self.assertEqual(TaskHistory.objects.get(task=task).new_status, task.get_status_display())
+            self.assertTrue(SearchTerm.objects.filter(task=task, term=title.split()[0].lower()).exists())
+        self.assertEqual(
+            set(Task.objects.get(title="Migrate invoices").tag_set.values_list('name', flat=True)), {'billing', 'legacy'}
+        )
+
+    def test_lookups_are_loaded_once(self):
+        rows = ''.join(json.dumps({'title': f"T{i}", 'project': self.project.pk}) + '\n' for i in range(50))
+        with self.assertNumQueries(4):  # projects, users, superusers, team members; nothing per row
+            result = import_tasks(self.manager, io.StringIO(rows), 'jsonl', dry_run=True)
+        self.assertEqual((result.created, result.errors), (50, []))
+        self.assertFalse(Task.objects.filter(title="T0").exists())
+
+    def test_developer_needs_to_lead_the_project(self):
+        result = import_tasks(self.developer, io.StringIO(CSV_ROWS), 'csv')
+        self.assertEqual(result.created, 0)
+        self.assertIn("can't create tasks", result.errors[0][1])
+
+    def test_command_reports_throughput(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(CSV_ROWS)
+        self.addCleanup(os.unlink, f.name)
+        out = io.StringIO()
+        call_command('import_tasks', f.name, user='manager', stdout=out)
+        self.assertIn("Imported 2 of 6 rows", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+        self.assertIn("line 4:", out.getvalue())
+
+    def test_upload_view(self):
+        self.client.login(username='manager', password='pass')
+        upload = SimpleUploadedFile('tasks.csv', CSV_ROWS.encode())
+        response = self.client.post(reverse('tasks:task_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].created, 2)
+        self.assertContains(response, "not a member")
@@ -0,0 +1,52 @@
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TransactionTestCase
+
+from projects.models import Project
+from tasks import async_views, views
+from tasks.models import Task
+from tasks.tests import benchmark, loadtest
+
+# Requests per run and the latency added to every query (stands in for a MySQL round trip)
+REQUESTS = int(os.getenv('LOADTEST_REQUESTS', '12'))
+LATENCY = float(os.getenv('LOADTEST_LATENCY_MS', '10')) / 1000
+
+
+class AjaxConcurrencyLoadTest(TransactionTestCase):
+    """
+    One process, the dashboard AJAX refresh: the sync view on 1 and 2 worker threads
+    (gunicorn sync worker / run.sh) against the async view under the ASGI model.
+    The JSON report goes to LOADTEST_REPORT (default: the temp directory).
+    """
+
+    def setUp(self):
+        lead = User.objects.create_user(username='lead', password='pass')
+        self.developer = User.objects.create_user(username='dev', password='pass')
+        project = Project.objects.create(title="Load", status='active', team_lead=lead, created_by=lead)
+        project.team_members.add(self.developer)
+        Task.objects.bulk_create([
+            Task(title=f"Load {i}", project=project, assigned_to=self.developer, assigned_by=lead)
+            for i in range(10)
+        ])
+
+    def test_async_serves_requests_concurrently(self):
+        kwargs = dict(user_id=self.developer.pk, path='/?view=team', requests=REQUESTS, latency_seconds=LATENCY)
+        results = [
+            loadtest.run_sync(views.dashboard, threads=1, **kwargs),
+            loadtest.run_sync(views.dashboard, threads=2, **kwargs),
+            loadtest.run_async(async_views.dashboard, concurrency=REQUESTS, **kwargs),
+        ]
+        benchmark.write_report(
+            results,
+            os.getenv('LOADTEST_REPORT', os.path.join(tempfile.gettempdir(), 'taskflow_loadtest.json')),
+            meta={'requests': REQUESTS, 'latency_ms': LATENCY * 1000, 'vendor': connection.vendor},
+        )
+        single, threaded, concurrent = results
+        for result in results:
+            self.assertEqual(result['statuses'], [200], result)
+        self.assertEqual(single['peak_queries_in_flight'], 1)
+        self.assertGreater(concurrent['peak_queries_in_flight'], threaded['peak_queries_in_flight'])
+        self.assertGreater(concurrent['requests_per_second'], 2 * single['requests_per_second'])
@@ -0,0 +1,75 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import override_settings
+from django.urls import reverse
+
+from accounts.tasks import send_password_reset_email
+from config.metrics import REQUESTS, SIGNAL_SECONDS, TASK_SECONDS, registry
+from tasks.models import Task
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+
+def value(metric, *labels):
+    return registry.collect()[metric.name].get(tuple(str(label) for label in labels))
+
+
+def observations(histogram, *labels):
+    buckets = value(histogram, *labels)
+    return sum(buckets[:-1]) if buckets else 0
+
+
+@override_settings(METRICS_TOKEN='secret')
+class MetricsTests(BaseTaskTestCase):
+
+    def scrape(self):
+        response = self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer secret'})
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_views_are_counted_by_url_name(self):
+        self.client.login(username='dev', password='pass')
+        before = value(REQUESTS, 'tasks:dashboard', 'GET', 200) or 0
+        self.client.get(reverse('tasks:dashboard'))
+        self.assertEqual(value(REQUESTS, 'tasks:dashboard', 'GET', 200), before + 1)
+
+        text = self.scrape()
+        self.assertIn('# TYPE taskflow_http_request_duration_seconds histogram', text)
+        self.assertIn('taskflow_http_request_duration_seconds_bucket{view="tasks:dashboard",le="+Inf"}', text)
+        self.assertIn(f'taskflow_http_requests_total{{view="tasks:dashboard",method="GET",status="200"}} {before + 1}', text)
+
+    def test_endpoint_needs_the_token(self):
+        self.client.login(username='admin', password='pass')
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        with override_settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+            self.admin.is_staff = True
+            self.admin.save()
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    def test_celery_tasks_and_signal_receivers_are_timed(self):
+        handler = 'projects.models.sync_project_status'
+        before = observations(SIGNAL_SECONDS, handler)
+        Task.objects.create(title="Timed", project=self.project, assigned_to=self.developer, assigned_by=self.manager)
+        self.assertEqual(observations(SIGNAL_SECONDS, handler), before + 1)
+
+        send_password_reset_email.delay(
+            "Reset", 'accounts/password_reset_email.html',
+            {'user': self.developer.pk, 'uid': 'MQ', 'token': 'token', 'protocol': 'https', 'domain': 'testserver'},
+            'dev@example.com',
+        )
+        self.assertTrue(observations(TASK_SECONDS, 'accounts.tasks.send_password_reset_email', 'SUCCESS'))
+
+    def test_processes_are_summed_from_metrics_dir(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        other = {REQUESTS.name: [[['tasks:dashboard', 'GET', '200'], 5]]}
+        with open(os.path.join(directory, '1.json'), 'w') as other_process:
+            json.dump(other, other_process)
+
+        own = value(REQUESTS, 'tasks:dashboard', 'GET', 200) or 0
+        with override_settings(METRICS_DIR=directory):
+            self.assertEqual(value(REQUESTS, 'tasks:dashboard', 'GET', 200), own + 5)
+            self.assertTrue(os.path.exists(os.path.join(directory, f'{os.getpid()}.json')))
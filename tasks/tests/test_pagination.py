@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.models import Task
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+
+class CursorPaginationTests(BaseTaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(24):
+            Task.objects.create(title=f"Bulk {i}", project=self.project, assigned_by=self.manager)
+        self.client.login(username='manager', password='pass')
+        self.url = reverse('tasks:task_list')
+
+    def walk(self, **params):
+        seen, response = [], self.client.get(self.url, params)
+        while True:
+            seen.extend(task.pk for task in response.context['tasks'])
+            cursor_page = response.context['cursor_page']
+            if not cursor_page.has_next:
+                return seen, cursor_page
+            response = self.client.get(self.url, {**params, 'cursor': cursor_page.next_cursor})
+
+    def test_cursor_walk_visits_every_task_once_in_order(self):
+        seen, _ = self.walk()
+        expected = list(Task.objects.order_by('-updated_at', '-id').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_before_cursor_returns_previous_page(self):
+        first = self.client.get(self.url).context['cursor_page']
+        second = self.client.get(self.url, {'cursor': first.next_cursor}).context['cursor_page']
+        back = self.client.get(self.url, {'before': second.previous_cursor}).context['cursor_page']
+        self.assertEqual([t.pk for t in back], [t.pk for t in first])
+        self.assertFalse(back.has_previous)
+
+    def test_count_is_opt_in(self):
+        self.assertIsNone(self.client.get(self.url).context['cursor_page'].total_count)
+        response = self.client.get(self.url, {'count': 'exact'})
+        self.assertEqual(response.context['cursor_page'].total_count, 25)
+
+    def test_deep_pages_cost_the_same_as_page_one(self):
+        first = self.client.get(self.url).context['cursor_page']
+        with self.assertNumQueries(self.queries_for({})):
+            self.client.get(self.url, {'cursor': first.next_cursor})
+
+    def queries_for(self, params):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url, params)
+        return len(ctx.captured_queries)
+
+    def test_ajax_response_carries_cursors(self):
+        response = self.client.get(self.url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        data = response.json()
+        self.assertIn('html', data)
+        self.assertTrue(data['next_cursor'])
+        self.assertIsNone(data['previous_cursor'])
+
+    def test_page_param_keeps_offset_pagination(self):
+        response = self.client.get(self.url, {'page': 2})
+        self.assertIsNone(response.context['cursor_page'])
+        self.assertEqual(response.context['page_obj'].number, 2)
@@ -0,0 +1,108 @@
+import io
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+
+from tasks import processing
+from tasks.models import TaskAttachment
+from tasks.storage import FileSystemBackend
+from tasks.tests.test_uploads import FileSystemStorageTestCase
+
+PDF = b"%PDF-1.4\n1 0 obj << /Type /Pages /Count 2 >> endobj\n2 0 obj << /Type /Page >> endobj\n" \
+      b"3 0 obj << /Type/Page >> endobj\n%%EOF"
+
+
+def reject_everything(file):
+    return False
+
+
+def accept_everything(file):
+    return True
+
+
+class AttachmentProcessingTests(FileSystemStorageTestCase):
+
+    def upload(self, name, content):
+        # The upload only queues the work; run it here rather than relying on eager Celery
+        with self.captureOnCommitCallbacks():
+            response = self.client.post(
+                reverse('tasks:add_attachment', args=[self.task.pk]),
+                {'file': SimpleUploadedFile(name, content), 'file_name': name},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+            )
+        attachment = TaskAttachment.objects.get(pk=response.json()['id'])
+        self.assertEqual(attachment.processing_status, 'pending')
+        return processing.process(attachment)
+
+    def test_upload_queues_processing_after_commit(self):
+        with mock.patch('tasks.tasks.process_attachment.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    reverse('tasks:add_attachment', args=[self.task.pk]),
+                    {'file': SimpleUploadedFile("notes.txt", b"notes"), 'file_name': "notes.txt"},
+                    HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+                )
+        delay.assert_called_once_with(response.json()['id'])
+
+    def test_image_gets_metadata_and_thumbnail(self):
+        png = io.BytesIO()
+        Image.new('RGBA', (1000, 500), (255, 0, 0, 128)).save(png, format='PNG')
+        attachment = self.upload("diagram.png", png.getvalue())
+
+        self.assertEqual(attachment.processing_status, 'ready')
+        self.assertEqual((attachment.size, attachment.mime_type), (len(png.getvalue()), 'image/png'))
+        # Stored next to the original in the attachment storage, not the default storage
+        with FileSystemBackend().storage.open(attachment.thumbnail.name) as stored:
+            with Image.open(stored) as thumbnail:
+                self.assertEqual((thumbnail.format, thumbnail.size), ('JPEG', (320, 160)))
+
+        response = self.client.get(reverse('tasks:task_detail', args=[self.task.pk]))
+        self.assertContains(response, attachment.thumbnail_url)
+        served = self.client.get(attachment.thumbnail_url)
+        self.assertEqual(served['Content-Type'], 'image/jpeg')
+        self.assertTrue(b''.join(served.streaming_content).startswith(b'\xff\xd8'))
+
+    def test_pdf_page_count(self):
+        attachment = self.upload("spec.pdf", PDF)
+        self.assertEqual((attachment.mime_type, attachment.page_count), ('application/pdf', 2))
+        self.assertFalse(attachment.thumbnail)
+
+    def test_other_files_get_metadata_only(self):
+        attachment = self.upload("notes.txt", b"not an image")
+        self.assertEqual((attachment.processing_status, attachment.mime_type), ('ready', 'text/plain'))
+        self.assertFalse(attachment.thumbnail)
+
+    @override_settings(ATTACHMENT_SCANNER='tasks.tests.test_processing.reject_everything')
+    def test_rejected_files_cannot_be_downloaded(self):
+        attachment = self.upload("invoice.pdf", PDF)
+        self.assertEqual(attachment.processing_status, 'infected')
+        response = self.client.get(reverse('tasks:download_attachment', args=[attachment.pk]))
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(ATTACHMENT_SCANNER='tasks.tests.test_processing.accept_everything')
+    def test_unscanned_files_are_held_back_while_a_scanner_is_configured(self):
+        with self.captureOnCommitCallbacks():
+            response = self.client.post(
+                reverse('tasks:add_attachment', args=[self.task.pk]),
+                {'file': SimpleUploadedFile("invoice.pdf", PDF), 'file_name': "invoice.pdf"},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+            )
+        self.assertEqual(response.json()['url'], '')
+        attachment = TaskAttachment.objects.get(pk=response.json()['id'])
+        download = reverse('tasks:download_attachment', args=[attachment.pk])
+        self.assertEqual(self.client.get(download).status_code, 403)
+        page = self.client.get(reverse('tasks:task_detail', args=[self.task.pk]))
+        self.assertContains(page, "Awaiting virus scan")
+        self.assertNotContains(page, download)
+
+        TaskAttachment.objects.filter(pk=attachment.pk).update(processing_status='failed')
+        self.assertEqual(self.client.get(download).status_code, 403)
+
+        processing.process(attachment)
+        self.assertEqual(self.client.get(download).status_code, 200)
+        with override_settings(ATTACHMENT_SCANNER=None):
+            TaskAttachment.objects.filter(pk=attachment.pk).update(processing_status='pending')
+            self.assertEqual(self.client.get(download).status_code, 200)
@@ -0,0 +1,70 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+
+def reads_before_first_write(queries):
+    """The permission / form phase: every query up to the first INSERT or UPDATE."""
+    reads = []
+    for query in queries:
+        if query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE', 'SAVEPOINT')):
+            break
+        reads.append(query['sql'])
+    return reads
+
+
+class RequestCachedObjectTests(BaseTaskTestCase):
+    """Locks in one task lookup (with project and lead joined) per request."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='dev', password='pass')
+
+    def capture(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data or {})
+        return response, ctx.captured_queries
+
+    def task_lookups(self, queries):
+        return [sql for sql in queries if sql.startswith('SELECT') and 'FROM "tasks_task"' in sql]
+
+    def test_update_form_get(self):
+        url = reverse('tasks:task_update', args=[self.task.pk])
+        with self.assertNumQueries(6):  # session, user, task+project+lead, profile, project & assignee choices
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_update_post_loads_task_once(self):
+        response, queries = self.capture('post', reverse('tasks:task_update', args=[self.task.pk]), {
+            'title': "Edited", 'project': self.project.pk, 'assigned_to': self.developer.pk,
+            'status': 'in_progress', 'priority': 'medium', 'progress': 20,
+        })
+        self.assertEqual(response.status_code, 302)
+        reads = reads_before_first_write(queries)
+        self.assertEqual(len(self.task_lookups(reads)), 1)
+        # + form choice lookups (project, assignee) and model FK validation (project, assignee)
+        self.assertLessEqual(len(reads), 8)
+        # History still records the pre-edit status
+        self.assertEqual(self.task.history.get().old_status, 'To Do')
+
+    def test_status_and_progress_endpoints(self):
+        for name, data in (('tasks:update_status', {'status': 'in_review'}),
+                           ('tasks:update_progress', {'progress': 50})):
+            response, queries = self.capture('post', reverse(name, args=[self.task.pk]), data)
+            self.assertEqual(response.status_code, 302)
+            reads = reads_before_first_write(queries)
+            self.assertEqual(len(self.task_lookups(reads)), 1)
+            self.assertEqual(len(reads), 4)  # session, user, task+project+lead, profile
+
+    def test_unauthorized_status_change_costs_four_queries(self):
+        self.client.login(username='dev2', password='pass')
+        with self.assertNumQueries(4):
+            response = self.client.post(reverse('tasks:update_status', args=[self.task.pk]), {'status': 'completed'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_delete_confirmation(self):
+        with self.assertNumQueries(4):
+            self.client.get(reverse('tasks:task_delete', args=[self.task.pk]))
+
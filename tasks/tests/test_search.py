@@ -0,0 +1,103 @@
+import io
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from projects.models import Project
+from tasks import search
+from tasks.models import SearchTerm, Task, TaskComment
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+
+class SearchIndexTests(BaseTaskTestCase):
+
+    def matches(self, query, queryset=None):
+        queryset = queryset if queryset is not None else Task.objects.all()
+        return set(queryset.filter(search.task_search_filter(query)).values_list('title', flat=True))
+
+    def test_tokenize(self):
+        self.assertEqual(search.tokenize("Fix the API-Gateway, a b"), ['fix', 'the', 'api', 'gateway'])
+
+    def test_task_fields_are_indexed_on_save(self):
+        Task.objects.create(title="Invoice export", description="CSV download", tags="billing,urgent",
+                            project=self.project, assigned_by=self.manager)
+        self.assertEqual(self.matches("invoice"), {"Invoice export"})
+        self.assertEqual(self.matches("download"), {"Invoice export"})
+        self.assertEqual(self.matches("billing"), {"Invoice export"})
+
+    def test_edits_replace_old_postings(self):
+        self.task.title = "Renamed"
+        self.task.save()
+        self.assertEqual(self.matches("renamed"), {"Renamed"})
+        self.assertEqual(self.matches("test task"), set())
+
+    def test_status_only_save_does_not_reindex(self):
+        before = list(SearchTerm.objects.filter(task=self.task).values_list('pk', flat=True))
+        self.task.status = 'in_progress'
+        self.task.save()
+        self.assertEqual(list(SearchTerm.objects.filter(task=self.task).values_list('pk', flat=True)), before)
+
+    def test_comments_are_searchable_and_removed_with_the_comment(self):
+        comment = TaskComment.objects.create(task=self.task, commented_by=self.developer, comment="flaky pipeline")
+        self.assertEqual(self.matches("pipeline"), {"Test Task"})
+        comment.delete()
+        self.assertEqual(self.matches("pipeline"), set())
+
+    def test_project_title_matches_its_tasks(self):
+        self.assertEqual(self.matches("project"), {"Test Task"})
+        self.project.title = "Apollo"
+        self.project.save()
+        self.assertEqual(self.matches("apollo"), {"Test Task"})
+        self.assertEqual(self.matches("project"), set())
+
+    def test_all_terms_must_match_and_last_term_is_prefix(self):
+        Task.objects.create(title="Login page", project=self.project, assigned_by=self.manager)
+        Task.objects.create(title="Logout page", project=self.project, assigned_by=self.manager)
+        self.assertEqual(self.matches("page log"), {"Login page", "Logout page"})
+        self.assertEqual(self.matches("page login"), {"Login page"})
+        self.assertEqual(self.matches("log page"), set())
+
+    def test_queries_too_short_to_index_fall_back_to_substrings(self):
+        Task.objects.create(title="Plan Q3", project=self.project, assigned_by=self.manager)
+        self.assertEqual(self.matches("q"), {"Plan Q3"})
+        self.assertEqual(self.matches("3"), {"Plan Q3"})
+        self.assertEqual(
+            set(Project.objects.filter(search.project_search_filter("j")).values_list('title', flat=True)),
+            {"Test Project"},
+        )
+
+    def test_ranking_prefers_title_hits(self):
+        in_body = Task.objects.create(title="Other", description="cache", project=self.project,
+                                      assigned_by=self.manager)
+        in_title = Task.objects.create(title="Cache warmup", project=self.project, assigned_by=self.manager)
+        Task.objects.filter(pk=in_body.pk).update(updated_at=in_title.updated_at + timedelta(hours=1))
+        ranked = search.ranked_tasks(Task.objects.filter(search.task_search_filter("cache")), "cache")
+        self.assertEqual([task.pk for task in ranked], [in_title.pk, in_body.pk])
+
+        self.client.login(username='manager', password='pass')
+        response = self.client.get(reverse('tasks:dashboard'), {'q': 'cache', 'view': 'team'})
+        self.assertEqual([task.pk for task in response.context['recent_tasks']], [in_title.pk, in_body.pk])
+
+    def test_deleting_a_project_drops_its_postings(self):
+        self.project.delete()
+        self.assertFalse(SearchTerm.objects.exists())
+
+    def test_rebuild_command(self):
+        SearchTerm.objects.all().delete()
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        self.assertEqual(self.matches("test"), {"Test Task"})
+
+    def test_views_share_the_index(self):
+        self.client.login(username='manager', password='pass')
+        Task.objects.create(title="Quarterly report", project=self.project, assigned_by=self.manager)
+
+        response = self.client.get(reverse('tasks:task_list'), {'q': 'quarter'})
+        self.assertEqual([t.title for t in response.context['tasks']], ["Quarterly report"])
+
+        response = self.client.get(reverse('tasks:dashboard'), {'q': 'quarter'})
+        self.assertEqual(response.status_code, 200)
+
+        Project.objects.create(title="Zephyr rollout", team_lead=self.manager, created_by=self.admin)
+        response = self.client.get(reverse('projects:project_list'), {'q': 'zephyr'})
+        self.assertEqual([p.title for p in response.context['projects']], ["Zephyr rollout"])
@@ -0,0 +1,60 @@
+import json
+import re
+
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from config.middleware import QueryStats, fingerprint
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+SERVER_TIMING_RE = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+@override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=1)
+class QueryInstrumentationTests(BaseTaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='dev', password='pass')
+
+    def queries_in(self, response):
+        return int(SERVER_TIMING_RE.fullmatch(response['Server-Timing']).group(1))
+
+    def test_server_timing_counts_the_requests_queries(self):
+        url = reverse('tasks:task_detail', args=[self.task.pk])
+        self.client.get(url)
+        with self.assertNumQueries(self.queries_in(self.client.get(url))):
+            self.client.get(url)
+
+    @override_settings(SQL_LOG_QUERY_COUNT=1, SQL_LOG_DUPLICATES=1000)
+    def test_logs_requests_over_a_threshold(self):
+        with self.assertLogs('config.middleware', 'WARNING') as logs:
+            response = self.client.get(reverse('tasks:task_detail', args=[self.task.pk]))
+        record = json.loads(logs.records[0].getMessage().removeprefix("sql "))
+        self.assertEqual(record['view'], 'tasks:task_detail')
+        self.assertEqual((record['status'], record['queries']), (200, self.queries_in(response)))
+        self.assertEqual(record['exceeded'], ['queries'])
+        self.assertTrue(record['slowest'])
+
+        with self.assertNoLogs('config.middleware'):
+            with override_settings(SQL_LOG_QUERY_COUNT=1000):
+                self.client.get(reverse('tasks:task_detail', args=[self.task.pk]))
+
+    @override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_left_alone(self):
+        response = self.client.get(reverse('tasks:task_detail', args=[self.task.pk]))
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(ROOT_URLCONF='tasks.tests.test_async_views')
+    async def test_async_views_are_counted(self):
+        client = AsyncClient()
+        await client.aforce_login(self.developer)
+        response = await client.get(reverse('tasks:dashboard'), headers={'x-requested-with': 'XMLHttpRequest'})
+        self.assertGreater(self.queries_in(response), 0)
+
+    def test_duplicates_are_grouped_by_fingerprint(self):
+        stats = QueryStats()
+        for sql in ('SELECT 1 WHERE id IN (%s, %s)', 'SELECT 1 WHERE id IN (%s, %s, %s)', 'SELECT 2'):
+            stats.record(sql, 0.001)
+        self.assertEqual(fingerprint('a IN (%s,%s) AND b IN (%s)'), 'a IN (%s, ...) AND b IN (%s)')
+        self.assertEqual(stats.duplicates(), [{'sql': 'SELECT 1 WHERE id IN (%s, ...)', 'count': 2}])
@@ -0,0 +1,65 @@
+from django.urls import reverse
+
+from tasks.forms import TaskForm
+from tasks.models import Tag, Task, TaskTag
+from tasks.tags import parse_tags
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+
+class TagTests(BaseTaskTestCase):
+
+    def names(self, task):
+        return sorted(task.tag_set.values_list('name', flat=True))
+
+    def test_parse_tags(self):
+        self.assertEqual(parse_tags(" Backend, urgent,,backend "), ['backend', 'urgent'])
+        self.assertEqual(parse_tags(None), [])
+
+    def test_tags_string_is_synced_to_rows(self):
+        self.task.tags = "api, Urgent"
+        self.task.save()
+        self.assertEqual(self.names(self.task), ['api', 'urgent'])
+        self.task.tags = "api"
+        self.task.save()
+        self.assertEqual(self.names(self.task), ['api'])
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_form_still_accepts_comma_string(self):
+        form = TaskForm(data={
+            'title': "Tagged", 'project': self.project.pk, 'assigned_to': self.developer.pk,
+            'status': 'todo', 'priority': 'medium', 'progress': 0, 'tags': "ui,  ux",
+        }, user=self.manager)
+        self.assertTrue(form.is_valid(), form.errors)
+        task = form.save(commit=False)
+        task.assigned_by = self.manager
+        task.save()
+        self.assertEqual(self.names(task), ['ui', 'ux'])
+
+    def test_task_list_tag_filter(self):
+        Task.objects.create(title="Tagged", tags="backend,urgent", project=self.project, assigned_by=self.manager)
+        Task.objects.create(title="Other", tags="frontend", project=self.project, assigned_by=self.manager)
+        self.client.login(username='manager', password='pass')
+        response = self.client.get(reverse('tasks:task_list'), {'tag': 'Urgent'})
+        self.assertEqual([t.title for t in response.context['tasks']], ["Tagged"])
+        response = self.client.get(reverse('tasks:task_list'), {'tag': 'urgent,frontend'})
+        self.assertEqual({t.title for t in response.context['tasks']}, {"Tagged", "Other"})
+
+    def test_tag_cloud_counts_visible_tasks_and_is_cached(self):
+        Task.objects.create(title="Mine", tags="backend", project=self.project, assigned_to=self.other_dev,
+                            assigned_by=self.manager)
+        Task.objects.create(title="Team", tags="backend,docs", project=self.project, assigned_by=self.manager)
+        url = reverse('tasks:tag_cloud')
+
+        self.client.login(username='dev2', password='pass')
+        self.assertEqual(self.client.get(url).json()['tags'], [{'name': 'backend', 'count': 1}])
+
+        self.client.login(username='manager', password='pass')
+        expected = [{'name': 'backend', 'count': 2}, {'name': 'docs', 'count': 1}]
+        self.assertEqual(self.client.get(url).json()['tags'], expected)
+        with self.assertNumQueries(3):  # session, user, profile; nothing for the tags
+            self.assertEqual(self.client.get(url).json()['tags'], expected)
+
+        # A tag edit invalidates the cached clouds
+        Task.objects.get(title="Team").delete()
+        self.assertEqual(self.client.get(url).json()['tags'], [{'name': 'backend', 'count': 1}])
+        self.assertEqual(TaskTag.objects.count(), 1)
@@ -160,6 +160,7 @@ class CommentTests(BaseTaskTestCase):
 
 
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
 from tasks.models import TaskAttachment
 
 class AttachmentTests(BaseTaskTestCase):
@@ -179,6 +180,8 @@ class AttachmentTests(BaseTaskTestCase):
                                      })
         self._upload_patcher.start()
         self.addCleanup(self._upload_patcher.stop)
+        # Signed URLs are cached per attachment id and version (tasks.attachment_urls)
+        cache.clear()
 
     def test_only_uploader_can_delete(self):
         file = SimpleUploadedFile("test.txt", b"file content")
@@ -212,7 +215,7 @@ class AttachmentTests(BaseTaskTestCase):
 
         self.client.login(username='dev', password='pass')
 
-        with patch('tasks.views.cloudinary_url') as mock_url:
+        with patch('tasks.attachment_urls.cloudinary_url') as mock_url:
             mock_url.return_value = ("https://example.com/download", None)
             resp = self.client.get(reverse('tasks:download_attachment', args=[attachment.pk]), follow=True)
 
@@ -234,7 +237,7 @@ class AttachmentTests(BaseTaskTestCase):
 
         self.client.login(username='dev', password='pass')
 
-        with patch('tasks.views.cloudinary_url', side_effect=Exception("oops")):
+        with patch('tasks.attachment_urls.cloudinary_url', side_effect=Exception("oops")):
             # We don't follow the external redirect to Cloudinary because the
             # test client will then land on a 404 from the fake URL.  Instead we
             # examine the ``Location`` header returned directly from our view.
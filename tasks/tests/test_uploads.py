@@ -0,0 +1,125 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import uploads
+from tasks.models import AttachmentUpload, TaskAttachment
+from tasks.storage import FileSystemBackend
+from tasks.tests.test_tasks import BaseTaskTestCase
+
+
+class FileSystemStorageTestCase(BaseTaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings_override = override_settings(
+            ATTACHMENT_STORAGE='filesystem',
+            ATTACHMENT_ROOT=str(self.root / 'attachments'),
+            ATTACHMENT_CHUNK_SIZE=4,
+            MEDIA_ROOT=str(self.root / 'media'),
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.login(username='dev', password='pass')
+
+    def stored_path(self, attachment):
+        attachment.refresh_from_db()
+        return self.root / 'attachments' / FileSystemBackend.stored_name(attachment)
+
+
+class FileSystemBackendTests(FileSystemStorageTestCase):
+
+    def test_upload_download_and_delete(self):
+        response = self.client.post(
+            reverse('tasks:add_attachment', args=[self.task.pk]),
+            {'file': SimpleUploadedFile("notes.txt", b"hello"), 'file_name': "notes.txt"},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        attachment = TaskAttachment.objects.get(pk=response.json()['id'])
+        self.assertEqual(attachment.storage, 'filesystem')
+        self.assertEqual(response.json()['url'], reverse('tasks:download_attachment', args=[attachment.pk]) + '?inline=1')
+        path = self.stored_path(attachment)
+        self.assertEqual(path.read_bytes(), b"hello")
+
+        download = self.client.get(reverse('tasks:download_attachment', args=[attachment.pk]))
+        self.assertEqual(b''.join(download.streaming_content), b"hello")
+        self.assertIn('attachment; filename="notes.txt"', download['Content-Disposition'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('tasks:delete_attachment', args=[attachment.pk]))
+        self.assertFalse(path.exists())
+
+
+class ChunkedUploadTests(FileSystemStorageTestCase):
+
+    def start(self, size, file_name="report.pdf"):
+        response = self.client.post(
+            reverse('tasks:start_attachment_upload', args=[self.task.pk]), {'file_name': file_name, 'size': size}
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def stored_parts(self):
+        parts = self.root / 'attachments' / 'attachment_uploads'
+        return sorted(path.read_bytes() for path in parts.rglob('*') if path.is_file())
+
+    def put(self, url, data, offset):
+        return self.client.put(url, data, content_type='application/octet-stream', headers={'Upload-Offset': offset})
+
+    def test_chunks_are_assembled_and_finalized(self):
+        upload = self.start(10)
+        self.assertEqual((upload['received'], upload['chunk_size']), (0, 4))
+        self.assertEqual(self.put(upload['url'], b"0123", 0).json()['received'], 4)
+
+        # A retried or stale chunk is refused with the offset to resume from
+        conflict = self.put(upload['url'], b"0123", 0)
+        self.assertEqual((conflict.status_code, conflict.json()['received']), (409, 4))
+
+        self.put(upload['url'], b"4567", 4)
+        # Parts live in the attachment storage, which the worker that assembles them can reach
+        self.assertEqual(self.stored_parts(), [b"0123", b"4567"])
+        self.assertEqual(len(AttachmentUpload.objects.get(pk=upload['id']).parts), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.put(upload['url'], b"89", 8)
+
+        status = self.client.get(upload['url']).json()
+        self.assertEqual(status['status'], 'complete')
+        self.assertEqual(status['attachment']['file_name'], "report.pdf")
+        attachment = TaskAttachment.objects.get(pk=status['attachment']['id'])
+        self.assertEqual(self.stored_path(attachment).read_bytes(), b"0123456789")
+        self.assertEqual(self.stored_parts(), [])
+
+    def test_rejects_oversized_chunks_and_files(self):
+        upload = self.start(6)
+        response = self.put(upload['url'], b"012345", 0)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(AttachmentUpload.objects.get(pk=upload['id']).received, 0)
+
+        with override_settings(ATTACHMENT_MAX_UPLOAD_SIZE=5):
+            response = self.client.post(
+                reverse('tasks:start_attachment_upload', args=[self.task.pk]), {'file_name': "big.bin", 'size': 6}
+            )
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_the_uploader_can_continue(self):
+        upload = self.start(4)
+        self.client.login(username='dev2', password='pass')
+        self.assertEqual(self.put(upload['url'], b"0123", 0).status_code, 404)
+
+    def test_expire_stale_uploads(self):
+        stale = self.start(4)
+        self.put(stale['url'], b"01", 0)
+        AttachmentUpload.objects.filter(pk=stale['id']).update(updated_at=timezone.now() - timedelta(days=2))
+        self.start(4)
+
+        self.assertEqual(uploads.expire_uploads(), 1)
+        self.assertEqual(self.stored_parts(), [])
+        self.assertEqual(AttachmentUpload.objects.count(), 1)
@@ -0,0 +1,188 @@
+"""
+Resumable chunked attachment uploads.
+
+Files too big for one request are sent in pieces:
+
+    POST tasks:start_attachment_upload  file_name, size   -> AttachmentUpload (status 'uploading')
+    PUT  tasks:attachment_upload        raw bytes, Upload-Offset header, one chunk at a time
+    GET  tasks:attachment_upload        progress; after a dropped connection the client
+                                        resumes from `received`
+
+Each chunk is spooled from the request (to disk past PART_SPOOL_SIZE) and saved as
+one part through the attachment backend the upload started with (tasks/storage.py):
+Cloudinary or the attachment storage, which both the web process that receives the
+chunks and the Celery worker that assembles them can reach. AttachmentUpload.parts
+lists the parts in order. When the last byte lands the upload moves to 'processing'
+and tasks.tasks.finalize_attachment_upload joins the parts, hands the file to the
+same backend and creates the TaskAttachment.
+"""
+import logging
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AttachmentUpload, TaskAttachment
+from .storage import get_backend
+
+logger = logging.getLogger(__name__)
+
+# Bytes copied from the request to the part at a time
+COPY_BUFFER_SIZE = 64 * 1024
+
+# Chunks and assembled files stay in memory up to this size, then spill to disk
+PART_SPOOL_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """A request the upload can't take; the message is safe to show the user."""
+
+
+class UploadOffsetError(UploadError):
+    """The chunk doesn't start where the upload left off; the client should resume from `expected`."""
+
+    def __init__(self, expected):
+        super().__init__(f"Expected a chunk at offset {expected}.")
+        self.expected = expected
+
+
+def part_name(upload, offset):
+    return f"attachment_uploads/{upload.pk}/{offset:012d}"
+
+
+def delete_parts(upload):
+    backend = get_backend(upload.storage)
+    for name in upload.parts:
+        try:
+            backend.delete_part(name)
+        except Exception:
+            # An orphaned part is only wasted space
+            logger.exception("Could not delete part %s of upload %s", name, upload.pk)
+
+
+def start_upload(task, user, file_name, size):
+    file_name = (file_name or '').strip()[:255]
+    if not file_name:
+        raise UploadError("A file name is required.")
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError("The file size is required.")
+    if size <= 0:
+        raise UploadError("The file is empty.")
+    if size > settings.ATTACHMENT_MAX_UPLOAD_SIZE:
+        raise UploadError(f"Files are limited to {settings.ATTACHMENT_MAX_UPLOAD_SIZE // (1024 * 1024)} MB.")
+
+    return AttachmentUpload.objects.create(
+        task=task, uploaded_by=user, file_name=file_name, size=size, storage=get_backend().name,
+    )
+
+
+def write_chunk(upload, offset, stream):
+    """
+    Saves the chunk in `stream` (the request) as the part at `offset` and advances
+    `received`. Completing the file schedules the finalize task.
+    """
+    if upload.status != 'uploading':
+        raise UploadError("This upload is no longer accepting data.")
+    try:
+        offset = int(offset)
+    except (TypeError, ValueError):
+        raise UploadError("The Upload-Offset header is required.")
+    if offset != upload.received:
+        raise UploadOffsetError(upload.received)
+
+    # Never read past the chunk limit or the declared size
+    limit = min(settings.ATTACHMENT_CHUNK_SIZE, upload.size - offset)
+    written = 0
+    with tempfile.SpooledTemporaryFile(max_size=PART_SPOOL_SIZE) as chunk:
+        while True:
+            data = stream.read(min(COPY_BUFFER_SIZE, limit + 1 - written))
+            if not data:
+                break
+            written += len(data)
+            if written > limit:
+                raise UploadError("The chunk is larger than allowed.")
+            chunk.write(data)
+        if not written:
+            return upload
+        chunk.seek(0)
+        backend = get_backend(upload.storage)
+        name = backend.save_part(part_name(upload, offset), File(chunk, name=f"{offset:012d}"))
+
+    # Bytes a dropped connection did deliver are kept; the client resumes after them.
+    # The offset guard lets only one of two racing chunks count (and keeps `parts` in step).
+    received = offset + written
+    status = 'processing' if received == upload.size else 'uploading'
+    updated = AttachmentUpload.objects.filter(pk=upload.pk, received=offset, status='uploading').update(
+        received=received, status=status, parts=upload.parts + [name], updated_at=timezone.now()
+    )
+    upload.refresh_from_db()
+    if not updated:
+        backend.delete_part(name)
+        raise UploadOffsetError(upload.received)
+    if status == 'processing':
+        schedule_finalize(upload)
+    return upload
+
+
+def schedule_finalize(upload):
+    from .tasks import finalize_attachment_upload
+
+    def schedule():
+        try:
+            finalize_attachment_upload.delay(str(upload.pk))
+        except Exception:
+            # Broker down: the bytes are all here, finish inline instead
+            logger.exception("Could not schedule finalizing upload %s; finalizing inline", upload.pk)
+            finalize_attachment_upload(str(upload.pk))
+
+    transaction.on_commit(schedule)
+
+
+def finalize_upload(upload):
+    """Joins the parts, stores the file and creates its TaskAttachment; None (and status 'failed') on error."""
+    backend = get_backend(upload.storage)
+    attachment = TaskAttachment(
+        task_id=upload.task_id, uploaded_by_id=upload.uploaded_by_id,
+        file_name=upload.file_name, storage=backend.name,
+    )
+    try:
+        with tempfile.SpooledTemporaryFile(max_size=PART_SPOOL_SIZE) as assembled:
+            for name in upload.parts:
+                with backend.open_part(name) as part:
+                    shutil.copyfileobj(part, assembled, COPY_BUFFER_SIZE)
+            if assembled.tell() != upload.size:
+                raise UploadError(f"Assembled {assembled.tell()} of {upload.size} bytes.")
+            assembled.seek(0)
+            backend.save(attachment, File(assembled, name=upload.file_name))
+        attachment.save()
+    except Exception as exc:
+        logger.exception("Could not store upload %s", upload.pk)
+        upload.status = 'failed'
+        upload.error = str(exc)[:255]
+        upload.save(update_fields=['status', 'error', 'updated_at'])
+        return None
+    finally:
+        delete_parts(upload)
+
+    upload.attachment = attachment
+    upload.status = 'complete'
+    upload.save(update_fields=['attachment', 'status', 'updated_at'])
+    return attachment
+
+
+def expire_uploads():
+    """Deletes unfinished uploads (and their parts) older than ATTACHMENT_UPLOAD_EXPIRY_HOURS."""
+    cutoff = timezone.now() - timedelta(hours=settings.ATTACHMENT_UPLOAD_EXPIRY_HOURS)
+    stale = AttachmentUpload.objects.filter(status__in=['uploading', 'failed'], updated_at__lt=cutoff)
+    count = 0
+    for upload in stale:
+        delete_parts(upload)
+        upload.delete()
+        count += 1
+    return count
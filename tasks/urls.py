@@ -1,24 +1,36 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# The hot AJAX endpoints: sync views under WSGI workers, async ORM variants under ASGI
+ajax_views = async_views if settings.AJAX_VIEWS_MODE == 'async' else views
 
 app_name = 'tasks'
 
 urlpatterns = [
-    path('', views.dashboard, name='dashboard'),
+    path('', ajax_views.dashboard, name='dashboard'),
     path('tasks/', views.TaskListView.as_view(), name='task_list'),
+    path('tasks/tags/', views.tag_cloud, name='tag_cloud'),
+    path('tasks/bulk/', views.bulk_task_action, name='bulk_action'),
+    path('tasks/export/', views.TaskExportView.as_view(), name='task_export'),
+    path('tasks/import/', views.import_tasks_view, name='task_import'),
     path('tasks/<int:pk>/', views.TaskDetailView.as_view(), name='task_detail'),
     path('tasks/create/', views.TaskCreateView.as_view(), name='task_create'),
     path('tasks/<int:pk>/edit/', views.TaskUpdateView.as_view(), name='task_update'),
     path('tasks/<int:pk>/delete/', views.TaskDeleteView.as_view(), name='task_delete'),
-    path('tasks/<int:pk>/comment/', views.add_comment, name='add_comment'),
+    path('tasks/<int:pk>/comment/', ajax_views.add_comment, name='add_comment'),
     path('comment/<int:pk>/edit/', views.edit_comment, name='comment_edit'),
     path('comment/<int:pk>/delete/', views.delete_comment, name='comment_delete'),
-    path('tasks/<int:pk>/status/', views.update_task_status, name='update_status'),
-    path('tasks/<int:pk>/progress/', views.update_progress, name='update_progress'),
+    path('tasks/<int:pk>/status/', ajax_views.update_task_status, name='update_status'),
+    path('tasks/<int:pk>/progress/', ajax_views.update_progress, name='update_progress'),
     path('task/<int:pk>/attach/', views.add_attachment, name='add_attachment'),
+    path('task/<int:pk>/uploads/', views.start_attachment_upload, name='start_attachment_upload'),
+    path('uploads/<uuid:upload_id>/', views.attachment_upload, name='attachment_upload'),
     path('attachment/<int:pk>/delete/', views.delete_attachment, name='delete_attachment'),
     path('attachment/<int:pk>/download/', views.download_attachment, name='download_attachment'),
     path('tasks/<int:pk>/clear-history/', views.clear_task_history, name='clear_history'),
+    path('tasks/<int:pk>/history/', views.task_history, name='task_history'),
+    path('events/', views.event_stream, name='event_stream'),
     # path('update-status/<int:pk>/', views.update_task_status, name='update_task_status'),
 ]
 
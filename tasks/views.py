@@ -1,4 +1,4 @@
-from django.http import HttpResponseRedirect, JsonResponse
+from django.http import Http404, HttpResponseRedirect, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
@@ -9,16 +9,36 @@ from django.contrib import messages
 from django.urls import reverse_lazy, reverse
 from django_filters.views import FilterView
 from django.db import transaction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from accounts.permissions import permissions_for
+from projects.membership import member_project_ids
 from projects.models import Project
-from .models import Task, TaskComment, TaskAttachment, TaskHistory
+from .models import AttachmentUpload, Task, TaskComment, TaskAttachment, TaskHistory
+from .counters import read_dashboard_stats
 from .filters import TaskFilter
-from .forms import TaskAttachmentForm, TaskForm, TaskCommentForm, ProgressUpdateForm
+from .pagination import paginate_by_cursor
+from .search import ranked_tasks, task_search_filter
+from .tags import tag_counts
+from .comments import load_comment_tree
+from .history import history_page
+from .attachment_urls import attachment_url, attachment_urls
+from . import events, uploads
+from .storage import get_backend
+from .mixins import TaskObjectMixin, get_request_task
+from .export import EXPORT_FORMATS, export_response
+from .importer import import_uploaded_file
+from .bulk import BulkActionError, apply_bulk_action, apply_progress, apply_status, assignee_options
+from .forms import TaskAttachmentForm, TaskForm, TaskCommentForm, ProgressUpdateForm, TaskImportFileForm
 from django.views.decorators.cache import never_cache
 from django.utils.decorators import method_decorator
 from django.utils.timesince import timesince
 from django.utils import timezone
-from cloudinary.utils import cloudinary_url
 from django.http import HttpResponse
+import asyncio
 import os
 import cloudinary
 
@@ -36,90 +56,58 @@ from django.http import JsonResponse
 
 
 
-@login_required
-def dashboard(request):
-    user = request.user
-    view_mode = request.GET.get('view', 'personal')
-    search_query = request.GET.get('q', '').strip()
-
-    if user.profile.role in ['admin', 'manager']:
+def _efficiency(stats):
+    total = stats['actionable_pool_count'] or 0
+    completed = stats['completed_tasks'] or 0
+    efficiency = round((completed / total) * 100) if total > 0 else 0
+    return min(efficiency, 100)
+
+
+# Dashboard aggregations, shared with the async variant (tasks/async_views.py)
+PROJECT_POOL_STATS = {
+    'active_projs': Count('id', filter=Q(status='active')),
+    'on_hold_projs': Count('id', filter=Q(status='on_hold')),
+    'inactive_projs': Count('id', filter=Q(status='inactive')),
+}
+
+SEARCH_POOL_STATS = {
+    'active_tasks': Count('id', filter=Q(project__status='active') & ~Q(status='completed')),
+    'completed_tasks': Count('id', filter=Q(status='completed')),
+    'on_hold_tasks': Count('id', filter=Q(project__status='on_hold')),
+    'inactive_tasks': Count('id', filter=Q(project__status='inactive')),
+    'actionable_pool_count': Count('id', filter=Q(project__status__in=['active','completed']) &  ~Q(status='blocked')),
+    'overall_progress': Avg('progress'),
+}
+
+
+def dashboard_pools(user, view_mode, search_query):
+    """
+    (is_privileged, project pool, task pool, blocked pool) for one dashboard request.
+    Only builds querysets; user.profile must already be loaded.
+    """
+    is_privileged = user.profile.role in ['admin', 'manager']
+    if is_privileged:
         project_pool = Project.objects.all()
     else:
         # Projects where user is Lead or a Member
-        project_pool = Project.objects.filter(
-            Q(team_lead=user) | Q(team_members=user)
-        ).distinct()
-
-    proj_stats = project_pool.aggregate(
-        active_projs=Count('id', filter=Q(status='active')),
-        on_hold_projs=Count('id', filter=Q(status='on_hold')),
-        inactive_projs=Count('id', filter=Q(status='inactive')),
-    )
+        project_pool = Project.objects.filter(pk__in=member_project_ids(user, include_led=True))
 
     # 1. ORCHESTRATE THE TASK POOL
-    if user.profile.role in ['admin', 'manager']:
+    if is_privileged:
         tasks_qs = Task.objects.all()
     else:
-        # Get projects where user is the designated Lead
-        led_projects = Project.objects.filter(team_lead=user)
-        
         if view_mode == 'team':
             # Team view: Tasks from projects you lead OR projects you are a member of
-            tasks_qs = Task.objects.filter(
-                Q(project__in=led_projects) | Q(project__team_members=user)
-            ).distinct()
+            tasks_qs = Task.objects.filter(project_id__in=member_project_ids(user, include_led=True))
         else:
             # Personal view: Only things explicitly assigned to you
             tasks_qs = Task.objects.filter(assigned_to=user)
 
-    # Apply Dashboard Search
     if search_query:
-        tasks_qs = tasks_qs.filter(
-            Q(title__icontains=search_query) | 
-            Q(project__title__icontains=search_query)
-        )
+        # Apply Dashboard Search
+        tasks_qs = tasks_qs.filter(task_search_filter(search_query))
 
-    # 2. HIGH-PERFORMANCE AGGREGATION (Single DB Hit)
-    # We use 'distinct=True' for project counts because tasks_qs might have duplicates from JOINS
-    # --- UPDATED AGGREGATION ---
-    stats = tasks_qs.aggregate(
-        active_tasks=Count('id', filter=Q(project__status='active') & ~Q(status='completed')),
-        
-        # FIX: Remove 'project__status=active' to count ALL completed tasks in the pool
-        # completed_tasks=Count('id', filter=Q(status='completed')), 
-        # completed_tasks=Count('id', filter=Q(project__status='active', status='completed')),
-        completed_tasks=Count('id', filter=Q(status='completed')),
-        
-        on_hold_tasks=Count('id', filter=Q(project__status='on_hold')),
-        inactive_tasks=Count('id', filter=Q(project__status='inactive')),
-        # actionable_pool_count=Count('id', filter=Q(project__status='active')),
-        actionable_pool_count=Count('id', filter=Q(project__status__in=['active','completed']) &  ~Q(status='blocked')),
-        # actionable_pool_count=Count('id'),
-        # Project counts
-        # active_projs=Count('project', filter=Q(project__status='active'), distinct=True),
-        # on_hold_projs=Count('project', filter=Q(project__status='on_hold'), distinct=True),
-        # inactive_projs=Count('project', filter=Q(project__status='inactive'), distinct=True),
-        overall_progress=Avg('progress')
-    )
-    total = stats['actionable_pool_count'] or 0
-    completed = stats['completed_tasks'] or 0
-    
-    # 3. EFFICIENCY CALCULATION
-    # actionable = stats['actionable_pool_count']
-    # efficiency = round((stats['completed_tasks'] / actionable) * 100) if actionable > 0 else 0
-    efficiency = round((completed / total) * 100) if total > 0 else 0
-    efficiency = min(efficiency, 100)
-
-    # 4. RECENT TASKS (Optimized with select_related)
-    # Added 'assigned_to__profile' to prevent N+1 if you show user roles/avatars in the table
-    
-    # recent_tasks = tasks_qs.select_related('project', 'assigned_to', 'assigned_to__profile').order_by('-updated_at')[:10]
-    recent_tasks = tasks_qs.select_related('project', 'assigned_to', 'assigned_by__profile').order_by('-updated_at')[:10]
-    # recent_tasks = tasks_qs.select_related('project', 'assigned_to', 'assigned_to__profile') \
-    # .annotate(project_avg=Avg('project__tasks__progress')) \
-    # .order_by('-updated_at')[:10]
-    
-    if user.profile.role in ['admin', 'manager']:
+    if is_privileged:
         # Admins see all blocked tasks across the company
         my_blocked_tasks = Task.objects.filter(status='blocked')
     else:
@@ -127,14 +115,68 @@ def dashboard(request):
         my_blocked_tasks = Task.objects.filter(
             status='blocked'
         ).filter(Q(assigned_to=user) | Q(project__team_lead=user))
-    
-    # 2. Get the COUNT of those tasks (The Number)
-    blocked_tasks_count = my_blocked_tasks.count()
-    # 2. Get the number of UNIQUE projects that contain those blocked tasks
-    projects_with_blocked_tasks = my_blocked_tasks.values('project').distinct().count()
-    
+
+    return is_privileged, project_pool, tasks_qs, my_blocked_tasks
+
+
+def recent_dashboard_tasks(tasks_qs, search_query=''):
+    # 4. RECENT TASKS (Optimized with select_related)
+    # Added 'assigned_to__profile' to prevent N+1 if you show user roles/avatars in the table
+    tasks_qs = tasks_qs.select_related('project', 'assigned_to', 'assigned_by__profile')
+    if search_query:
+        # Best matches first: ten rows and no cursor, so relevance order is safe here
+        return ranked_tasks(tasks_qs, search_query)[:10]
+    return tasks_qs.order_by('-updated_at')[:10]
+
+
+def dashboard_json(html, stats, proj_stats):
+    """The AJAX refresh payload."""
+    return JsonResponse({
+        'html': html,
+        'total_active': stats['active_tasks'],
+        'completed': stats['completed_tasks'],
+        'on_hold': stats['on_hold_tasks'],
+        'inactive': stats['inactive_tasks'],
+        'active_projects': proj_stats['active_projs'],
+        'on_hold_projects': proj_stats['on_hold_projs'],
+        'inactive_projects': proj_stats['inactive_projs'],
+        'efficiency': _efficiency(stats),
+        'overall_completion': round(stats['overall_progress'] or 0),
+    })
+
+
+@login_required
+def dashboard(request):
+    user = request.user
+    view_mode = request.GET.get('view', 'personal')
+    search_query = request.GET.get('q', '').strip()
+
+    is_privileged, project_pool, tasks_qs, my_blocked_tasks = dashboard_pools(user, view_mode, search_query)
+    proj_stats = project_pool.aggregate(**PROJECT_POOL_STATS)
+
+    if search_query:
+        # 2. LIVE AGGREGATION (searches can't be precomputed)
+        stats = tasks_qs.aggregate(**SEARCH_POOL_STATS)
+        stats['blocked_tasks_count'] = my_blocked_tasks.count()
+        stats['projects_with_blocked_tasks'] = my_blocked_tasks.values('project').distinct().count()
+    else:
+        # 2. PRECOMPUTED COUNTERS (one indexed read, maintained by tasks/signals.py)
+        stats = read_dashboard_stats(user, is_privileged, view_mode)
+
+    # 3. EFFICIENCY CALCULATION
+    efficiency = _efficiency(stats)
+
+    recent_tasks = recent_dashboard_tasks(tasks_qs, search_query)
     
     # --- RESPONSE HANDLING ---
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        html = render_to_string('tasks/includes/dashboard_table_rows.html', {
+            'recent_tasks': recent_tasks,
+            'view_mode': view_mode,
+
+        }, request=request)
+        return dashboard_json(html, stats, proj_stats)
+
     context = {
         'overall_completion': round(stats['overall_progress'] or 0),
         'today': timezone.now().date(),
@@ -142,8 +184,8 @@ def dashboard(request):
         'total_active': stats['active_tasks'],
         'completed_tasks': stats['completed_tasks'],
         'on_hold_count': stats['on_hold_tasks'],
-        'blocked_tasks_count': blocked_tasks_count,
-        'projects_with_blocked_tasks': projects_with_blocked_tasks,
+        'blocked_tasks_count': stats['blocked_tasks_count'],
+        'projects_with_blocked_tasks': stats['projects_with_blocked_tasks'],
         'inactive_count': stats['inactive_tasks'],
         'active_projects_count': proj_stats['active_projs'],
         'on_hold_projects_count':  proj_stats['on_hold_projs'],
@@ -151,28 +193,6 @@ def dashboard(request):
         'efficiency': efficiency,
         'recent_tasks': recent_tasks,
     }
-
-    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        html = render_to_string('tasks/includes/dashboard_table_rows.html', {
-            'recent_tasks': recent_tasks,
-            'view_mode': view_mode,
-
-        }, request=request)
-        
-        # Update context values into the AJAX response
-        return JsonResponse({
-            'html': html,
-            'total_active': context['total_active'],
-            'completed': context['completed_tasks'],
-            'on_hold': context['on_hold_count'],
-            'inactive': context['inactive_count'],
-            'active_projects': context['active_projects_count'],
-            'on_hold_projects': context['on_hold_projects_count'],
-            'inactive_projects': context['inactive_projects_count'],
-            'efficiency': context['efficiency'], 
-            'overall_completion': context['overall_completion'],
-        })
-
     return render(request, 'tasks/dashboard.html', context)
 
 
@@ -313,8 +333,8 @@ class TaskListView(LoginRequiredMixin, FilterView):
         super().__init__(*args, **kwargs)
         if user:
             self.filters['project'].field.queryset = Project.objects.filter(
-                Q(team_members=user) | Q(team_lead=user)
-            ).distinct()
+                pk__in=member_project_ids(user, include_led=True)
+            )
 
     def get_queryset(self):
         user = self.request.user
@@ -323,18 +343,19 @@ class TaskListView(LoginRequiredMixin, FilterView):
     
         # 1. SECURITY SCOPE
         if user.profile.role not in ['admin', 'manager','observer']:
+            # Semi-join on the membership index instead of the team_members join + DISTINCT
             qs = qs.filter(
                 Q(assigned_to=user) | 
                 Q(assigned_by=user) | 
-                Q(project__team_members=user)
-            ).distinct()
+                Q(project_id__in=member_project_ids(user))
+            )
 
         # 2. WORKSPACE POOL (Mine vs Team)
         view_mode = self.request.GET.get('view', 'all')
         if view_mode == 'mine':
             qs = qs.filter(assigned_to=user)
         elif view_mode == 'team':
-            qs = qs.filter(project__team_members=user).exclude(assigned_to=user)
+            qs = qs.filter(project_id__in=member_project_ids(user)).exclude(assigned_to=user)
 
         # 3. UPDATED LIFECYCLE TOGGLE
         proj_status = self.request.GET.get('proj_status', 'active')
@@ -355,10 +376,8 @@ class TaskListView(LoginRequiredMixin, FilterView):
         # 4. FIXED SMART SEARCH
         query = self.request.GET.get('q')
         if query:
-            qs = qs.filter(
-                Q(title__icontains=query) | 
-                Q(project__title__icontains=query)
-            ).distinct()
+            # Indexed semi-joins on the search postings; no join fan-out, so no DISTINCT
+            qs = qs.filter(task_search_filter(query))
             
         # 5. INTEGRATE FILTERS
         self.filterset = self.filterset_class(self.request.GET, queryset=qs.order_by('-updated_at'))
@@ -369,11 +388,131 @@ class TaskListView(LoginRequiredMixin, FilterView):
         kwargs['user'] = self.request.user # Pass user to the filter
         return kwargs
 
+    def paginate_queryset(self, queryset, page_size):
+        # Numbered ?page= links keep offset pagination; everything else seeks by cursor
+        if 'page' in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+
+        self.cursor_page = paginate_by_cursor(
+            queryset, page_size,
+            after=self.request.GET.get('cursor'),
+            before=self.request.GET.get('before'),
+            with_count=self.request.GET.get('count') == 'exact',
+        )
+        return (None, None, self.cursor_page.object_list, False)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursor_page'] = getattr(self, 'cursor_page', None)
+        # Bulk toolbar choices (lazy: only the full page renders them; the action re-checks per project)
+        context['bulk_status_choices'] = Task.STATUS_CHOICES
+        context['bulk_priority_choices'] = Task.PRIORITY_CHOICES
+        context['bulk_assignees'] = assignee_options(permissions_for(self.request))
+        return context
+
     def render_to_response(self, context, **response_kwargs):
         if self.request.headers.get('x-requested-with') == 'XMLHttpRequest':
             html = render_to_string('tasks/includes/task_inventory_table.html', context, request=self.request)
-            return JsonResponse({'html': html})
+            data = {'html': html}
+            cursor_page = context['cursor_page']
+            if cursor_page:
+                data.update({
+                    'next_cursor': cursor_page.next_cursor,
+                    'previous_cursor': cursor_page.previous_cursor,
+                    'total_count': cursor_page.total_count,
+                })
+            return JsonResponse(data)
         return super().render_to_response(context, **response_kwargs)
+
+
+class TaskExportView(TaskListView):
+    """
+    The inventory's current scope, filters and search as a CSV / JSONL download
+    (?format=csv|jsonl plus the task list's own query parameters).
+    """
+
+    def get(self, request, *args, **kwargs):
+        fmt = request.GET.get('format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return HttpResponse(f"Unsupported export format: {fmt}", status=400)
+        # Same scoping, lifecycle toggle, search and TaskFilter as the list view
+        return export_response(self.get_queryset(), fmt)
+
+
+@login_required
+def import_tasks_view(request):
+    """Upload a CSV / JSONL file of tasks (see tasks/importer.py); rows are checked like TaskCreateView."""
+    user = request.user
+    # Admins/managers, or leads of at least one project (the importer re-checks every row)
+    if not permissions_for(request).can_import_tasks():
+        messages.error(request, "You don't have permission to import tasks.")
+        return redirect('tasks:task_list')
+
+    result = None
+    form = TaskImportFileForm(request.POST or None, request.FILES or None)
+    if request.method == 'POST' and form.is_valid():
+        result = import_uploaded_file(
+            user, form.cleaned_data['file'], form.cleaned_data['format'], dry_run=form.cleaned_data['dry_run']
+        )
+        if result.created and not form.cleaned_data['dry_run']:
+            messages.success(request, f"Imported {result.created} task(s).")
+
+    return render(request, 'tasks/task_import.html', {
+        'form': form,
+        'result': result,
+        'errors': result.errors[:200] if result else [],
+    })
+
+
+@login_required
+def bulk_task_action(request):
+    """
+    Applies one status / assignee / priority / delete to the selected inventory rows
+    (POST task_ids, action, value). Tasks the user may not change are skipped and reported.
+    """
+    if request.method != 'POST':
+        return redirect('tasks:task_list')
+    is_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+    task_ids = [pk for pk in request.POST.getlist('task_ids') if pk.isdigit()]
+    action = request.POST.get('action')
+
+    try:
+        result = apply_bulk_action(
+            request.user, task_ids, action, request.POST.get('value'), permissions=permissions_for(request)
+        )
+    except BulkActionError as e:
+        if is_ajax:
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+        messages.error(request, str(e))
+        return redirect('tasks:task_list')
+
+    verb = 'deleted' if action == 'delete' else 'updated'
+    message = f"{len(result.changed)} task(s) {verb}."
+    if result.skipped:
+        message += f" {len(result.skipped)} skipped (no permission)."
+    if is_ajax:
+        return JsonResponse({
+            'status': 'success',
+            'message': message,
+            'changed': result.changed,
+            'skipped': result.skipped,
+        })
+    messages.success(request, message)
+    return redirect('tasks:task_list')
+
+
+@login_required
+def tag_cloud(request):
+    """Per-tag task counts over the tasks the user can see (cached, see tasks/tags.py)."""
+    user = request.user
+    if user.profile.role in ['admin', 'manager', 'observer']:
+        tasks_qs, scope = Task.objects.all(), 'all'
+    else:
+        tasks_qs = Task.objects.filter(
+            Q(assigned_to=user) | Q(assigned_by=user) | Q(project_id__in=member_project_ids(user))
+        )
+        scope = user.pk
+    return JsonResponse({'tags': tag_counts(tasks_qs, scope)})
     
 
 # --- TASK DETAIL VIEW ---
@@ -385,10 +524,10 @@ class TaskDetailView(LoginRequiredMixin, DetailView):
 
     def get_queryset(self):
         # Use prefetch_related for the related sets to avoid N+1 queries
+        # Comments are loaded separately as a tree (see tasks.comments)
+        # History is paged (see tasks.history), not prefetched whole
         return super().get_queryset().prefetch_related(
-            'comments__commented_by', 
             'attachments__uploaded_by',
-            'history__changed_by'
         )
 
     def get_context_data(self, **kwargs):
@@ -397,8 +536,15 @@ class TaskDetailView(LoginRequiredMixin, DetailView):
         # context['comments'] = self.object.comments.select_related('commented_by').all()
         # context['attachments'] = self.object.attachments.select_related('uploaded_by').all()
         # We remove .select_related() because the data is already prefetched above.
-        context['comments'] = self.object.comments.all() 
-        context['attachments'] = self.object.attachments.all()
+        # context['comments'] = self.object.comments.all()
+        context['comment_tree'] = load_comment_tree(self.object)
+        context['history_page'] = history_page(self.object)
+        attachments = list(self.object.attachments.all())
+        # One cache read for every file's signed URL (tasks.attachment_urls)
+        view_urls = attachment_urls([attachment for attachment in attachments if not attachment.is_blocked], 'view')
+        for attachment in attachments:
+            attachment.view_url = view_urls.get(attachment.pk, '')
+        context['attachments'] = attachments
         context['comment_form'] = TaskCommentForm()
         # Pass the attachment form to the template
         context['attachment_form'] = TaskAttachmentForm() 
@@ -410,25 +556,16 @@ class TaskCreateView(LoginRequiredMixin,UserPassesTestMixin,CreateView):
     form_class = TaskForm
     template_name = 'tasks/task_form.html'
 
-    def test_func(self):
-        user = self.request.user
-        project_id = self.request.GET.get('project')
-
-        if user.profile.role in ['admin', 'manager']:
-            return True
-        
-        # 2. Check if this Developer is the Lead for the specific project
-        if project_id:
-            project = get_object_or_404(Project, id=project_id)
+    def get_project(self):
+        """The ?project= target, looked up once per request (test_func and get_initial both need it)."""
+        if '_project' not in self.__dict__:
+            project_id = self.request.GET.get('project')
+            self._project = get_object_or_404(Project, id=project_id) if project_id else None
+        return self._project
 
-            # RULE: Cannot create tasks in an Inactive/Locked project
-            if project.status == 'inactive':
-                return False
-            
-            # Allow if the Developer is the designated Team Lead
-            return project.team_lead == user
-
-        return False
+    def test_func(self):
+        # Admins/managers anywhere; a Team Lead only in their own, unlocked project
+        return permissions_for(self.request).can_create_task(self.get_project())
     
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
@@ -437,12 +574,10 @@ class TaskCreateView(LoginRequiredMixin,UserPassesTestMixin,CreateView):
 
     def get_initial(self):
         initial = super().get_initial()
-        # Get the 'project' ID from the URL query parameters
-        project_id = self.request.GET.get('project')
+        # Get the 'project' from the URL query parameters
+        project = self.get_project()
         
-        if project_id:
-            project = get_object_or_404(Project, id=project_id)
-            
+        if project:
             # 1. Automatically select the project in the dropdown
             initial['project'] = project
             
@@ -473,7 +608,7 @@ class TaskCreateView(LoginRequiredMixin,UserPassesTestMixin,CreateView):
 
 
 @method_decorator(never_cache, name='dispatch')
-class TaskUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class TaskUpdateView(LoginRequiredMixin, UserPassesTestMixin, TaskObjectMixin, UpdateView):
     model = Task
     form_class = TaskForm
     template_name = 'tasks/task_form.html'
@@ -484,42 +619,17 @@ class TaskUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         return kwargs
 
     def test_func(self):
-        user = self.request.user
-        task = self.get_object()
-
-        is_authorized = (
-            user.profile.role in ['admin', 'manager'] or 
-            task.project.team_lead == user or  # <--- This is already here!
-            task.assigned_to == user
-        )
+        # Never in locked projects or for observers; admins, managers, the Team Lead
+        # and the assignee otherwise
+        return permissions_for(self.request).can_edit_task(self.get_object())
 
-        # Rule 1: Project-wide lock
-        if task.project.status == 'inactive':
-            return False
-        
-       # Rule 2: Global Role restrictions
-        if user.profile.role == 'observer':
-            return False
-
-        # Rule 3: Authority Override (Admin, Manager, OR Project Team Lead)
-        if user.profile.role in ['admin', 'manager'] or task.project.team_lead == user:
-            return True
-        
-        # Rule 4: Standard Member (Only their own assigned tasks)
-        return task.assigned_to == user
-        
-    
     def get_form(self, *args, **kwargs):
         form = super().get_form(*args, **kwargs)
-        user = self.request.user
         task = self.get_object()
 
-        # LOGIC: Lock fields ONLY if the user is a Developer AND NOT the Team Lead
-        # If they are the Lead, they get full access to assign/edit everything.
-        is_developer = hasattr(user, 'profile') and user.profile.role == 'developer'
-        is_not_lead = task.project.team_lead != user
-
-        if is_developer and is_not_lead:
+        # LOGIC: Lock fields for Developers who aren't the Team Lead (their own tasks' status only).
+        # Admins, managers and the Lead get full access to assign/edit everything.
+        if not permissions_for(self.request).can_edit_fields(task):
             # Fields that a regular developer should not change
             fields_to_lock = [
                 'priority', 'due_date', 'estimated_hours', 'title', 
@@ -539,8 +649,9 @@ class TaskUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         return form
 
     def form_valid(self, form):
-        old_task = self.get_object()
-        old_status_label = old_task.get_status_display()
+        # self.object is the memoized task the form has already written into; the
+        # status it was loaded with is in its snapshot
+        old_status_label = dict(Task.STATUS_CHOICES).get(self.object._loaded_values['status'])
 
         actual = form.cleaned_data.get('actual_hours')
         estimated = form.cleaned_data.get('estimated_hours')
@@ -679,14 +790,14 @@ class TaskUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
 
 
 
-class TaskDeleteView(LoginRequiredMixin, DeleteView):
+class TaskDeleteView(LoginRequiredMixin, UserPassesTestMixin, TaskObjectMixin, DeleteView):
     model = Task
     template_name = 'tasks/task_confirm_delete.html'
     success_url = reverse_lazy('tasks:task_list')
 
     def test_func(self):
         # Only Admins and Managers can delete tasks
-        return self.request.user.profile.role in ['admin', 'manager']
+        return permissions_for(self.request).can_delete(self.get_object())
 
     def delete(self, request, *args, **kwargs):
         messages.success(self.request, 'Task removed.')
@@ -699,7 +810,7 @@ def add_comment(request, pk):
     task = get_object_or_404(Task, pk=pk)
 
     # ADD THIS: Enforce Rule A for comments
-    if task.project.status == 'inactive':
+    if not permissions_for(request).can_comment(task):
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
             return JsonResponse({'status': 'error', 'message': 'Project is locked.'}, status=403)
         messages.error(request, "Comments are disabled for locked projects.")
@@ -734,10 +845,8 @@ def add_comment(request, pk):
 def edit_comment(request, pk):
     comment = get_object_or_404(TaskComment, pk=pk)
 
-    is_author = comment.commented_by == request.user
-    is_staff = request.user.profile.role in ['admin', 'manager']
-
-    if not (is_author or is_staff):
+    # The author, or an Admin/Manager
+    if not permissions_for(request).can_edit_comment(comment):
         return JsonResponse({'status': 'error', 'message': 'Unauthorized'}, status=403)
 
     if request.method == 'POST':
@@ -752,8 +861,8 @@ def edit_comment(request, pk):
 @login_required
 def delete_comment(request, pk):
     comment = get_object_or_404(TaskComment, pk=pk)
-    # Security: Only uploader or Admin/Manager can delete
-    if comment.commented_by == request.user or request.user.profile.role in ['admin', 'manager']:
+    # Security: Only the author or Admin/Manager can delete
+    if permissions_for(request).can_delete_comment(comment):
         comment.delete()
         return JsonResponse({'status': 'success'})
     
@@ -761,16 +870,10 @@ def delete_comment(request, pk):
 
 @login_required
 def update_task_status(request, pk):
-    task = get_object_or_404(Task, pk=pk)
-    user = request.user
+    task = get_request_task(request, pk)
 
-    is_authorized = (
-        user.profile.role in ['admin', 'manager'] or 
-        task.project.team_lead == user or  # Team Lead check
-        task.assigned_to == user
-    )
-    
-    if task.project.status == 'inactive' or not is_authorized:
+    # Admin/Manager, the Team Lead or the assignee; never in locked projects
+    if not permissions_for(request).can_change_status(task):
         return JsonResponse({'status': 'error', 'message': 'Not authorized.'}, status=403)
 
     if request.method == 'POST':
@@ -778,22 +881,8 @@ def update_task_status(request, pk):
         if new_status in dict(Task.STATUS_CHOICES) and new_status != task.status:
             old_label = task.get_status_display()
 
-            # --- FORWARD-FORCING LOGIC ---
-            if new_status == 'completed':
-                task.progress = 100
-            elif new_status == 'todo':
-                task.progress = 0
-            elif new_status == 'in_review':
-                task.progress = 90
-            elif new_status == 'blocked':
-                pass
-            
-            elif new_status == 'in_progress':
-                # "Re-open" logic: if it was Done or Todo, jump to a working state
-                if task.status in ['completed', 'todo']:
-                    task.progress = 10  # Set to a high "nearly done" value
-            
-            task.status = new_status
+            # --- FORWARD-FORCING LOGIC (shared with the bulk action) ---
+            apply_status(task, new_status)
             task.save() 
 
             # Create History Log
@@ -827,17 +916,10 @@ def update_task_status(request, pk):
 
 @login_required
 def update_progress(request, pk):
-    task = get_object_or_404(Task, pk=pk)
-    user = request.user
+    task = get_request_task(request, pk)
 
-    # Updated Permission Logic
-    is_authorized = (
-        user.profile.role in ['admin', 'manager'] or 
-        task.project.team_lead == user or  # Added Team Lead check
-        task.assigned_to == user
-    )
-
-    if task.project.status == 'inactive' or not is_authorized:
+    # Same rule as the status dropdown
+    if not permissions_for(request).can_change_status(task):
         return JsonResponse({'status': 'error', 'message': 'Permission denied'}, status=403)
 
     if request.method == 'POST':
@@ -845,55 +927,13 @@ def update_progress(request, pk):
         old_status_label = task.get_status_display()
         val = int(request.POST.get('progress', 0))
 
-        project_tasks = task.project.tasks.all()
-        overall_stats = project_tasks.aggregate(avg_progress=Avg('progress'))
-        overall_completion = round(overall_stats['avg_progress'] or 0)
-
 
 
-        # --- INTELLIGENT STATUS SYNC ---
-        status_changed = False
-        new_status = task.status
+        # --- SLIDER PATTERN LOGIC (shared with the async variant) ---
+        old_status = task.status
+        apply_progress(task, val)
+        status_changed = task.status != old_status
 
-        # if val == 100 and task.status != 'completed':
-        #     new_status = 'completed'
-        #     status_changed = True
-        # elif val == 0 and task.status != 'todo':
-        #     new_status = 'todo'
-        #     status_changed = True
-        # elif 0 < val < 100 and task.status in ['completed', 'todo']:
-        #     new_status = 'in_progress'
-        #     status_changed = True
-        
-        # --- SLIDER PATTERN LOGIC ---
-        if val == 100:
-            new_status = 'completed'
-        elif val == 0:
-            if task.status != 'blocked': # Blocked can be 0% without being Todo
-                new_status = 'todo'
-        elif val == 90:
-            new_status = 'in_review'
-        else:
-            # Any other movement (10-85%) forces In Progress if it was Todo/Done
-            if task.status in ['todo', 'completed']:
-                new_status = 'in_progress'
-        
-        if new_status != task.status:
-            status_changed = True
-
-        task.status = new_status
-        task.progress = val
-        # if val == 100:
-        #     task.status = 'completed'
-        # elif val == 0:
-        #     task.status = 'todo'
-        # # If the user slides away from 100 on a completed task, mark it active again
-        # elif task.status == 'completed' and val < 100:
-        #     task.status = 'in_progress'
-        # # If the user slides away from 0 on a todo task, mark it active
-        # elif task.status == 'todo' and val > 0:
-        #     task.status = 'in_progress'
-            
         task.save() 
         log_data = {}
         if status_changed:
@@ -915,7 +955,8 @@ def update_progress(request, pk):
                 'status': 'success', 
                 'progress': val,
                 'new_status': task.get_status_display(),
-                'overall_completion': overall_completion,
+                # Maintained by the project rollup on save; no scan of the project's tasks
+                'overall_completion': task.project.overall_progress,
             }
             response_data.update(log_data)
             return JsonResponse(response_data)
@@ -931,7 +972,7 @@ def add_attachment(request, pk):
 
     
     # Check if project is inactive
-    if task.project.status == 'inactive':
+    if not permissions_for(request).can_attach(task):
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
             return JsonResponse({'error': 'Uploads are disabled for paused projects.'}, status=403)
         messages.error(request, 'Uploads are disabled for paused projects.')
@@ -952,33 +993,15 @@ def add_attachment(request, pk):
                 filename = uploaded_file.name
                 attachment.file_name = filename
 
-                import os
-                _, extension = os.path.splitext(filename)
-                ext = extension.lstrip('.').lower()
+                # Cloudinary or the filesystem, per settings.ATTACHMENT_STORAGE
+                backend = get_backend()
+                attachment.storage = backend.name
+                backend.save(attachment, uploaded_file)
                 attachment.save()
 
-                
-                # TO THIS (Add the extension logic):
-                # extension = attachment.file.url.split('.')[-1].lower()
-
-                # 2. IMPORTANT: Append the extension to the public_id for Cloudinary to handle fl_attachment
-                download_url, _ = cloudinary_url(
-                    f"{attachment.file.public_id}.{ext}", # FIX: Append .extension here
-                    resource_type="auto", 
-                    flags="attachment",
-                    attachment=attachment.file_name,
-                    secure=True,
-                    sign_url=True
-                )
                 # AJAX Response
                 if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-                    return JsonResponse({
-                        'id': attachment.id,
-                        'file_name': attachment.file_name,
-                        'url': download_url,
-                        'user': request.user.username,
-                        'extension': ext
-                    })
+                    return JsonResponse(attachment_json(attachment))
                 
                 messages.success(request, f'File "{attachment.file_name}" uploaded successfully.')
             except Exception as e:
@@ -1019,33 +1042,84 @@ def add_attachment(request, pk):
 #         return HttpResponseRedirect("Error generating download link.", status=500)
 
 
-def download_attachment(request, pk):
-    
-    attachment = get_object_or_404(TaskAttachment, pk=pk)
-    
+def attachment_json(attachment):
+    """What the detail page's upload JS needs to add the file to the list."""
+    _, extension = os.path.splitext(attachment.file_name)
+    return {
+        'id': attachment.id,
+        'file_name': attachment.file_name,
+        # Same cached, signed URL the detail page's list uses; none until the file is scanned
+        'url': '' if attachment.is_blocked else attachment_url(attachment, 'view'),
+        'user': attachment.uploaded_by.username,
+        'extension': extension.lstrip('.').lower(),
+    }
+
 
+@login_required
+def start_attachment_upload(request, pk):
+    """Opens a resumable chunked upload (tasks/uploads.py) for a file too big for add_attachment."""
+    task = get_object_or_404(Task.objects.select_related('project'), pk=pk)
+    if not permissions_for(request).can_attach(task):
+        return JsonResponse({'error': 'Uploads are disabled for paused projects.'}, status=403)
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required.'}, status=405)
     try:
-        # ``CloudinaryResource`` exposes ``public_id`` directly which is
-        # always safe to pass to ``cloudinary_url``.  If the attribute is
-        # missing (for example when running tests with SimpleUploadedFile)
-        # we'll skip the signed-url path entirely.
-        public_id = getattr(attachment.file, 'public_id', None)
-        resource_type = attachment.file.resource_type
-       
-            
-        redirect_url, _ = cloudinary_url(
-                public_id,
-                resource_type=resource_type,
-                flags="attachment",
-                attachment=attachment.file_name,
-                secure=True,
-                sign_url=True,
-            )
-    except Exception as e:
-        # log the error for Render logs and continue with the basic url.
-        print(f"CRITICAL DOWNLOAD ERROR [ID {pk}]: {e}")
+        upload = uploads.start_upload(task, request.user, request.POST.get('file_name'), request.POST.get('size'))
+    except uploads.UploadError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(upload_json(upload), status=201)
+
+
+def upload_json(upload):
+    data = {
+        'id': str(upload.pk),
+        'url': reverse('tasks:attachment_upload', args=[upload.pk]),
+        'status': upload.status,
+        'size': upload.size,
+        'received': upload.received,
+        'chunk_size': settings.ATTACHMENT_CHUNK_SIZE,
+    }
+    if upload.status == 'failed':
+        data['error'] = upload.error
+    if upload.status == 'complete' and upload.attachment:
+        data['attachment'] = attachment_json(upload.attachment)
+    return data
+
+
+@login_required
+def attachment_upload(request, upload_id):
+    """GET: progress, to poll or resume from. PUT: the next chunk, at the Upload-Offset header."""
+    upload = get_object_or_404(
+        AttachmentUpload.objects.select_related('attachment__uploaded_by'), pk=upload_id, uploaded_by=request.user
+    )
+    if request.method == 'PUT':
+        try:
+            uploads.write_chunk(upload, request.headers.get('Upload-Offset'), request)
+        except uploads.UploadOffsetError as e:
+            return JsonResponse({**upload_json(upload), 'error': str(e)}, status=409)
+        except uploads.UploadError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+    elif request.method != 'GET':
+        return JsonResponse({'error': 'GET or PUT required.'}, status=405)
+    return JsonResponse(upload_json(upload))
 
-    return HttpResponseRedirect(redirect_url)
+
+@login_required
+def download_attachment(request, pk):
+    attachment = get_object_or_404(TaskAttachment, pk=pk)
+    if attachment.processing_status == 'infected':
+        raise PermissionDenied("This file failed the virus scan.")
+    if attachment.is_blocked:
+        raise PermissionDenied("This file hasn't been virus scanned yet.")
+    backend = get_backend(attachment.storage)
+    if request.GET.get('thumbnail'):
+        if not attachment.thumbnail:
+            raise Http404("This attachment has no thumbnail.")
+        return backend.thumbnail_response(attachment)
+    kind = 'view' if request.GET.get('inline') else 'download'
+    # Cloudinary: a redirect to the cached, signed URL (tasks.attachment_urls);
+    # filesystem: the file itself (tasks.storage)
+    return backend.response(attachment, kind)
 
 @login_required
 def delete_attachment(request, pk):
@@ -1053,7 +1127,7 @@ def delete_attachment(request, pk):
     task_pk = attachment.task.pk
     
     # Permission Check: Only uploader or Admin/Manager can delete
-    if request.user == attachment.uploaded_by or request.user.profile.role in ['admin', 'manager']:
+    if permissions_for(request).can_delete_attachment(attachment):
         attachment.delete()
         
         # AJAX Response
@@ -1074,7 +1148,7 @@ def clear_task_history(request, pk):
     task = get_object_or_404(Task, pk=pk)
     
     # Permission Check: Only Admin/Manager can wipe history
-    if request.user.profile.role not in ['admin', 'manager']:
+    if not permissions_for(request).can_clear_history(task):
         return JsonResponse({'status': 'error', 'message': 'Unauthorized'}, status=403)
 
     if request.method == 'POST':
@@ -1085,4 +1159,98 @@ def clear_task_history(request, pk):
             return JsonResponse({'status': 'success', 'message': 'Timeline cleared.'})
             
         messages.success(request, 'History cleared.')
-    return redirect('tasks:task_detail', pk=pk)
\ No newline at end of file
+    return redirect('tasks:task_detail', pk=pk)
+
+
+@login_required
+def task_history(request, pk):
+    """Older status timeline entries for the detail page, after ?cursor= (AJAX)."""
+    task = get_object_or_404(Task.objects.only('pk'), pk=pk)
+    page = history_page(task, after=request.GET.get('cursor'))
+    html = render_to_string('tasks/includes/history_items.html', {'history_page': page}, request=request)
+    return JsonResponse({'html': html, 'next_cursor': page.next_cursor})
+
+
+# --- LIVE UPDATES (server-sent events) ---
+
+# How long the dashboard stream gathers task events before pushing fresh counters
+EVENT_STREAM_STATS_DELAY = 0.5
+
+
+def _event_stream_scope(user):
+    """(privileged, visible project ids or None for all) for one stream, read once at connect."""
+    role = user.profile.role
+    if role in ['admin', 'manager', 'observer']:
+        return role in ['admin', 'manager'], None
+    return False, set(member_project_ids(user, include_led=True).values_list('project_id', flat=True))
+
+
+def _dashboard_stats_event(user, privileged, view_mode):
+    stats = read_dashboard_stats(user, privileged, view_mode)
+    return {
+        'type': 'stats',
+        'total_active': stats['active_tasks'],
+        'completed': stats['completed_tasks'],
+        'on_hold': stats['on_hold_tasks'],
+        'inactive': stats['inactive_tasks'],
+        'efficiency': _efficiency(stats),
+        'overall_completion': round(stats['overall_progress'] or 0),
+    }
+
+
+@login_required
+async def event_stream(request):
+    """
+    Streams task events (tasks.events) to an EventSource. ?task=<pk> narrows the stream
+    to one task; ?view=personal|team also pushes that dashboard's counters after changes.
+    """
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would be pinned for the life of the connection. 204 tells
+        # EventSource not to reconnect; the pages keep their AJAX refresh.
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    task_id = request.GET.get('task')
+    if task_id is not None and not task_id.isdigit():
+        return HttpResponse(status=400)
+    task_id = int(task_id) if task_id else None
+    view_mode = request.GET.get('view')
+    if view_mode not in ('personal', 'team'):
+        view_mode = None
+    privileged, project_ids = await sync_to_async(_event_stream_scope)(user)
+
+    def visible(event):
+        # ?task= only narrows the stream; the user's scope still applies
+        if task_id is not None and event['task_id'] != task_id:
+            return False
+        return project_ids is None or event['project_id'] in project_ids or event['assigned_to_id'] == user.pk
+
+    async def stream():
+        subscription = await events.get_broker().subscribe()
+        loop = asyncio.get_running_loop()
+        stats_due = None
+        try:
+            yield f"retry: {settings.TASK_EVENTS_RETRY_MS}\n\n"
+            while True:
+                timeout = settings.TASK_EVENTS_KEEPALIVE_SECONDS
+                if stats_due is not None:
+                    timeout = max(0, stats_due - loop.time())
+                event = await subscription.get(timeout)
+                if event is not None and visible(event):
+                    yield events.format_sse(event)
+                    if view_mode and event['type'] in ('status', 'progress') and stats_due is None:
+                        stats_due = loop.time() + EVENT_STREAM_STATS_DELAY
+                if stats_due is not None and loop.time() >= stats_due:
+                    # One counter read per burst of changes, not per event
+                    stats_due = None
+                    stats = await sync_to_async(_dashboard_stats_event)(user, privileged, view_mode)
+                    yield events.format_sse(stats)
+                elif event is None:
+                    yield ": keepalive\n\n"
+        finally:
+            await subscription.aclose()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response